@@ -0,0 +1,184 @@
+"""
+Production server configuration: ``gunicorn -c gunicorn.conf.py`` (the
+Dockerfile's CMD).
+
+The app is imported and the OCR/NER weights are loaded once in the master
+process (``preload_app`` + ``when_ready``), then the workers are forked and
+share those pages copy-on-write; each worker only runs the warm-up inference
+and keeps its own buffers. Recycled workers are forked again from the master,
+so they come back in seconds without reloading any weights.
+
+Modes (GUNICORN_MODE):
+  wsgi  (default) gthread workers serving ``iceexpo.wsgi`` with
+        GUNICORN_THREADS threads (8). A request holds its thread until it
+        is answered, including an OCR job long-poll, so the poll wait is
+        capped at OCR_JOB_LONG_POLL_MAX=5 seconds here: kiosks waiting for
+        results then hold at most a few threads at a time. Raise the thread
+        count with the number of kiosks polling each worker at once.
+  asgi  uvicorn workers serving ``iceexpo.asgi``; the card upload view and
+        the job long-poll are async. Django runs every other (sync) view of
+        a worker on one shared thread, so a slow one (badge PDFs, exports)
+        holds up check-ins and registrations on that worker until it ends.
+
+Worker count: WEB_CONCURRENCY if set, otherwise as many as there are cores,
+capped by what fits in memory next to the shared weights:
+
+    workers = min(cores, (available_mb - MODEL_MEMORY_MB) // WORKER_MEMORY_MB)
+
+With the inference sidecar (OCR_INFERENCE_SOCKET, see ocr_app.sidecar) the
+workers hold no models: set MODEL_MEMORY_MB=0 and size the workers by their
+own footprint; the sidecar runs as a separate process next to gunicorn.
+
+MODEL_MEMORY_MB / WORKER_MEMORY_MB default to rough figures for the default
+models (xlm-roberta-large NER in fp32 is ~2.2 GB; PaddleOCR mobile is a few
+hundred MB). Measure them on the target host and set both:
+
+    gunicorn -c gunicorn.conf.py &            # wait until the workers are warm
+    curl -s -F image=@card.jpg localhost:8000/new-registration/ >/dev/null
+    python manage.py worker_memory            # reads the pid file below
+
+``worker_memory`` prints RSS, PSS and USS per process. A worker's USS (memory
+only it holds) is WORKER_MEMORY_MB; the master's RSS is close to
+MODEL_MEMORY_MB. The PSS total is what the whole server actually costs.
+
+Background OCR jobs (the capture page's queue, see OCR_USE_JOB_QUEUE) need
+``manage.py run_ocr_workers``. With OCR_JOB_WORKERS=N the master starts it
+with N processes once the app is loaded and stops it on shutdown; each of
+those processes loads its own models unless the inference sidecar is used.
+Leave it at 0 when the workers run elsewhere (another container or host).
+"""
+import gc
+import os
+import subprocess
+import sys
+
+MODE = os.environ.get('GUNICORN_MODE', 'wsgi')
+
+
+def _available_memory_mb():
+    """MemAvailable, capped by the container's cgroup limit if there is one."""
+    available = None
+    try:
+        with open('/proc/meminfo') as fh:
+            for line in fh:
+                if line.startswith('MemAvailable:'):
+                    available = int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as fh:
+                limit = fh.read().strip()
+        except OSError:
+            continue
+        if limit.isdigit() and int(limit) < 1 << 60:
+            limit_mb = int(limit) // (1024 * 1024)
+            available = limit_mb if available is None else min(available, limit_mb)
+        break
+    return available
+
+
+def _cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_count(cores, available_mb, model_mb, worker_mb):
+    if available_mb is None:
+        return cores
+    return max(1, min(cores, (available_mb - model_mb) // worker_mb))
+
+
+CORES = _cores()
+MODEL_MEMORY_MB = int(os.environ.get('MODEL_MEMORY_MB', 2600))
+WORKER_MEMORY_MB = int(os.environ.get('WORKER_MEMORY_MB', 700))
+JOB_WORKERS = int(os.environ.get('OCR_JOB_WORKERS', 0))
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', 8000)}")
+workers = int(os.environ.get('WEB_CONCURRENCY') or
+              worker_count(CORES, _available_memory_mb(), MODEL_MEMORY_MB, WORKER_MEMORY_MB))
+
+if MODE == 'wsgi':
+    wsgi_app = 'iceexpo.wsgi:application'
+    worker_class = 'gthread'
+    threads = int(os.environ.get('GUNICORN_THREADS', 8))
+    # Short long-polls: each waiting request holds one of the threads
+    os.environ.setdefault('OCR_JOB_LONG_POLL_MAX', '5')
+else:
+    wsgi_app = 'iceexpo.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+
+preload_app = True
+pidfile = os.environ.get('GUNICORN_PIDFILE', '/tmp/iceexpo-gunicorn.pid')
+
+# OCR of a large card can take several seconds on a busy CPU
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 60))
+keepalive = 5
+
+# Recycle workers after a while to cap fragmentation/leaks in the native
+# inference libraries; the jitter keeps them from all restarting together.
+# Off by default in wsgi mode: an exiting gthread worker drops the
+# connections it has already accepted but not yet served.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000 if MODE == 'asgi' else 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# Give each worker its share of the cores for the native thread pools
+# (read when torch/paddle are first imported, i.e. in the master below)
+_threads_per_worker = str(max(1, CORES // workers))
+for _var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(_var, _threads_per_worker)
+os.environ.setdefault('OCR_CPU_THREADS', _threads_per_worker)
+
+# The hooks below load and warm the models; a background warm-up thread in
+# the master (OCR_WARM_ON_START) would not survive the fork
+os.environ['OCR_WARM_ON_START'] = '0'
+
+
+def when_ready(server):
+    """Master, after the app is imported and before any worker is forked."""
+    from django.db import connections
+
+    from ocr_app.utils import get_inference_client, registry
+
+    if get_inference_client() is None:
+        status = registry.preload()
+        server.log.info("Preloaded models: %s", {name: model['state'] for name, model in status.items()})
+    else:
+        server.log.info("Models are served by the inference sidecar; nothing to preload")
+    # Workers must open their own database connections
+    connections.close_all()
+    if JOB_WORKERS > 0:
+        _start_job_workers(server)
+    # Keep the collector from touching (and so un-sharing) the preloaded objects
+    gc.freeze()
+
+
+_job_workers = None
+
+
+def _start_job_workers(server):
+    global _job_workers
+    manage = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'manage.py')
+    _job_workers = subprocess.Popen([sys.executable, manage, 'run_ocr_workers', '--processes', str(JOB_WORKERS)])
+    server.log.info("Started %d OCR job worker(s) (pid %s)", JOB_WORKERS, _job_workers.pid)
+
+
+def on_exit(server):
+    """Master, on shutdown: stop the OCR job workers it started."""
+    if _job_workers is not None and _job_workers.poll() is None:
+        _job_workers.terminate()
+        try:
+            _job_workers.wait(timeout=graceful_timeout)
+        except subprocess.TimeoutExpired:
+            _job_workers.kill()
+
+
+def post_worker_init(worker):
+    """Each worker, before it accepts requests: run the warm-up inference."""
+    from ocr_app.utils import models_status, warm_up_models
+
+    warm_up_models()
+    worker.log.info("Worker %s ready: %s", worker.pid, models_status()[0])
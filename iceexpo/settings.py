@@ -1,5 +1,6 @@
 
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -31,6 +32,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'ocr_app.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,6 +54,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'ocr_app.context_processors.upload_limits',
+                'ocr_app.context_processors.job_queue',
             ],
         },
     },
@@ -83,6 +87,13 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # OCR worker processes write concurrently with the web workers; WAL
+        # lets gate check-ins commit without blocking readers or fsyncing
+        # every scan
+        'OPTIONS': {
+            'timeout': 20,
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+        },
     }
 }
 
@@ -134,4 +145,133 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'ocr_app.BusinessCard'
 LOGIN_URL = 'icexpo_home'
-DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10 MB
\ No newline at end of file
+DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10 MB
+
+# OCR / NER models
+# Load and warm the models when a web worker starts (wsgi/asgi), instead of
+# on the first card. Management commands never load them unless they use them.
+OCR_WARM_ON_START = os.environ.get('OCR_WARM_ON_START', '0') == '1'
+# Reject OCR uploads with 503 until this worker's models are warm
+OCR_REQUIRE_WARM = os.environ.get('OCR_REQUIRE_WARM', '0') == '1'
+
+# Threads per server process running card decode/OCR/parsing for the async
+# upload view (the event loop itself never runs inference)
+OCR_INFERENCE_THREADS = int(os.environ.get('OCR_INFERENCE_THREADS', 2))
+
+# Inference sidecar (manage.py run_inference_server): when OCR_INFERENCE_SOCKET
+# is set, web processes send OCR/NER to the server on that Unix socket instead
+# of loading the models. Per web process: pooled connections, seconds to wait
+# for a free one before answering busy, and seconds to wait for a result.
+OCR_INFERENCE_SOCKET = os.environ.get('OCR_INFERENCE_SOCKET', '')
+OCR_INFERENCE_POOL_SIZE = int(os.environ.get('OCR_INFERENCE_POOL_SIZE', 4))
+OCR_INFERENCE_WAIT = float(os.environ.get('OCR_INFERENCE_WAIT', 5))
+OCR_INFERENCE_TIMEOUT = float(os.environ.get('OCR_INFERENCE_TIMEOUT', 30))
+# Requests the sidecar runs at once; up to MAX_QUEUED more wait QUEUE_WAIT seconds
+# for a slot, the rest are answered busy straight away
+OCR_INFERENCE_MAX_INFLIGHT = int(os.environ.get('OCR_INFERENCE_MAX_INFLIGHT', 8))
+OCR_INFERENCE_MAX_QUEUED = int(os.environ.get('OCR_INFERENCE_MAX_QUEUED', 16))
+OCR_INFERENCE_QUEUE_WAIT = float(os.environ.get('OCR_INFERENCE_QUEUE_WAIT', 10))
+
+# Background OCR jobs, run by `manage.py run_ocr_workers`. OCR_JOB_WORKERS > 0 makes
+# gunicorn (gunicorn.conf.py) start that command with as many processes next to the
+# web workers. The capture page only goes through the queue when OCR_USE_JOB_QUEUE
+# is on (by default when gunicorn starts workers; set it when they run elsewhere),
+# and posts the card directly if no result arrives within OCR_JOB_CLIENT_DEADLINE.
+OCR_JOB_WORKERS = int(os.environ.get('OCR_JOB_WORKERS', 0))
+OCR_USE_JOB_QUEUE = os.environ.get('OCR_USE_JOB_QUEUE', '1' if OCR_JOB_WORKERS > 0 else '0') == '1'
+OCR_JOB_CLIENT_DEADLINE = int(os.environ.get('OCR_JOB_CLIENT_DEADLINE', 60))  # seconds
+OCR_JOB_MAX_QUEUE = int(os.environ.get('OCR_JOB_MAX_QUEUE', 200))  # submit answers 429 beyond this
+# Seconds a status request may wait for the result (gunicorn.conf.py lowers it in wsgi mode)
+OCR_JOB_LONG_POLL_MAX = int(os.environ.get('OCR_JOB_LONG_POLL_MAX', 25))
+OCR_JOB_STALE_AFTER = 300  # seconds before a RUNNING job is assumed orphaned
+OCR_JOB_MAX_ATTEMPTS = 3
+OCR_JOB_RETRY_FOR = 300  # seconds a job is re-queued while the inference sidecar is busy or down
+
+# Cross-request micro-batching of OCR/NER inference inside one worker process.
+# Only useful when a process serves concurrent requests (threaded workers).
+OCR_BATCH_WINDOW_MS = int(os.environ.get('OCR_BATCH_WINDOW_MS', 0))  # 0 disables batching
+OCR_BATCH_MAX_SIZE = int(os.environ.get('OCR_BATCH_MAX_SIZE', 8))
+
+# Result cache for re-scans of the same card (per worker process)
+OCR_CACHE_MAX_ENTRIES = int(os.environ.get('OCR_CACHE_MAX_ENTRIES', 512))  # 0 disables the cache
+OCR_CACHE_TTL = int(os.environ.get('OCR_CACHE_TTL', 30 * 60))  # seconds
+# Near-duplicate reuse: candidates within this many of 64 perceptual-hash bits (0 = exact
+# matches only) whose thumbnails also differ by at most OCR_CACHE_THUMBNAIL_DISTANCE per block
+OCR_CACHE_PHASH_DISTANCE = int(os.environ.get('OCR_CACHE_PHASH_DISTANCE', 0))
+OCR_CACHE_THUMBNAIL_DISTANCE = float(os.environ.get('OCR_CACHE_THUMBNAIL_DISTANCE', 0.35))
+
+# Keep the original card captures under MEDIA_ROOT (written in the background)
+OCR_SAVE_UPLOADS = os.environ.get('OCR_SAVE_UPLOADS', '1') == '1'
+
+# Image preprocessing before OCR: 'none' (the original pipeline: the frame
+# as captured), 'fast' (CLAHE), 'full' (denoise + threshold) or 'auto'
+# (picked per image from contrast and blur). Checked when the app starts.
+OCR_PREPROCESS_TIER = os.environ.get('OCR_PREPROCESS_TIER', 'none')
+OCR_MAX_SIDE = int(os.environ.get('OCR_MAX_SIDE', 1600))  # larger frames are downscaled first
+
+# Card uploads: the capture page downscales to OCR_UPLOAD_MAX_SIDE px on the
+# longest side and encodes JPEG at OCR_UPLOAD_JPEG_QUALITY (0-100) before
+# sending the raw bytes; raw image bodies are capped at OCR_UPLOAD_MAX_BYTES
+OCR_UPLOAD_MAX_SIDE = int(os.environ.get('OCR_UPLOAD_MAX_SIDE', OCR_MAX_SIDE))
+OCR_UPLOAD_JPEG_QUALITY = int(os.environ.get('OCR_UPLOAD_JPEG_QUALITY', 85))
+OCR_UPLOAD_MAX_BYTES = int(os.environ.get('OCR_UPLOAD_MAX_BYTES', 10 * 1024 * 1024))
+
+# OCR lines scored below this are ignored when parsing fields (kept in the raw text)
+OCR_LAYOUT_MIN_SCORE = float(os.environ.get('OCR_LAYOUT_MIN_SCORE', 0.5))
+
+# 'strict' always runs the NER model over the whole card (the original
+# behaviour); 'cascade' (opt-in) runs it only for fields the rules can't
+# resolve, which is faster but can pick fields differently
+OCR_PARSE_MODE = os.environ.get('OCR_PARSE_MODE', 'strict')
+
+# NER backend: 'hf' (fp32 pipeline), 'hf-int8' (dynamically quantized),
+# 'onnx' (ONNX Runtime, needs optimum[onnxruntime]) or 'small' (distilled
+# multilingual model). OCR_NER_MODEL overrides the backend's default model.
+OCR_NER_BACKEND = os.environ.get('OCR_NER_BACKEND', 'hf')
+OCR_NER_MODEL = os.environ.get('OCR_NER_MODEL', '')
+OCR_NER_ONNX_DIR = os.environ.get('OCR_NER_ONNX_DIR', str(BASE_DIR / 'models' / 'ner-onnx'))
+
+# Crop and perspective-correct the card out of the webcam frame before OCR
+OCR_CROP_CARD = os.environ.get('OCR_CROP_CARD', '1') == '1'
+
+# PaddleOCR engine: detection input is capped at OCR_DET_LIMIT_SIDE px on the
+# longest side; OCR_MODEL_SIZE is 'mobile' or 'server' ('' keeps PaddleOCR's
+# default); OCR_CPU_THREADS 0 keeps PaddleOCR's default
+OCR_DET_LIMIT_SIDE = int(os.environ.get('OCR_DET_LIMIT_SIDE', 960))
+OCR_MODEL_SIZE = os.environ.get('OCR_MODEL_SIZE', 'mobile')
+OCR_CPU_THREADS = int(os.environ.get('OCR_CPU_THREADS', 0))
+OCR_ENABLE_MKLDNN = os.environ.get('OCR_ENABLE_MKLDNN', '1') == '1'
+
+# Clients allowed to scrape /metrics/ (Prometheus on the same host by default)
+OCR_METRICS_ALLOWED_IPS = os.environ.get('OCR_METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+
+# Pipeline timings and worker events go to stderr (collected by gunicorn/systemd)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        'ocr_app': {'handlers': ['console'], 'level': os.environ.get('OCR_LOG_LEVEL', 'INFO')},
+    },
+}
+
+# QR codes are rendered on demand (ocr_app.qr): rendered images kept in memory,
+# browser cache lifetime, and whether new registrations are pre-rendered
+OCR_QR_CACHE_SIZE = int(os.environ.get('OCR_QR_CACHE_SIZE', 1024))
+OCR_QR_MAX_AGE = int(os.environ.get('OCR_QR_MAX_AGE', 3600))
+OCR_QR_PRERENDER = os.environ.get('OCR_QR_PRERENDER', '1') == '1'
+
+# Results per page of the help-desk attendee search
+DESK_PAGE_SIZE = int(os.environ.get('DESK_PAGE_SIZE', 20))
+
+# Entry-gate check-in (ocr_app.checkin): seconds between UID index top-ups,
+# window in which a re-read of the same badge at the same gate is the same
+# scan, and the X-Checkin-Token scanners must send ('' accepts any client)
+OCR_CHECKIN_REFRESH = float(os.environ.get('OCR_CHECKIN_REFRESH', 5))
+OCR_CHECKIN_DEBOUNCE = float(os.environ.get('OCR_CHECKIN_DEBOUNCE', 5))
+OCR_CHECKIN_TOKEN = os.environ.get('OCR_CHECKIN_TOKEN', '')
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'iceexpo.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings
+
+if settings.OCR_WARM_ON_START:
+    from ocr_app.utils import registry
+    registry.warm_up_in_background()
@@ -1,4 +1,36 @@
-from django.contrib import admin
-from .models import BusinessCard
+import tempfile
+
+from django.contrib import admin, messages
+from django.http import FileResponse
+
+from . import badges
+from .models import Attendee, BusinessCard, CheckIn
 # Register your models here.
-admin.site.register(BusinessCard)
\ No newline at end of file
+admin.site.register(BusinessCard)
+
+
+@admin.register(Attendee)
+class AttendeeAdmin(admin.ModelAdmin):
+    list_display = ('uid', 'name', 'company', 'phone', 'email', 'category', 'created_at')
+    list_filter = ('category',)
+    search_fields = ('uid', 'name', 'phone', 'email', 'company')
+    actions = ['print_badges']
+
+    @admin.action(description="Print badge sheets (PDF) for selected attendees")
+    def print_badges(self, request, queryset):
+        if queryset.count() > badges.ADMIN_MAX_BADGES:
+            self.message_user(request, f"Select at most {badges.ADMIN_MAX_BADGES} attendees, or use "
+                                       f"'manage.py generate_badges' for larger runs", messages.WARNING)
+            return None
+        target = tempfile.TemporaryFile()
+        badges.badges_pdf(badges.attendee_records(queryset), target)
+        target.seek(0)
+        return FileResponse(target, as_attachment=True, filename='badges.pdf', content_type='application/pdf')
+
+
+@admin.register(CheckIn)
+class CheckInAdmin(admin.ModelAdmin):
+    list_display = ('attendee', 'gate', 'checked_in_at', 'repeat')
+    list_filter = ('gate', 'repeat')
+    search_fields = ('attendee__uid', 'attendee__name')
+    list_select_related = ('attendee',)
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class OcrAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ocr_app'
+
+    def ready(self):
+        from .preprocess import TIERS
+
+        # A typo here would otherwise fail every card at OCR time, reported as an unreadable image
+        if settings.OCR_PREPROCESS_TIER not in (*TIERS, 'auto'):
+            raise ImproperlyConfigured(
+                f"OCR_PREPROCESS_TIER must be one of {', '.join((*TIERS, 'auto'))}, "
+                f"not {settings.OCR_PREPROCESS_TIER!r}")
@@ -0,0 +1,213 @@
+"""
+Print-ready multi-up badge sheets (QR code, name, designation, company and
+category) for pre-registered attendees.
+
+Used by ``manage.py generate_badges`` and the Attendee admin action. Sheet
+rendering only needs plain dicts, Pillow and qrcode, so it can run in worker
+processes without Django or a database connection.
+"""
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from types import SimpleNamespace
+
+import pandas as pd
+import qrcode
+from PIL import Image, ImageDraw, ImageFont
+
+from .fonts import find_font
+from .qr import qr_payload
+
+BADGE_FIELDS = ('uid', 'name', 'email', 'phone', 'company', 'designation', 'category', 'address')
+
+# A4 portrait at 300 dpi
+PAGE_SIZE = (2480, 3508)
+DPI = 300
+MARGIN = 90
+GUTTER = 40
+
+MANIFEST = 'manifest.json'
+
+# The admin action renders in the request; bigger runs go through the command
+ADMIN_MAX_BADGES = 400
+
+
+def attendee_records(queryset):
+    """Badge records (plain dicts) for an Attendee queryset, in id order."""
+    return list(queryset.order_by('id').values(*BADGE_FIELDS))
+
+
+def spreadsheet_records(path):
+    """Badge records from a workbook in the business_cards.xlsx layout."""
+    # Imported here so pool workers never load the models
+    from .exports import WORKBOOK_COLUMNS
+
+    df = pd.read_excel(path, dtype=str).fillna('')
+    df.columns = df.columns.str.strip()
+    df.rename(columns={'QR Code': 'QR_Code'}, inplace=True)
+    records = []
+    for row in df.to_dict('records'):
+        record = {field: str(row.get(column, '')).strip() for column, field in WORKBOOK_COLUMNS.items()
+                  if field in BADGE_FIELDS}
+        record['uid'] = record['uid'].upper()
+        if record['uid']:
+            records.append(record)
+    return records
+
+
+def _fit_font(draw, text, font_path, size, max_width, min_size=18):
+    """Largest font no bigger than ``size`` that fits ``text`` into ``max_width``."""
+    while True:
+        font = ImageFont.truetype(font_path, size) if font_path else ImageFont.load_default(size)
+        if size <= min_size or draw.textlength(text, font=font) <= max_width:
+            return font
+        size -= 4
+
+
+def render_badge(record, size, font_path=None):
+    """One badge: name, designation, company and a category band on the left, the QR code on the right."""
+    width, height = size
+    badge = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(badge)
+    draw.rectangle([0, 0, width - 1, height - 1], outline='black', width=4)
+
+    qr_side = min(height - 2 * GUTTER, width // 2 - GUTTER)
+    qr_image = qrcode.make(qr_payload(SimpleNamespace(**record)), border=1).get_image()
+    badge.paste(qr_image.convert('RGB').resize((qr_side, qr_side), Image.NEAREST),
+                (width - qr_side - GUTTER, GUTTER))
+
+    text_width = width - qr_side - 3 * GUTTER
+    band = height // 6
+    y = GUTTER
+    for text, font_size in ((record['name'], height // 7), (record['designation'], height // 13),
+                            (record['company'], height // 12)):
+        if not text:
+            continue
+        font = _fit_font(draw, text, font_path, font_size, text_width)
+        draw.text((GUTTER, y), text, fill='black', font=font)
+        y += int(font.size * 1.3)
+
+    draw.rectangle([4, height - band - 4, width - qr_side - 2 * GUTTER, height - 4], fill='black')
+    label = f"{record['category'] or 'VISITOR'}  {record['uid']}".upper()
+    font = _fit_font(draw, label, font_path, band * 2 // 3, text_width)
+    draw.text((GUTTER, height - band // 2 - 4), label, fill='white', font=font, anchor='lm')
+    return badge
+
+
+def render_sheet(records, columns=2, rows=4, font_path=None):
+    """An A4 page holding ``columns * rows`` badges."""
+    page = Image.new('RGB', PAGE_SIZE, 'white')
+    cell_w = (PAGE_SIZE[0] - 2 * MARGIN - (columns - 1) * GUTTER) // columns
+    cell_h = (PAGE_SIZE[1] - 2 * MARGIN - (rows - 1) * GUTTER) // rows
+    for i, record in enumerate(records[:columns * rows]):
+        col, row = i % columns, i // columns
+        badge = render_badge(record, (cell_w, cell_h), font_path)
+        page.paste(badge, (MARGIN + col * (cell_w + GUTTER), MARGIN + row * (cell_h + GUTTER)))
+    return page
+
+
+def _sheet_name(index, fmt):
+    return f"sheet_{index + 1:05d}.{fmt}"
+
+
+def _write_sheet(task):
+    """Pool worker: render one sheet and write it atomically. Returns ``(index, badge_count)``."""
+    index, records, out_dir, fmt, columns, rows, font_path = task
+    page = render_sheet(records, columns, rows, font_path)
+    path = os.path.join(out_dir, _sheet_name(index, fmt))
+    tmp = f"{path}.tmp"
+    page.save(tmp, format='PDF' if fmt == 'pdf' else 'PNG', resolution=DPI, dpi=(DPI, DPI))
+    os.replace(tmp, path)
+    return index, len(records)
+
+
+class BadgeRun:
+    """
+    Badge generation into ``out_dir``, one file per sheet. The sheet plan is
+    kept in a manifest, so an interrupted run picks up with the sheets that
+    haven't been written yet.
+    """
+
+    def __init__(self, records, out_dir, fmt='pdf', columns=2, rows=4, font_path=None):
+        self.records = records
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.columns = columns
+        self.rows = rows
+        self.font_path = find_font(font_path)
+        per_sheet = columns * rows
+        self.sheets = [records[i:i + per_sheet] for i in range(0, len(records), per_sheet)]
+
+    def _plan(self):
+        digest = hashlib.sha1(json.dumps(self.records, sort_keys=True).encode()).hexdigest()
+        return {'fmt': self.fmt, 'columns': self.columns, 'rows': self.rows,
+                'badges': len(self.records), 'sheets': len(self.sheets), 'records_sha1': digest}
+
+    def pending(self, restart=False):
+        """Indexes of the sheets still to render; checks the manifest matches this run."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        manifest_path = os.path.join(self.out_dir, MANIFEST)
+        plan = self._plan()
+        if os.path.exists(manifest_path) and not restart:
+            with open(manifest_path, encoding='utf-8') as fh:
+                previous = json.load(fh)
+            if previous != plan:
+                raise ValueError(f"{self.out_dir} holds a different badge run; use another directory or restart")
+        else:
+            for name in os.listdir(self.out_dir):
+                if name.startswith('sheet_'):
+                    os.remove(os.path.join(self.out_dir, name))
+            with open(manifest_path, 'w', encoding='utf-8') as fh:
+                json.dump(plan, fh, indent=2)
+        return [i for i in range(len(self.sheets))
+                if not os.path.exists(os.path.join(self.out_dir, _sheet_name(i, self.fmt)))]
+
+    def run(self, processes=None, restart=False, progress=None):
+        """
+        Render the pending sheets across a process pool. ``progress`` is
+        called as ``progress(done_sheets, total_sheets, badges_per_second)``.
+        Returns ``{'sheets', 'rendered', 'skipped', 'badges', 'seconds', 'badges_per_second'}``.
+        """
+        pending = self.pending(restart)
+        done = len(self.sheets) - len(pending)
+        rendered_badges = 0
+        start = time.perf_counter()
+        tasks = [(i, self.sheets[i], self.out_dir, self.fmt, self.columns, self.rows, self.font_path)
+                 for i in pending]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            for future in as_completed(pool.submit(_write_sheet, task) for task in tasks):
+                _, count = future.result()
+                done += 1
+                rendered_badges += count
+                if progress:
+                    progress(done, len(self.sheets), rendered_badges / (time.perf_counter() - start))
+        seconds = time.perf_counter() - start
+        return {
+            'sheets': len(self.sheets),
+            'rendered': len(pending),
+            'skipped': len(self.sheets) - len(pending),
+            'badges': rendered_badges,
+            'seconds': round(seconds, 2),
+            'badges_per_second': round(rendered_badges / seconds, 2) if seconds else None,
+        }
+
+
+def badges_pdf(records, target, columns=2, rows=4, font_path=None):
+    """
+    All badges as one multi-page PDF written to ``target`` (a path or a
+    seekable binary file opened for update; used for admin selections).
+    Each sheet is appended to the file as soon as it is rendered, so only
+    one page is held in memory at a time.
+    """
+    font_path = find_font(font_path)
+    per_sheet = columns * rows
+    for i in range(0, len(records), per_sheet):
+        page = render_sheet(records[i:i + per_sheet], columns, rows, font_path)
+        if hasattr(target, 'seek'):
+            target.seek(0)  # Pillow finds the existing pages from the start of the file
+        page.save(target, format='PDF', resolution=DPI, append=i > 0)
+        page.close()
+    if hasattr(target, 'seek'):
+        target.seek(0, os.SEEK_END)
@@ -0,0 +1,102 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Groups calls that arrive within ``window_ms`` of each other (up to
+    ``max_batch``) and runs them through ``batch_fn`` in one go.
+
+    ``batch_fn`` takes a list of inputs and returns a list of results in the
+    same order. Callers block in ``submit()`` until their own result is ready.
+    All batches run on one background thread, so the model behind
+    ``batch_fn`` is never called concurrently.
+    """
+
+    def __init__(self, name, batch_fn, window_ms, max_batch):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def submit(self, item):
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future.result()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"batcher-{self.name}", daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # Window is over; still take whatever piled up meanwhile
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            waits = [started - enqueued for _, _, enqueued in batch]
+            with self._stats_lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._wait_total += sum(waits)
+                self._wait_max = max(self._wait_max, *waits)
+
+            try:
+                results = list(self.batch_fn([item for item, _, _ in batch]))
+                if len(results) != len(batch):
+                    # Can't tell which result belongs to whom; fail them all rather than leave
+                    # callers blocked forever (or hand one caller another's result)
+                    raise RuntimeError(f"{self.name} batch of {len(batch)} returned {len(results)} result(s)")
+            except Exception as exc:
+                logger.exception("%s batch of %d failed", self.name, len(batch))
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+                continue
+
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self):
+        with self._stats_lock:
+            batches, items = self._batches, self._items
+            return {
+                'window_ms': self.window * 1000,
+                'max_batch': self.max_batch,
+                'batches': batches,
+                'items': items,
+                'mean_batch_size': items / batches if batches else 0.0,
+                'mean_batch_fill': items / (batches * self.max_batch) if batches else 0.0,
+                'mean_queue_wait_ms': self._wait_total / items * 1000 if items else 0.0,
+                'max_queue_wait_ms': self._wait_max * 1000,
+            }
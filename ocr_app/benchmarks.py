@@ -0,0 +1,228 @@
+"""
+Per-stage benchmark of the card pipeline on a deterministic synthetic corpus.
+
+Used by ``manage.py bench_pipeline``. Everything runs offline: the corpus is
+rendered locally from a fixed seed and the models come from the local cache.
+"""
+import random
+import time
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from . import utils
+from .fonts import find_font
+from .latency import summarize
+from .locator import crop_card
+from .preprocess import preprocess
+
+LANGUAGES = ('english', 'devanagari', 'mixed')
+
+NAMES = {
+    'english': ['Rahul Sharma', 'Priya Deshmukh', 'Amit Kulkarni', 'Sneha Patil', 'Vikram Joshi'],
+    'devanagari': ['राहुल शर्मा', 'प्रिया देशमुख', 'अमित कुलकर्णी', 'स्नेहा पाटील', 'विक्रम जोशी'],
+}
+COMPANIES = {
+    'english': ['Acme Solutions Pvt Ltd', 'Sahyadri Constructions', 'Bluewave Tech LLP', 'Nirmal Interiors Ltd'],
+    'devanagari': ['सह्याद्री कन्स्ट्रक्शन प्रा. लि.', 'निर्मल इंटिरियर्स', 'ब्लूवेव्ह सोल्यूशन्स'],
+}
+DESIGNATIONS = {
+    'english': ['Sales Manager', 'Director', 'Senior Architect', 'Business Development Executive', 'Founder & CEO'],
+    'devanagari': ['व्यवस्थापक', 'संचालक', 'अध्यक्ष'],
+}
+ADDRESSES = {
+    'english': ['Plot 12, MIDC Road, Bhosari', 'Shop No. 4, Laxmi Nagar', 'Office 301, Centrum Tower, FC Road'],
+    'devanagari': ['प्लॉट १२, एमआयडीसी रोड, भोसरी', 'शॉप नंबर ४, लक्ष्मी नगर'],
+}
+CITIES = ['Pune 411026', 'Nashik 422007', 'Mumbai 400001', 'Nagpur 440010']
+
+TEXT_STAGES = [
+    ('clean_ocr_text', utils.clean_ocr_text),
+    ('extract_phones', utils.extract_phones),
+    ('extract_emails', utils.extract_emails),
+    ('extract_websites', utils.extract_websites),
+    ('extract_designation', utils.extract_designation),
+    ('extract_name', utils.extract_name),
+    ('extract_company', utils.extract_company),
+    ('extract_address', utils.extract_address),
+    ('parse_extracted_data', utils.parse_extracted_data),
+]
+# Image stages; extract_text OCRs the whole frame, extract_text_cropped the
+# card found by locate_card, so the two show what cropping saves
+IMAGE_STAGES = ['preprocess', 'extract_text', 'locate_card', 'extract_text_cropped']
+# Stages that need the NER model loaded
+NER_STAGES = {'extract_designation', 'extract_name', 'extract_company', 'extract_address', 'parse_extracted_data'}
+
+
+def _pick(rng, pool, language):
+    if language == 'mixed':
+        language = rng.choice(['english', 'devanagari'])
+    return rng.choice(pool.get(language) or pool['english'])
+
+
+def card_lines(rng, language):
+    phone = f"+91 {rng.randint(70000, 99999)} {rng.randint(10000, 99999)}"
+    first = _pick(rng, NAMES, language).split()[0].lower()
+    first = first if first.isascii() else 'info'
+    domain = rng.choice(['acme.com', 'sahyadri.in', 'bluewave.co.in', 'nirmal.org'])
+    return [
+        _pick(rng, NAMES, language),
+        _pick(rng, DESIGNATIONS, language),
+        _pick(rng, COMPANIES, language),
+        phone,
+        f"{first}@{domain}",
+        f"www.{domain}",
+        _pick(rng, ADDRESSES, language),
+        rng.choice(CITIES),
+    ]
+
+
+def render_card(lines, rng, font_path, noise, rotation, width):
+    """Render card text to a BGR frame with the given noise, rotation and width."""
+    height = int(width * 0.58)  # business card aspect ratio
+    card = Image.new('RGB', (width, height), (245, 243, 238))
+    draw = ImageDraw.Draw(card)
+    size = max(12, width // 28)
+    y = size
+    for i, line in enumerate(lines):
+        line_size = int(size * 1.5) if i == 0 else size
+        font = ImageFont.truetype(font_path, line_size) if font_path else ImageFont.load_default(line_size)
+        draw.text((size, y), line, fill=(25, 25, 35), font=font)
+        y += int(line_size * 1.35)
+
+    # Place the card on a darker table background, rotated
+    frame = np.array(card)[:, :, ::-1].copy()
+    pad = width // 8
+    frame = cv2.copyMakeBorder(frame, pad, pad, pad, pad, cv2.BORDER_CONSTANT, value=(70, 60, 50))
+    h, w = frame.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), rotation, 1.0)
+    frame = cv2.warpAffine(frame, matrix, (w, h), borderValue=(70, 60, 50))
+
+    if noise:
+        np_rng = np.random.default_rng(rng.randint(0, 2 ** 31))
+        frame = np.clip(frame + np_rng.normal(0, noise, frame.shape), 0, 255).astype(np.uint8)
+    return frame
+
+
+def build_corpus(size, seed=1234, font_path=None):
+    """
+    Deterministic list of ``{'id', 'language', 'noise', 'rotation', 'width',
+    'text', 'image'}`` samples cycling through languages and degradations.
+    """
+    rng = random.Random(seed)
+    font_path = find_font(font_path)
+    # Language varies fastest, and the width is offset by the other three factors, so
+    # every 27 consecutive samples cover each language, noise, rotation and width
+    # level equally (all 81 combinations after 81 samples)
+    noises, rotations, widths = (0, 8, 20), (0, 3, -8), (640, 1280, 1920)
+    variants = []
+    for i in range(len(LANGUAGES) * len(noises) * len(rotations) * len(widths)):
+        a, b, c, d = i % 3, i // 3 % 3, i // 9 % 3, i // 27
+        variants.append((LANGUAGES[a], noises[b], rotations[c], widths[(a + b + c + d) % 3]))
+    corpus = []
+    for i in range(size):
+        language, noise, rotation, width = variants[i % len(variants)]
+        lines = card_lines(rng, language)
+        corpus.append({
+            'id': i,
+            'language': language,
+            'noise': noise,
+            'rotation': rotation,
+            'width': width,
+            'text': "\n".join(lines),
+            'image': render_card(lines, rng, font_path, noise, rotation, width),
+        })
+    return corpus, font_path
+
+
+def _time_stage(func, inputs, repeat):
+    samples = []
+    outputs = []
+    for item in inputs:
+        for r in range(repeat):
+            start = time.perf_counter()
+            out = func(item)
+            samples.append(time.perf_counter() - start)
+        outputs.append(out)
+    return samples, outputs
+
+
+def run(corpus, stages=None, repeat=1, preprocess_tier='none', max_side=1600):
+    """
+    Time every selected stage over the corpus. ``extract_text`` runs on the
+    rendered images (after preprocessing) and ``extract_text_cropped`` on the
+    located cards; the text stages run on the ``extract_text`` output, or on
+    the ground-truth text when OCR is not selected.
+    """
+    selected = set(stages) if stages else {*IMAGE_STAGES, *(name for name, _ in TEXT_STAGES)}
+    results = {}
+
+    needed = []
+    if selected & {'extract_text', 'extract_text_cropped'}:
+        needed.append('ocr')
+    if selected & NER_STAGES:
+        needed.append('ner')
+    load_start = time.perf_counter()
+    model_status = utils.registry.warm_up(needed) if needed else {}
+    load_seconds = time.perf_counter() - load_start
+
+    images = [sample['image'] for sample in corpus]
+    if 'locate_card' in selected or 'extract_text_cropped' in selected:
+        samples, crops = _time_stage(crop_card, images, repeat)
+        if 'locate_card' in selected:
+            results['locate_card'] = summarize(samples)
+            results['locate_card']['found_rate'] = round(sum(found for _, found in crops) / len(crops), 3)
+        if 'extract_text_cropped' in selected:
+            cropped = [preprocess(img, preprocess_tier, max_side)[0] for img, _ in crops]
+            samples, _ = _time_stage(utils.extract_text, cropped, repeat)
+            results['extract_text_cropped'] = summarize(samples)
+
+    if 'preprocess' in selected or 'extract_text' in selected:
+        samples, outputs = _time_stage(lambda img: preprocess(img, preprocess_tier, max_side)[0], images, repeat)
+        if 'preprocess' in selected:
+            results['preprocess'] = summarize(samples)
+        images = outputs
+
+    texts = [sample['text'] for sample in corpus]
+    if 'extract_text' in selected:
+        samples, texts = _time_stage(utils.extract_text, images, repeat)
+        results['extract_text'] = summarize(samples)
+
+    cleaned = [utils.clean_ocr_text(text) for text in texts]
+    for name, func in TEXT_STAGES:
+        if name not in selected:
+            continue
+        inputs = texts if name in ('clean_ocr_text', 'parse_extracted_data') else cleaned
+        samples, _ = _time_stage(func, inputs, repeat)
+        results[name] = summarize(samples)
+
+    return {
+        'models': model_status,
+        'model_load_seconds': round(load_seconds, 3),
+        'stages': results,
+    }
+
+
+def compare(current, baseline, tolerance=0.15, min_delta_ms=0.5):
+    """
+    Regressions of ``current`` against ``baseline``: p50/p95 latency up, or
+    throughput down, by more than ``tolerance`` (fractional). Latency changes
+    smaller than ``min_delta_ms`` are timer noise and never count.
+    """
+    regressions = []
+    for stage, base in baseline.get('stages', {}).items():
+        now = current.get('stages', {}).get(stage)
+        if now is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            if now[metric] - base[metric] < min_delta_ms:
+                continue
+            if now[metric] > base[metric] * (1 + tolerance):
+                regressions.append((stage, metric, base[metric], now[metric]))
+        if base['mean_ms'] < min_delta_ms and now['mean_ms'] < min_delta_ms:
+            continue
+        if base.get('throughput_per_s') and now.get('throughput_per_s') is not None:
+            if now['throughput_per_s'] < base['throughput_per_s'] * (1 - tolerance):
+                regressions.append((stage, 'throughput_per_s', base['throughput_per_s'], now['throughput_per_s']))
+    return regressions
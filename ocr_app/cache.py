@@ -0,0 +1,153 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def content_hash(image):
+    """Exact hash of the decoded pixels (independent of JPEG/container bytes)."""
+    digest = hashlib.sha256()
+    digest.update(str(image.shape).encode())
+    digest.update(np.ascontiguousarray(image).data)
+    return digest.hexdigest()
+
+
+def perceptual_hash(image):
+    """64-bit difference hash; re-captures of the same card land a few bits apart."""
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+THUMB_SIZE = (128, 80)
+THUMB_BLOCK = 8
+
+
+def thumbnail(image):
+    """Small grayscale copy normalised for exposure, to confirm perceptual-hash matches."""
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32)
+    return (small - small.mean()) / (small.std() + 1e-6)
+
+
+def thumbnail_distance(a, b):
+    """
+    Largest mean difference over 8x8 blocks of two thumbnails. A different
+    name or number changes a few blocks a lot, which an image-wide average
+    (or a 64-bit hash) washes out.
+    """
+    width, height = THUMB_SIZE
+    diff = np.abs(a - b).reshape(height // THUMB_BLOCK, THUMB_BLOCK, width // THUMB_BLOCK, THUMB_BLOCK)
+    return float(diff.mean(axis=(1, 3)).max())
+
+
+class ResultCache:
+    """
+    In-process LRU of pipeline results keyed by pipeline version + exact
+    content hash, optionally with a fallback for near-identical frames.
+    Entries expire after ``ttl`` seconds.
+
+    ``max_distance`` is the largest perceptual-hash Hamming distance looked
+    at for a near match (0, the default, means exact matches only). The hash
+    alone can't tell cards with the same layout apart, so a candidate is
+    only reused if its thumbnail also differs by at most
+    ``max_thumbnail_distance`` in every block.
+    """
+
+    def __init__(self, version, max_entries=512, ttl=1800, max_distance=0, max_thumbnail_distance=0.35):
+        self.version = version
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.max_thumbnail_distance = max_thumbnail_distance
+        self._entries = OrderedDict()  # key -> (expires_at, (phash, thumbnail), value)
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.near_rejected = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, image):
+        return f"{self.version}:{content_hash(image)}"
+
+    def get(self, image):
+        """
+        Return ``(key, fingerprint, value, kind)``; ``kind`` is 'exact', 'near'
+        or 'miss'. Pass ``key`` and ``fingerprint`` back to ``put``.
+        """
+        key = self.key(image)
+        fingerprint = None
+        if self.max_distance > 0:
+            fingerprint = (perceptual_hash(image), thumbnail(image))
+        now = time.monotonic()
+
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return key, fingerprint, copy.deepcopy(entry[2]), 'exact'
+
+            if fingerprint is not None:
+                phash, thumb = fingerprint
+                candidates = []
+                for other_key, (_, other, value) in self._entries.items():
+                    if other is None:
+                        continue
+                    distance = (phash ^ other[0]).bit_count()
+                    if distance <= self.max_distance:
+                        candidates.append((distance, other_key, other[1], value))
+                for _, other_key, other_thumb, value in sorted(candidates, key=lambda c: c[0]):
+                    if thumbnail_distance(thumb, other_thumb) <= self.max_thumbnail_distance:
+                        self._entries.move_to_end(other_key)
+                        self.near_hits += 1
+                        return key, fingerprint, copy.deepcopy(value), 'near'
+                self.near_rejected += bool(candidates)
+
+            self.misses += 1
+            return key, fingerprint, None, 'miss'
+
+    def put(self, key, fingerprint, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, fingerprint, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _expire(self, now):
+        expired = [key for key, (expires_at, _, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        self.evictions += len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.exact_hits + self.near_hits + self.misses
+            return {
+                'version': self.version,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'max_distance': self.max_distance,
+                'max_thumbnail_distance': self.max_thumbnail_distance,
+                'exact_hits': self.exact_hits,
+                'near_hits': self.near_hits,
+                'near_rejected': self.near_rejected,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.exact_hits + self.near_hits) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,209 @@
+"""
+Entry-gate check-in from scanned attendee QR codes.
+
+Scans are resolved through ``UIDIndex``, an in-process UID -> attendee map
+that is loaded once and then only topped up with attendees created since
+the last refresh, so a scan costs a dict lookup plus one insert. Whether a
+scan is a first entry is decided by the database (see ``CheckIn``), which
+keeps double-entry detection right across gates and worker processes.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Attendee, CheckIn
+
+Entry = namedtuple('Entry', 'pk uid name company category')
+
+OK = 'ok'
+REPEAT = 'repeat'
+UNKNOWN = 'unknown'
+
+
+def parse_scan(text):
+    """
+    The UID in a scanned payload: the first line of the text ``qr_payload``
+    encodes, or a bare UID. None if it can't be one.
+    """
+    for line in (text or '').splitlines():
+        uid = line.strip().upper()
+        if uid:
+            return uid if len(uid) <= 16 and uid.isalnum() else None
+    return None
+
+
+class UIDIndex:
+    """
+    UID -> ``Entry`` for every attendee. ``refresh()`` loads only attendees
+    with an id above the last one seen; lookups refresh at most every
+    ``refresh_interval`` seconds, and straight away on a miss (the attendee
+    may have registered at another worker a moment ago).
+    """
+
+    def __init__(self, refresh_interval=5.0):
+        self.refresh_interval = refresh_interval
+        self._entries = {}
+        self._last_id = 0
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def refresh(self):
+        with self._lock:
+            rows = (Attendee.objects.filter(id__gt=self._last_id).order_by('id')
+                    .values_list('id', 'uid', 'name', 'company', 'category'))
+            for row in rows.iterator(chunk_size=5000):
+                entry = Entry(*row)
+                self._entries[entry.uid.upper()] = entry
+                self._last_id = entry.pk
+            self._refreshed_at = time.monotonic()
+            self.refreshes += 1
+
+    def get(self, uid):
+        if time.monotonic() - self._refreshed_at > self.refresh_interval:
+            self.refresh()
+        entry = self._entries.get(uid)
+        if entry is None:
+            self.refresh()
+            entry = self._entries.get(uid)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def discard(self, uid):
+        with self._lock:
+            self._entries.pop(uid, None)
+
+    def stats(self):
+        return {
+            'attendees': len(self._entries),
+            'refreshes': self.refreshes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+class Gatekeeper:
+    """
+    Records check-ins. Scans carrying a ``scan_id`` already recorded are
+    answered with the recorded outcome instead of being stored again (found
+    through the unique constraint, so new scans don't pay for a lookup); the
+    same badge read again at the same gate within ``debounce`` seconds counts
+    as the same scan.
+    """
+
+    def __init__(self, index, debounce=5.0):
+        self.index = index
+        self.debounce = debounce
+        self._entered = {}  # attendee pk -> (checked_in_at, gate) of the first entry
+        self._last_scan = {}  # attendee pk -> (monotonic time, gate, result)
+        self._lock = threading.Lock()
+        self.counts = {OK: 0, REPEAT: 0, UNKNOWN: 0}
+
+    def _result(self, status, entry, checkin, first=None):
+        result = {
+            'status': status,
+            'uid': entry.uid,
+            'name': entry.name,
+            'company': entry.company,
+            'category': entry.category,
+            'gate': checkin.gate,
+            'checked_in_at': checkin.checked_in_at.isoformat(),
+        }
+        if first is not None:
+            result['first_checked_in_at'] = first[0].isoformat()
+            result['first_gate'] = first[1]
+        return result
+
+    def _first_entry(self, entry):
+        first = self._entered.get(entry.pk)
+        if first is None:
+            first = (CheckIn.objects.filter(attendee_id=entry.pk, repeat=False)
+                     .values_list('checked_in_at', 'gate').first())
+            if first is not None:
+                self._entered[entry.pk] = first
+        return first
+
+    def _replay(self, entry, scan_id):
+        checkin = CheckIn.objects.filter(scan_id=scan_id).first()
+        if checkin is None:
+            return None
+        if checkin.attendee_id != entry.pk:
+            raise ValueError("scan_id was already used for another attendee")
+        if not checkin.repeat:
+            return dict(self._result(OK, entry, checkin), replayed=True)
+        return dict(self._result(REPEAT, entry, checkin, self._first_entry(entry)), replayed=True)
+
+    def _record(self, entry, gate, scan_id, now):
+        """Insert the check-in; returns ``(status, checkin)``."""
+        checkin = CheckIn(attendee_id=entry.pk, gate=gate, scan_id=scan_id, checked_in_at=now)
+        if entry.pk not in self._entered:
+            try:
+                with transaction.atomic():
+                    checkin.save()
+                self._entered[entry.pk] = (now, gate)
+                return OK, checkin
+            except IntegrityError:
+                # Already entered (possibly a moment ago at another gate)
+                checkin.pk = None
+        checkin.repeat = True
+        with transaction.atomic():
+            checkin.save()
+        return REPEAT, checkin
+
+    def check_in(self, uid, gate='', scan_id=None):
+        entry = self.index.get(uid)
+        if entry is None:
+            self.counts[UNKNOWN] += 1
+            return {'status': UNKNOWN, 'uid': uid}
+
+        with self._lock:
+            last = self._last_scan.get(entry.pk)
+        if last is not None and last[1] == gate and time.monotonic() - last[0] < self.debounce:
+            return dict(last[2], replayed=True)
+
+        try:
+            status, checkin = self._record(entry, gate, scan_id, timezone.now())
+        except IntegrityError:
+            # A retry of an already recorded scan_id, or the attendee was deleted
+            if scan_id:
+                replayed = self._replay(entry, scan_id)
+                if replayed is not None:
+                    return replayed
+            if not Attendee.objects.filter(pk=entry.pk).exists():
+                self.index.discard(uid)
+                self.counts[UNKNOWN] += 1
+                return {'status': UNKNOWN, 'uid': uid}
+            raise
+
+        first = self._first_entry(entry) if status == REPEAT else None
+        result = self._result(status, entry, checkin, first)
+        self.counts[status] += 1
+        with self._lock:
+            self._last_scan[entry.pk] = (time.monotonic(), gate, result)
+        return result
+
+    def stats(self):
+        return {'counts': dict(self.counts), 'index': self.index.stats()}
+
+
+_gatekeeper = None
+_gatekeeper_lock = threading.Lock()
+
+
+def get_gatekeeper():
+    global _gatekeeper
+    with _gatekeeper_lock:
+        if _gatekeeper is None:
+            index = UIDIndex(settings.OCR_CHECKIN_REFRESH)
+            index.refresh()
+            _gatekeeper = Gatekeeper(index, settings.OCR_CHECKIN_DEBOUNCE)
+    return _gatekeeper
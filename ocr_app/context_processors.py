@@ -0,0 +1,18 @@
+from django.conf import settings
+
+
+def upload_limits(request):
+    """Capture size and JPEG quality the card-capture page downscales to before uploading."""
+    return {
+        'upload_max_side': settings.OCR_UPLOAD_MAX_SIDE,
+        'upload_jpeg_quality': settings.OCR_UPLOAD_JPEG_QUALITY,
+    }
+
+
+def job_queue(request):
+    """Whether the card-capture page submits to the OCR job queue, and how long it waits for a result."""
+    return {
+        'use_job_queue': settings.OCR_USE_JOB_QUEUE,
+        'job_poll_wait': settings.OCR_JOB_LONG_POLL_MAX,
+        'job_client_deadline': settings.OCR_JOB_CLIENT_DEADLINE,
+    }
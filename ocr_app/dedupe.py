@@ -0,0 +1,83 @@
+"""
+Duplicate-attendee detection and UID allocation.
+
+Exact matches use the indexed ``phone_e164``/``email_norm`` columns; fuzzy
+matches first narrow the candidates through the ``AttendeeToken`` blocking
+index and only then compare names/companies, so a check costs a few indexed
+queries whatever the size of the attendee table.
+"""
+import secrets
+from difflib import SequenceMatcher
+
+from django.db.models import Count
+
+from .models import Attendee, AttendeeToken
+from .normalize import name_tokens, normalize_email, normalize_phone
+
+UID_ALPHABET = '0123456789ABCDEF'
+UID_LENGTH = 6
+
+# Fuzzy search: blocking candidates examined, and the similarity that counts
+MAX_CANDIDATES = 50
+SIMILARITY_THRESHOLD = 0.85
+
+
+def new_uids(count):
+    """
+    ``count`` distinct UIDs in the existing 6-character upper-hex format that
+    no attendee has yet (checked against the table in one query per round).
+    """
+    uids = set()
+    while len(uids) < count:
+        candidates = {''.join(secrets.choice(UID_ALPHABET) for _ in range(UID_LENGTH))
+                      for _ in range(count - len(uids))}
+        taken = set(Attendee.objects.filter(uid__in=candidates).values_list('uid', flat=True))
+        uids |= candidates - taken
+    return list(uids)[:count]
+
+
+def new_uid():
+    return new_uids(1)[0]
+
+
+def _similarity(a, b):
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def find_duplicates(name='', email='', phone='', company=''):
+    """
+    Existing attendees that look like the same person. Returns
+    ``{'exact': [...], 'similar': [(attendee, score), ...]}``: ``exact``
+    share the normalised phone or email, ``similar`` have a name/company
+    similarity of at least ``SIMILARITY_THRESHOLD``, best first.
+    """
+    exact = []
+    phone_e164 = normalize_phone(phone)
+    email_norm = normalize_email(email)
+    if phone_e164:
+        exact += list(Attendee.objects.filter(phone_e164=phone_e164))
+    if email_norm:
+        exact += [a for a in Attendee.objects.filter(email_norm=email_norm) if a not in exact]
+
+    similar = []
+    tokens = name_tokens(name, company)
+    if tokens and name:
+        # Candidates sharing most of the tokens, straight from the token index
+        needed = min(2, len(tokens))
+        candidate_ids = list(
+            AttendeeToken.objects.filter(token__in=tokens)
+            .values('attendee_id')
+            .annotate(shared=Count('id'))
+            .filter(shared__gte=needed)
+            .order_by('-shared')
+            .values_list('attendee_id', flat=True)[:MAX_CANDIDATES]
+        )
+        key = f"{name} {company}".lower().strip()
+        exact_ids = {a.pk for a in exact}
+        for attendee in Attendee.objects.filter(pk__in=candidate_ids).exclude(pk__in=exact_ids):
+            score = _similarity(key, f"{attendee.name} {attendee.company}".lower().strip())
+            if score >= SIMILARITY_THRESHOLD:
+                similar.append((attendee, round(score, 3)))
+        similar.sort(key=lambda pair: -pair[1])
+
+    return {'exact': exact, 'similar': similar}
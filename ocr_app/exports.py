@@ -0,0 +1,130 @@
+import csv
+import hashlib
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from openpyxl import Workbook
+
+from .models import Attendee, ExportCursor
+
+# Workbook column -> Attendee field, in the layout register_card used to write
+WORKBOOK_COLUMNS = {
+    'UID': 'uid',
+    'Name': 'name',
+    'Email': 'email',
+    'Phone': 'phone',
+    'Company': 'company',
+    'Designation': 'designation',
+    'Category': 'category',
+    'Address': 'address',
+    'QR_Code': 'qr_code',
+}
+
+EXPORT_COLUMNS = {**WORKBOOK_COLUMNS, 'Registered_At': 'created_at'}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def filter_attendees(category=None, date_from=None, date_to=None, after_id=None):
+    """
+    Attendees matching the export filters. ``date_from``/``date_to`` are
+    inclusive ``date`` objects; ``after_id`` skips rows already exported.
+    """
+    queryset = Attendee.objects.all()
+    if category:
+        queryset = queryset.filter(category=category)
+    if date_from:
+        queryset = queryset.filter(created_at__gte=_day_start(date_from))
+    if date_to:
+        queryset = queryset.filter(created_at__lt=_day_start(date_to + timedelta(days=1)))
+    if after_id:
+        queryset = queryset.filter(id__gt=after_id)
+    return queryset
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class ExportRun:
+    """
+    Iterates attendee rows in id order, ``chunk_size`` rows per query
+    (keyset pagination, so memory stays flat and no cursor is held open
+    between chunks). ``last_id`` tracks how far the run got.
+    """
+
+    def __init__(self, queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.queryset = queryset.order_by('id')
+        self.chunk_size = chunk_size
+        self.last_id = None
+        self.count = 0
+
+    def __iter__(self):
+        fields = ['id', *EXPORT_COLUMNS.values()]
+        after = 0
+        while True:
+            chunk = list(self.queryset.filter(id__gt=after).values_list(*fields)[:self.chunk_size])
+            if not chunk:
+                return
+            for row in chunk:
+                self.count += 1
+                yield [_cell(value) for value in row[1:]]
+            after = self.last_id = chunk[-1][0]
+
+
+def _cell(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    """Yield CSV text line by line, header first (with a BOM so Excel reads UTF-8)."""
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(list(EXPORT_COLUMNS))
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(rows, target):
+    """Write rows with openpyxl's write-only workbook, which keeps memory constant."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Attendees')
+    sheet.append(list(EXPORT_COLUMNS))
+    for row in rows:
+        sheet.append(row)
+    workbook.save(target)
+
+
+def cursor_name(name, category=None, date_from=None, date_to=None):
+    """
+    The cursor an incremental export with these filters advances. Each
+    filter set gets its own, so a filtered export never moves the position
+    of the unfiltered one past rows it didn't include.
+    """
+    filters = [f"{key}={value}" for key, value in
+               (('category', category), ('from', date_from), ('to', date_to)) if value]
+    if not filters:
+        return name
+    return f"{name}@{hashlib.sha1('&'.join(filters).encode()).hexdigest()[:10]}"
+
+
+def cursor_position(name):
+    return ExportCursor.objects.filter(name=name).values_list('last_id', flat=True).first() or 0
+
+
+def advance_cursor(name, last_id):
+    if last_id is not None:
+        ExportCursor.objects.update_or_create(name=name, defaults={'last_id': last_id})
+
+
+def export_workbook(path, queryset=None):
+    """Write attendees to an xlsx in the old business_cards.xlsx layout."""
+    run = ExportRun(Attendee.objects.all() if queryset is None else queryset)
+    write_xlsx(run, path)
+    return run.count
@@ -0,0 +1,22 @@
+"""
+TrueType fonts for rendered text (badge sheets, synthetic benchmark cards).
+Attendee names may be in Devanagari, so fonts with those glyphs come first.
+"""
+import os
+
+# Common locations of a font with Devanagari glyphs
+DEVANAGARI_FONTS = [
+    '/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf',
+    '/usr/share/fonts/opentype/noto/NotoSansDevanagari-Regular.ttf',
+    '/usr/share/fonts/truetype/lohit-devanagari/Lohit-Devanagari.ttf',
+    '/usr/share/fonts/truetype/freefont/FreeSans.ttf',
+    'C:/Windows/Fonts/Nirmala.ttf',
+]
+
+
+def find_font(path=None):
+    """``path`` if it exists, else the first installed font of ``DEVANAGARI_FONTS``; None if none is found."""
+    for candidate in [path, *DEVANAGARI_FONTS]:
+        if candidate and os.path.exists(candidate):
+            return candidate
+    return None
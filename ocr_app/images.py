@@ -0,0 +1,71 @@
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+from .metrics import timer
+
+logger = logging.getLogger(__name__)
+
+# Single background writer so saving uploads never blocks a request
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='upload-writer')
+
+
+# Content types accepted as a raw (non-form) card upload body
+IMAGE_CONTENT_TYPES = {'image/jpeg', 'image/png', 'image/webp', 'application/octet-stream'}
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+@timer('read_upload')
+def read_image_body(request, max_bytes):
+    """
+    The raw request body of an ``image/*`` upload, read straight from the
+    stream (no form parsing, so DATA_UPLOAD_MAX_MEMORY_SIZE doesn't apply).
+    Raises ``UploadTooLarge`` beyond ``max_bytes``.
+    """
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        length = 0
+    if length > max_bytes:
+        raise UploadTooLarge(f"Image larger than {max_bytes} bytes")
+    data = request.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise UploadTooLarge(f"Image larger than {max_bytes} bytes")
+    return data
+
+
+@timer('decode')
+def decode_image(image_bytes):
+    """Decode encoded image bytes (JPEG/PNG/...) straight into a BGR array."""
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Could not decode image")
+    return image
+
+
+def _save_upload(image_bytes, filename):
+    try:
+        FileSystemStorage().save(filename, ContentFile(image_bytes))
+    except Exception:
+        logger.exception("Could not save upload %s", filename)
+
+
+def save_upload_async(image_bytes, prefix='webcam'):
+    """
+    Persist the original upload off the request path when OCR_SAVE_UPLOADS
+    is on. Returns the file name it will be saved under, or None.
+    """
+    if not settings.OCR_SAVE_UPLOADS:
+        return None
+    filename = f"{prefix}_{uuid.uuid4().hex}.jpg"
+    _writer.submit(_save_upload, image_bytes, filename)
+    return filename
@@ -0,0 +1,202 @@
+"""
+Offline bulk ingestion of card images from a directory or zip file.
+
+Used by ``manage.py process_cards``. Worker processes load the models once
+and only run the pipeline; the parent writes results to the database in
+batches, so the ``IngestedCard`` rows double as the resume checkpoint.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import time
+import zipfile
+
+from django.db import close_old_connections, connections, transaction
+from django.urls import reverse
+
+from . import dedupe
+from .latency import summarize
+from .models import Attendee, AttendeeCounter, AttendeeToken, IngestedCard
+from .normalize import normalize_email, normalize_phone
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp'}
+STAGES = ('locate', 'preprocess', 'ocr', 'parse', 'total')
+
+
+def list_images(source):
+    """Sorted image names under a directory (relative paths) or inside a zip."""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            names = [info.filename for info in archive.infolist() if not info.is_dir()]
+    else:
+        names = [os.path.relpath(os.path.join(root, filename), source)
+                 for root, _, files in os.walk(source) for filename in files]
+    return sorted(name for name in names if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS)
+
+
+_archive = None
+
+
+def _read(source, name):
+    global _archive
+    if zipfile.is_zipfile(source):
+        if _archive is None:
+            _archive = zipfile.ZipFile(source)  # one handle per worker process
+        return _archive.read(name)
+    with open(os.path.join(source, name), 'rb') as fh:
+        return fh.read()
+
+
+def _init_worker():
+    # Workers never touch the database; load the models once per process
+    connections.close_all()
+    from .utils import warm_up_models
+    warm_up_models()
+
+
+def process_one(task):
+    """Pool worker: run one image through the pipeline. Returns a plain dict."""
+    from .images import decode_image
+    from .sidecar import retry_transient
+    from .utils import process_card
+
+    source, name = task
+    outcome = {'name': name, 'sha1': '', 'result': None, 'error': ''}
+    try:
+        image_bytes = _read(source, name)
+        outcome['sha1'] = hashlib.sha1(image_bytes).hexdigest()
+        # Wait out a busy or restarting inference sidecar instead of failing the card
+        result = retry_transient(process_card, decode_image(image_bytes))
+        outcome['result'] = {key: result[key] for key in ('data', 'timings', 'cropped', 'preprocess_tier')}
+    except Exception as exc:
+        outcome['error'] = f"{type(exc).__name__}: {exc}"
+    return outcome
+
+
+def needs_review(data):
+    """Nothing to contact the person by, or no name: keep it out of the attendee list."""
+    contact = data.get('primary_email') or data.get('primary_phone')
+    return not (contact and data.get('primary_name'))
+
+
+class Ingestion:
+    """
+    One ingestion batch. ``pending()`` lists the images not yet recorded for
+    the batch; ``run()`` processes them and writes attendees plus their
+    ``IngestedCard`` checkpoint rows every ``commit_every`` cards.
+    """
+
+    def __init__(self, source, batch, category='', commit_every=50):
+        self.source = source
+        self.batch = batch
+        self.category = category
+        self.commit_every = commit_every
+        self.timings = {stage: [] for stage in STAGES}
+        self._seen = set()  # normalised phones/emails created by this run
+        self.counts = {IngestedCard.DONE: 0, IngestedCard.REVIEW: 0, IngestedCard.FAILED: 0}
+
+    def _duplicate_of(self, data):
+        """What this card duplicates (an existing attendee or an earlier card of the run), or None."""
+        found = dedupe.find_duplicates(email=data.get('primary_email', ''), phone=data.get('primary_phone', ''))
+        if found['exact']:
+            return f"attendee {found['exact'][0].uid}"
+        keys = {normalize_phone(data.get('primary_phone', '')), normalize_email(data.get('primary_email', ''))}
+        if (keys - {''}) & self._seen:
+            return "an earlier card of this batch"
+        return None
+
+    def pending(self):
+        done = set(IngestedCard.objects.filter(batch=self.batch).values_list('name', flat=True))
+        return [name for name in list_images(self.source) if name not in done]
+
+    def _flush(self, outcomes):
+        cards = []
+        attendees = []
+        for outcome in outcomes:
+            card = IngestedCard(batch=self.batch, name=outcome['name'], sha1=outcome['sha1'])
+            if outcome['error']:
+                card.status, card.error = IngestedCard.FAILED, outcome['error']
+            else:
+                data = outcome['result']['data']
+                card.data = {key: value for key, value in data.items() if key != 'cascade'}
+                duplicate = self._duplicate_of(data)
+                if needs_review(data):
+                    card.status = IngestedCard.REVIEW
+                elif duplicate:
+                    card.status, card.error = IngestedCard.REVIEW, f"Duplicate of {duplicate}"
+                else:
+                    card.status = IngestedCard.DONE
+                    card.attendee = Attendee(
+                        name=data.get('primary_name', ''),
+                        email=data.get('primary_email', ''),
+                        phone=data.get('primary_phone', ''),
+                        designation=data.get('primary_designation', ''),
+                        company=data.get('primary_company', ''),
+                        address=data.get('address', ''),
+                        category=self.category,
+                    )
+                    card.attendee.normalize()
+                    self._seen.update(key for key in (card.attendee.phone_e164, card.attendee.email_norm) if key)
+                    attendees.append(card.attendee)
+            self.counts[card.status] += 1
+            cards.append(card)
+
+        close_old_connections()
+        for attendee, uid in zip(attendees, dedupe.new_uids(len(attendees))):
+            attendee.uid = uid
+            attendee.qr_code = reverse('attendee_qr', args=[uid, 'png'])
+        with transaction.atomic():
+            Attendee.objects.bulk_create(attendees)
+            AttendeeToken.index(attendees)
+            for card in cards:
+                if card.attendee is not None:
+                    card.attendee_id = card.attendee.pk
+            IngestedCard.objects.bulk_create(cards)
+            if attendees:
+                AttendeeCounter.increment(by=len(attendees))
+
+    def run(self, processes=None, progress=None):
+        """
+        Process the pending images across ``processes`` workers. ``progress``
+        is called as ``progress(done, total, cards_per_second)``.
+        """
+        names = self.pending()
+        tasks = [(self.source, name) for name in names]
+        buffer = []
+        done = 0
+        start = time.perf_counter()
+
+        connections.close_all()
+        with multiprocessing.Pool(processes, initializer=_init_worker) as pool:
+            for outcome in pool.imap_unordered(process_one, tasks):
+                if outcome['result']:
+                    for stage in STAGES:
+                        self.timings[stage].append(outcome['result']['timings'].get(stage, 0.0))
+                buffer.append(outcome)
+                done += 1
+                if len(buffer) >= self.commit_every:
+                    self._flush(buffer)
+                    buffer = []
+                if progress:
+                    progress(done, len(tasks), done / (time.perf_counter() - start))
+        if buffer:
+            self._flush(buffer)
+
+        seconds = time.perf_counter() - start
+        return {
+            'processed': done,
+            'seconds': round(seconds, 2),
+            'cards_per_second': round(done / seconds, 2) if seconds else None,
+            'counts': dict(self.counts),
+            'stages': {stage: summarize(samples) for stage, samples in self.timings.items() if samples},
+        }
+
+    def review_list(self):
+        """Failed and needs-review images of the whole batch, for manual entry."""
+        return (IngestedCard.objects.filter(batch=self.batch)
+                .exclude(status=IngestedCard.DONE)
+                .order_by('name')
+                .values_list('name', 'status', 'error'))
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OCRJob
+from .images import decode_image
+from .sidecar import InferenceBusy, InferenceUnavailable
+from .utils import process_card
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """Raised when the OCR job queue is at OCR_JOB_MAX_QUEUE."""
+
+
+def queue_depth():
+    return OCRJob.objects.filter(status=OCRJob.QUEUED).count()
+
+
+def submit_job(image_bytes, priority=0):
+    if queue_depth() >= settings.OCR_JOB_MAX_QUEUE:
+        raise QueueFull(f"OCR queue is full ({settings.OCR_JOB_MAX_QUEUE} jobs waiting)")
+    return OCRJob.objects.create(image=image_bytes, priority=priority)
+
+
+def claim_next_job(worker_id):
+    """
+    Atomically move the highest-priority queued job to RUNNING and return it.
+    The conditional UPDATE makes concurrent workers safe without row locks,
+    which SQLite doesn't have.
+    """
+    while True:
+        candidate = (
+            OCRJob.objects.filter(status=OCRJob.QUEUED)
+            .order_by('-priority', 'created_at')
+            .values_list('pk', flat=True)
+            .first()
+        )
+        if candidate is None:
+            return None
+        claimed = OCRJob.objects.filter(pk=candidate, status=OCRJob.QUEUED).update(
+            status=OCRJob.RUNNING,
+            worker=worker_id,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return OCRJob.objects.get(pk=candidate)
+
+
+def requeue_stale_jobs():
+    """Put back jobs whose worker died mid-run; give up after OCR_JOB_MAX_ATTEMPTS."""
+    cutoff = timezone.now() - timedelta(seconds=settings.OCR_JOB_STALE_AFTER)
+    stale = OCRJob.objects.filter(status=OCRJob.RUNNING, started_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=settings.OCR_JOB_MAX_ATTEMPTS).update(
+        status=OCRJob.FAILED, error="Worker timed out", finished_at=timezone.now(), image=b'',
+    )
+    requeued = stale.update(status=OCRJob.QUEUED, worker='', started_at=None)
+    return requeued, failed
+
+
+def run_job(job):
+    def on_stage(stage):
+        if stage == 'ocr':
+            job.ocr_done_at = timezone.now()
+
+    try:
+        image = decode_image(bytes(job.image))
+        job.result = process_card(image, on_stage=on_stage)
+        job.status = OCRJob.DONE
+    except (InferenceBusy, InferenceUnavailable) as exc:
+        if timezone.now() - job.created_at < timedelta(seconds=settings.OCR_JOB_RETRY_FOR):
+            # The sidecar is saturated or restarting: put the job back rather than fail it,
+            # without counting the run against OCR_JOB_MAX_ATTEMPTS
+            logger.warning("OCR job %s re-queued: %s", job.pk, exc)
+            OCRJob.objects.filter(pk=job.pk).update(
+                status=OCRJob.QUEUED, worker='', started_at=None, ocr_done_at=None, attempts=F('attempts') - 1)
+            job.status = OCRJob.QUEUED
+            return job
+        logger.error("OCR job %s failed: %s", job.pk, exc)
+        job.status = OCRJob.FAILED
+        job.error = str(exc)
+    except Exception as exc:
+        logger.exception("OCR job %s failed", job.pk)
+        job.status = OCRJob.FAILED
+        job.error = str(exc)
+
+    job.finished_at = timezone.now()
+    job.image = b''
+    job.save()
+    return job
+
+
+def worker_loop(worker_id, stop_event, poll_interval=0.5, max_backoff=10.0):
+    """
+    Process jobs until ``stop_event`` is set. Runs inside a worker process.
+    Backs off exponentially while jobs come back re-queued (inference busy).
+    """
+    logger.info("OCR worker %s started", worker_id)
+    backoff = 0.0
+    while not stop_event.is_set():
+        close_old_connections()
+        job = claim_next_job(worker_id)
+        if job is None:
+            stop_event.wait(poll_interval)
+            continue
+        if run_job(job).status == OCRJob.QUEUED:
+            backoff = min(max(backoff * 2, poll_interval), max_backoff)
+            stop_event.wait(backoff)
+        else:
+            backoff = 0.0
+    logger.info("OCR worker %s stopped", worker_id)
+
+
+async def await_job(job_id, timeout, poll_interval=0.25):
+    """
+    Long-poll helper: return the job once it is finished or ``timeout``
+    elapses. Sleeps on the event loop, so under ASGI a waiting poller doesn't
+    hold the thread the worker's sync views share.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        job = await OCRJob.objects.defer('image').aget(pk=job_id)
+        if job.status in (OCRJob.DONE, OCRJob.FAILED) or time.monotonic() >= deadline:
+            return job
+        await asyncio.sleep(poll_interval)
+
+
+def _ahead_of(job):
+    return Q(priority__gt=job.priority) | Q(priority=job.priority, created_at__lt=job.created_at)
+
+
+def job_payload(job):
+    payload = {
+        'job_id': str(job.pk),
+        'status': job.status,
+        'priority': job.priority,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'ocr_done_at': job.ocr_done_at,
+        'finished_at': job.finished_at,
+    }
+    if job.status == OCRJob.QUEUED:
+        payload['queue_position'] = OCRJob.objects.filter(_ahead_of(job), status=OCRJob.QUEUED).count() + 1
+    elif job.status == OCRJob.DONE:
+        payload['result'] = job.result
+    elif job.status == OCRJob.FAILED:
+        payload['error'] = job.error
+    return payload
@@ -0,0 +1,29 @@
+"""
+Latency summaries of timing samples, shared by the pipeline benchmark, bulk
+ingestion and the NER backend comparison.
+"""
+import platform
+import resource
+
+import numpy as np
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if platform.system() == 'Darwin' else peak / 1024
+
+
+def summarize(samples):
+    """Percentiles, mean and throughput of ``samples`` (seconds), plus this process's peak RSS."""
+    ms = np.array(samples) * 1000
+    total = float(np.sum(samples))
+    return {
+        'n': len(samples),
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'max_ms': round(float(ms.max()), 3),
+        'mean_ms': round(float(ms.mean()), 3),
+        'throughput_per_s': round(len(samples) / total, 3) if total else None,
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+    }
@@ -0,0 +1,86 @@
+import numpy as np
+
+
+class CardLayout:
+    """
+    Array-backed OCR layout of one card: per recognised line its text, box
+    (x1, y1, x2, y2), recognition score and estimated font size, plus a
+    top-to-bottom, left-to-right reading order.
+
+    Lets extractors look at just the region they care about (largest-font
+    lines for the name, the bottom block for the address) and skip
+    low-confidence lines.
+    """
+
+    __slots__ = ('texts', 'boxes', 'scores', 'font_sizes', 'order')
+
+    def __init__(self, texts, boxes, scores):
+        self.texts = list(texts)
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.scores = np.asarray(scores, dtype=np.float32)
+        self.font_sizes = self.boxes[:, 3] - self.boxes[:, 1]
+        self.order = self._reading_order()
+
+    @classmethod
+    def from_pages(cls, pages):
+        """Build from PaddleOCR result pages (``rec_texts``/``rec_scores``/``rec_boxes``)."""
+        texts, boxes, scores = [], [], []
+        for page in pages:
+            rec_texts = page.get('rec_texts', [])
+            rec_scores = page.get('rec_scores', [])
+            rec_boxes = page.get('rec_boxes', [])
+            rec_polys = page.get('rec_polys', [])
+            for i, text in enumerate(rec_texts):
+                texts.append(text)
+                scores.append(float(rec_scores[i]) if i < len(rec_scores) else 0.0)
+                if i < len(rec_boxes):
+                    boxes.append(np.asarray(rec_boxes[i], dtype=np.float32)[:4])
+                elif i < len(rec_polys):
+                    poly = np.asarray(rec_polys[i], dtype=np.float32)
+                    boxes.append([*poly.min(axis=0), *poly.max(axis=0)])
+                else:
+                    boxes.append([0, 0, 0, 0])
+        return cls(texts, boxes, scores)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _reading_order(self):
+        if not len(self.texts):
+            return np.zeros(0, dtype=np.int32)
+        centers = (self.boxes[:, 1] + self.boxes[:, 3]) / 2
+        # Lines whose centres are within half a typical line height share a row
+        row_height = max(float(np.median(self.font_sizes)) / 2, 1.0)
+        rows = np.round(centers / row_height)
+        return np.lexsort((self.boxes[:, 0], rows)).astype(np.int32)
+
+    def confident(self, min_score):
+        """Line texts in OCR order, skipping those scored below ``min_score``."""
+        return [text for text, score in zip(self.texts, self.scores) if score >= min_score]
+
+    def largest_font(self, count=3, min_score=0.0):
+        """Texts of the ``count`` confident lines with the tallest glyphs."""
+        candidates = np.flatnonzero(self.scores >= min_score)
+        ranked = candidates[np.argsort(-self.font_sizes[candidates], kind='stable')]
+        return [self.texts[i] for i in ranked[:count]]
+
+    def bottom_block(self, fraction=0.45, min_score=0.0):
+        """Confident lines, in reading order, whose centre is in the lowest ``fraction`` of the text area."""
+        if not len(self.texts):
+            return []
+        top, bottom = self.boxes[:, 1].min(), self.boxes[:, 3].max()
+        cutoff = bottom - (bottom - top) * fraction
+        centers = (self.boxes[:, 1] + self.boxes[:, 3]) / 2
+        return [self.texts[i] for i in self.order if centers[i] >= cutoff and self.scores[i] >= min_score]
+
+    def to_dict(self):
+        """Plain lists (ints for boxes) so results can be cached or stored as JSON."""
+        return {
+            'texts': self.texts,
+            'boxes': self.boxes.round().astype(np.int32).ravel().tolist(),
+            'scores': [round(float(score), 4) for score in self.scores],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['texts'], data['boxes'], data['scores'])
@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+
+# Contours are searched on a copy whose longest side is this many pixels
+DETECT_SIDE = 480
+# The card must cover this fraction of the frame to be trusted
+MIN_AREA = 0.15
+MAX_AREA = 0.97
+
+
+def _order_corners(quad):
+    """Top-left, top-right, bottom-right, bottom-left."""
+    quad = quad.reshape(4, 2).astype(np.float32)
+    sums = quad.sum(axis=1)
+    diffs = np.diff(quad, axis=1).ravel()
+    return np.array([
+        quad[np.argmin(sums)],
+        quad[np.argmin(diffs)],
+        quad[np.argmax(sums)],
+        quad[np.argmax(diffs)],
+    ], dtype=np.float32)
+
+
+def locate_card(img):
+    """
+    Corners of the card in a webcam frame (ordered TL, TR, BR, BL, in
+    full-resolution pixels), or None when no plausible card outline is found.
+    Works on a small edge map, so it costs a few milliseconds per frame.
+    """
+    h, w = img.shape[:2]
+    scale = min(1.0, DETECT_SIDE / max(h, w))
+    small = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else img
+    gray = small if small.ndim == 2 else cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+
+    # The card is the largest closed outline against the table
+    edges = cv2.Canny(gray, 50, 150)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8), iterations=2)
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+
+    frame_area = gray.shape[0] * gray.shape[1]
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:3]:
+        area = cv2.contourArea(contour)
+        if not MIN_AREA * frame_area <= area <= MAX_AREA * frame_area:
+            continue
+        quad = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(quad) != 4 or not cv2.isContourConvex(quad):
+            # Rounded corners or a finger over an edge: fall back to the bounding rectangle
+            quad = cv2.boxPoints(cv2.minAreaRect(contour))
+        return _order_corners(quad) / scale
+    return None
+
+
+def warp_card(img, corners):
+    """Perspective-correct the quad ``corners`` into an upright rectangle."""
+    tl, tr, br, bl = corners
+    width = int(round(max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))))
+    height = int(round(max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))))
+    target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(corners, target)
+    return cv2.warpPerspective(img, matrix, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def crop_card(img):
+    """Returns ``(image, found)``: the warped card, or the untouched frame when no card was found."""
+    corners = locate_card(img)
+    if corners is None:
+        return img, False
+    return warp_card(img, corners), True
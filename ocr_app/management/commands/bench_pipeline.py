@@ -0,0 +1,85 @@
+import json
+import os
+import platform
+import sys
+
+import cv2
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ocr_app import benchmarks
+from ocr_app.utils import PIPELINE_VERSION
+
+
+class Command(BaseCommand):
+    help = "Benchmark each card-pipeline stage on a synthetic corpus and optionally compare with a baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=27, help="Number of synthetic cards")
+        parser.add_argument('--seed', type=int, default=1234)
+        parser.add_argument('--repeat', type=int, default=1, help="Timed runs per card and stage")
+        parser.add_argument('--stages', nargs='+',
+                            choices=[*benchmarks.IMAGE_STAGES, *(name for name, _ in benchmarks.TEXT_STAGES)],
+                            help="Subset of stages (default: all)")
+        parser.add_argument('--preprocess-tier', default='none', choices=['none', 'fast', 'full', 'auto'])
+        parser.add_argument('--font', help="TTF with Devanagari glyphs (auto-detected if omitted)")
+        parser.add_argument('--output', default='bench_results.json')
+        parser.add_argument('--compare', metavar='BASELINE', help="Flag regressions against this results file")
+        parser.add_argument('--tolerance', type=float, default=0.15, help="Allowed fractional slowdown")
+        parser.add_argument('--min-delta-ms', type=float, default=0.5,
+                            help="Ignore latency changes smaller than this")
+        parser.add_argument('--save-corpus', metavar='DIR', help="Also write the rendered cards as PNGs")
+
+    def handle(self, *args, **options):
+        corpus, font = benchmarks.build_corpus(options['size'], options['seed'], options['font'])
+        if font is None:
+            self.stderr.write(self.style.WARNING(
+                "No Devanagari font found; Devanagari lines will render as boxes. Pass --font."))
+        if options['save_corpus']:
+            self._save_corpus(corpus, options['save_corpus'])
+
+        report = benchmarks.run(corpus, options['stages'], options['repeat'],
+                                options['preprocess_tier'], settings.OCR_MAX_SIDE)
+        report['meta'] = {
+            'created_at': timezone.now().isoformat(),
+            'pipeline_version': PIPELINE_VERSION,
+            'corpus_size': len(corpus),
+            'seed': options['seed'],
+            'repeat': options['repeat'],
+            'font': font,
+            'preprocess_tier': options['preprocess_tier'],
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+        }
+
+        with open(options['output'], 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, ensure_ascii=False)
+
+        self.stdout.write(f"{'stage':<22}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'per s':>10}{'rss MB':>10}")
+        for stage, row in report['stages'].items():
+            self.stdout.write(f"{stage:<22}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['max_ms']:>10.1f}"
+                              f"{row['throughput_per_s'] or 0:>10.1f}{row['peak_rss_mb']:>10.1f}")
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as fh:
+                    baseline = json.load(fh)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline {options['compare']}: {exc}")
+            regressions = benchmarks.compare(report, baseline, options['tolerance'], options['min_delta_ms'])
+            for stage, metric, before, after in regressions:
+                self.stdout.write(self.style.ERROR(f"REGRESSION {stage} {metric}: {before} -> {after}"))
+            if regressions:
+                sys.exit(1)
+            self.stdout.write(self.style.SUCCESS(f"No regressions beyond {options['tolerance']:.0%}"))
+
+    def _save_corpus(self, corpus, directory):
+        os.makedirs(directory, exist_ok=True)
+        for sample in corpus:
+            name = f"{sample['id']:04d}_{sample['language']}_n{sample['noise']}_r{sample['rotation']}_{sample['width']}"
+            cv2.imwrite(os.path.join(directory, name + '.png'), sample['image'])
+            with open(os.path.join(directory, name + '.txt'), 'w', encoding='utf-8') as fh:
+                fh.write(sample['text'])
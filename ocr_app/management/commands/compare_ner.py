@@ -0,0 +1,68 @@
+import json
+import platform
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from ocr_app import ner, ner_eval
+
+
+class Command(BaseCommand):
+    help = "Compare NER backends on a labelled card set: PER/ORG/LOC F1 next to latency and memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', nargs='+', choices=list(ner.BACKENDS), default=list(ner.BACKENDS))
+        parser.add_argument('--labelled', metavar='JSONL',
+                            help="Labelled cards ({\"text\", \"entities\": {\"PER\", \"ORG\", \"LOC\"}} per line); "
+                                 "default: synthetic benchmark cards")
+        parser.add_argument('--size', type=int, default=60, help="Number of synthetic cards")
+        parser.add_argument('--seed', type=int, default=1234)
+        parser.add_argument('--repeat', type=int, default=1, help="Timed runs per card")
+        parser.add_argument('--model', default=settings.OCR_NER_MODEL,
+                            help="Override every backend's default model")
+        parser.add_argument('--output', default='ner_comparison.json')
+
+    def handle(self, *args, **options):
+        if options['labelled']:
+            try:
+                cards = ner_eval.load_labelled(options['labelled'])
+            except (OSError, ValueError, KeyError) as exc:
+                raise CommandError(f"Cannot read labelled cards from {options['labelled']}: {exc}")
+        else:
+            cards = ner_eval.synthetic_labelled(options['size'], options['seed'])
+        if not cards:
+            raise CommandError("No labelled cards to evaluate")
+
+        # Children are forked; don't let them share the DB connection
+        connections.close_all()
+        results = ner_eval.compare_backends(options['backends'], cards, options['model'],
+                                            settings.OCR_NER_ONNX_DIR, options['repeat'])
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'cards': len(cards),
+                'labelled': options['labelled'] or 'synthetic',
+                'seed': options['seed'],
+                'repeat': options['repeat'],
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'processor': platform.processor(),
+            },
+            'backends': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, ensure_ascii=False)
+
+        self.stdout.write(f"{'backend':<10}{'PER F1':>8}{'ORG F1':>8}{'LOC F1':>8}{'micro':>8}"
+                          f"{'p50 ms':>10}{'p95 ms':>10}{'load s':>8}{'model MB':>10}")
+        for row in results:
+            if 'error' in row:
+                self.stdout.write(self.style.ERROR(f"{row['backend']:<10}{row['error']}"))
+                continue
+            s = row['scores']
+            self.stdout.write(f"{row['backend']:<10}{s['PER']['f1']:>8.3f}{s['ORG']['f1']:>8.3f}{s['LOC']['f1']:>8.3f}"
+                              f"{s['micro']['f1']:>8.3f}{row['latency']['p50_ms']:>10.1f}"
+                              f"{row['latency']['p95_ms']:>10.1f}{row['load_seconds']:>8.1f}{row['model_rss_mb']:>10.1f}")
+        self.stdout.write(f"Results written to {options['output']}")
@@ -0,0 +1,52 @@
+import os
+import sys
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ocr_app.exports import (ExportRun, advance_cursor, cursor_name, cursor_position, filter_attendees, stream_csv,
+                             write_xlsx)
+
+
+class Command(BaseCommand):
+    help = "Export attendees to CSV or XLSX in constant memory, optionally only rows added since the last export."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=os.path.join(settings.MEDIA_ROOT, 'business_cards.xlsx'),
+                            help="Target file; '-' writes CSV to stdout")
+        parser.add_argument('--format', choices=['csv', 'xlsx'], help="Defaults to the output file extension")
+        parser.add_argument('--category')
+        parser.add_argument('--from', dest='date_from', type=date.fromisoformat, help="YYYY-MM-DD, inclusive")
+        parser.add_argument('--to', dest='date_to', type=date.fromisoformat, help="YYYY-MM-DD, inclusive")
+        parser.add_argument('--since-last', action='store_true',
+                            help="Only attendees added since the previous --since-last export "
+                                 "with this cursor and the same filters")
+        parser.add_argument('--cursor', default='default', help="Name of the incremental export cursor")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        output = options['output']
+        fmt = options['format'] or ('csv' if output == '-' else os.path.splitext(output)[1].lstrip('.').lower())
+        if fmt not in ('csv', 'xlsx'):
+            raise CommandError("Use --format csv or xlsx")
+        if output == '-' and fmt != 'csv':
+            raise CommandError("Only CSV can be written to stdout")
+
+        # Each filter set has its own cursor (see exports.cursor_name)
+        cursor = cursor_name(options['cursor'], options['category'], options['date_from'], options['date_to'])
+        after_id = cursor_position(cursor) if options['since_last'] else None
+        queryset = filter_attendees(options['category'], options['date_from'], options['date_to'], after_id)
+        run = ExportRun(queryset, chunk_size=options['chunk_size'])
+
+        if fmt == 'xlsx':
+            write_xlsx(run, output)
+        elif output == '-':
+            sys.stdout.writelines(stream_csv(run))
+        else:
+            with open(output, 'w', newline='', encoding='utf-8') as fh:
+                fh.writelines(stream_csv(run))
+
+        if options['since_last']:
+            advance_cursor(cursor, run.last_id)
+        self.stderr.write(self.style.SUCCESS(f"Exported {run.count} attendee(s) to {output}"))
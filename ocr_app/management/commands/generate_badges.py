@@ -0,0 +1,56 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from ocr_app import badges
+from ocr_app.exports import filter_attendees
+
+
+class Command(BaseCommand):
+    help = "Render print-ready multi-up badge sheets for attendees (or a workbook) across a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Directory for the sheet files (re-run to resume)")
+        parser.add_argument('--from-xlsx', metavar='PATH', help="Take attendees from this workbook instead")
+        parser.add_argument('--category', help="Only attendees of this category")
+        parser.add_argument('--format', choices=['pdf', 'png'], default='pdf')
+        parser.add_argument('--columns', type=int, default=2, help="Badges across an A4 sheet")
+        parser.add_argument('--rows', type=int, default=4, help="Badges down an A4 sheet")
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 2)
+        parser.add_argument('--font', help="TTF with Devanagari glyphs (auto-detected if omitted)")
+        parser.add_argument('--restart', action='store_true', help="Discard sheets from a previous run")
+
+    def handle(self, *args, **options):
+        if options['from_xlsx']:
+            try:
+                records = badges.spreadsheet_records(options['from_xlsx'])
+            except (OSError, ValueError, KeyError) as exc:
+                raise CommandError(f"Cannot read {options['from_xlsx']}: {exc}")
+            if options['category']:
+                records = [r for r in records if r['category'] == options['category']]
+        else:
+            records = badges.attendee_records(filter_attendees(options['category']))
+        if not records:
+            raise CommandError("No attendees to render")
+
+        run = badges.BadgeRun(records, options['output'], options['format'],
+                              options['columns'], options['rows'], options['font'])
+        if run.font_path is None:
+            self.stderr.write(self.style.WARNING("No Devanagari font found; using Pillow's default font. Pass --font."))
+
+        def progress(done, total, rate):
+            self.stdout.write(f"\r{done}/{total} sheets, {rate:.1f} badges/s", ending='')
+            self.stdout.flush()
+
+        # Workers are separate processes; they must not inherit the DB connection
+        connections.close_all()
+        try:
+            summary = run.run(options['processes'], options['restart'], progress)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['badges']} badge(s) on {summary['rendered']} sheet(s) in {summary['seconds']}s "
+            f"({summary['badges_per_second'] or 0} badges/s); {summary['skipped']} sheet(s) already done "
+            f"-> {options['output']}"))
@@ -0,0 +1,54 @@
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ocr_app.exports import WORKBOOK_COLUMNS
+from ocr_app.models import Attendee, AttendeeCounter, AttendeeToken
+
+class Command(BaseCommand):
+    help = "One-shot import of a business_cards.xlsx registry into the Attendee table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help="Workbook(s) to import")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help="Parse and count without writing")
+
+    def handle(self, *args, **options):
+        known = set(Attendee.objects.values_list('uid', flat=True))
+        total_created = 0
+
+        for path in options['paths']:
+            try:
+                df = pd.read_excel(path, dtype=str).fillna('')
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {path}: {exc}")
+            df.columns = df.columns.str.strip()
+            df.rename(columns={'QR Code': 'QR_Code'}, inplace=True)
+            if 'UID' not in df.columns:
+                raise CommandError(f"{path} has no UID column")
+
+            rows = []
+            skipped = 0
+            for record in df.to_dict('records'):
+                uid = str(record.get('UID', '')).strip().upper()
+                if not uid or uid in known:
+                    skipped += 1
+                    continue
+                known.add(uid)
+                fields = {field: str(record.get(column, '')).strip() for column, field in WORKBOOK_COLUMNS.items()}
+                fields['uid'] = uid
+                attendee = Attendee(**fields)
+                attendee.normalize()
+                rows.append(attendee)
+
+            if not options['dry_run']:
+                with transaction.atomic():
+                    Attendee.objects.bulk_create(rows, batch_size=options['batch_size'])
+                    AttendeeToken.index(rows)
+            total_created += len(rows)
+            self.stdout.write(f"{path}: {len(rows)} imported, {skipped} skipped (blank or existing UID)")
+
+        if not options['dry_run']:
+            AttendeeCounter.recalculate()
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would import' if options['dry_run'] else 'Imported'} {total_created} attendee(s)"))
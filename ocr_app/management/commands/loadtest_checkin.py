@@ -0,0 +1,77 @@
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from ocr_app.models import Attendee
+from ocr_app.qr import qr_payload
+
+
+class Command(BaseCommand):
+    help = "Fire QR check-in scans at a running server and report scans/s and latency percentiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/checkin/', help="Check-in endpoint")
+        parser.add_argument('--scans', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=16, help="Scanners sending at the same time")
+        parser.add_argument('--gates', type=int, default=4)
+        parser.add_argument('--repeat-rate', type=float, default=0.1,
+                            help="Fraction of scans re-using an already scanned badge (double entry)")
+        parser.add_argument('--unknown-rate', type=float, default=0.01, help="Fraction of scans of unknown badges")
+        parser.add_argument('--token', default='', help="X-Checkin-Token to send")
+        parser.add_argument('--seed', type=int, default=1234)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        attendees = list(Attendee.objects.order_by('?')[:options['scans']])
+        if not attendees:
+            raise CommandError("No attendees to scan; register or import some first")
+
+        payloads = []
+        scanned = []
+        for i in range(options['scans']):
+            roll = rng.random()
+            if roll < options['unknown_rate']:
+                payloads.append(f" ZZ{i:04X}\nNobody")
+            elif scanned and (roll < options['unknown_rate'] + options['repeat_rate'] or i >= len(attendees)):
+                payloads.append(rng.choice(scanned))
+            else:
+                scanned.append(qr_payload(attendees[i]))
+                payloads.append(scanned[-1])
+
+        local = threading.local()
+        headers = {'X-Checkin-Token': options['token']} if options['token'] else {}
+
+        def scan(payload):
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = requests.Session()
+            fields = {'payload': payload, 'gate': f"gate-{rng.randint(1, options['gates'])}",
+                      'scan_id': uuid.uuid4().hex}
+            start = time.perf_counter()
+            try:
+                response = session.post(options['url'], data=fields, headers=headers, timeout=30)
+                outcome = response.json().get('status') or f"http {response.status_code}"
+            except (requests.RequestException, ValueError) as exc:
+                outcome = type(exc).__name__
+            return outcome, time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(scan, payloads))
+        seconds = time.perf_counter() - start
+
+        latencies = np.array([latency for _, latency in results]) * 1000
+        outcomes = Counter(outcome for outcome, _ in results)
+        self.stdout.write(', '.join(f"{outcome}: {count}" for outcome, count in sorted(outcomes.items())))
+        self.stdout.write(f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        self.stdout.write(''.join(f"{np.percentile(latencies, q):>10.1f}" for q in (50, 95, 99, 100)))
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(results)} scans in {seconds:.2f}s with {options['concurrency']} scanners: "
+            f"{len(results) / seconds:.1f} scans/s"))
@@ -0,0 +1,53 @@
+import csv
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ocr_app.ingest import Ingestion
+
+
+class Command(BaseCommand):
+    help = "Bulk-ingest a directory or zip of card images into attendees using a pool of OCR worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="Directory (searched recursively) or .zip of card images")
+        parser.add_argument('--batch', help="Batch name used for resuming (default: the source's base name)")
+        parser.add_argument('--category', default='', help="Category given to the created attendees")
+        parser.add_argument('--processes', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                            help="Worker processes (each loads its own models)")
+        parser.add_argument('--commit-every', type=int, default=50, help="Cards per database write/checkpoint")
+        parser.add_argument('--review', default='review.csv',
+                            help="Where to write the failed/needs-review images of the batch")
+
+    def handle(self, *args, **options):
+        source = options['source']
+        if not os.path.exists(source):
+            raise CommandError(f"{source} does not exist")
+        batch = options['batch'] or os.path.splitext(os.path.basename(os.path.normpath(source)))[0]
+
+        ingestion = Ingestion(source, batch, options['category'], options['commit_every'])
+        pending = len(ingestion.pending())
+        self.stdout.write(f"Batch '{batch}': {pending} image(s) to process")
+
+        def progress(done, total, rate):
+            self.stdout.write(f"\r{done}/{total} cards, {rate:.2f} cards/s", ending='')
+            self.stdout.flush()
+
+        summary = ingestion.run(options['processes'], progress)
+        self.stdout.write('')
+
+        self.stdout.write(f"{'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+        for stage, row in summary['stages'].items():
+            self.stdout.write(f"{stage:<12}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['mean_ms']:>10.1f}")
+
+        review = list(ingestion.review_list())
+        with open(options['review'], 'w', newline='', encoding='utf-8') as fh:
+            writer = csv.writer(fh)
+            writer.writerow(['image', 'status', 'error'])
+            writer.writerows(review)
+
+        counts = summary['counts']
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['processed']} card(s) in {summary['seconds']}s ({summary['cards_per_second'] or 0} cards/s): "
+            f"{counts['done']} attendee(s) created, {counts['review']} need review, {counts['failed']} failed. "
+            f"{len(review)} image(s) of the batch listed in {options['review']}"))
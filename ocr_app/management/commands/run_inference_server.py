@@ -0,0 +1,52 @@
+import json
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ocr_app.sidecar import InferenceServer
+from ocr_app.utils import registry
+
+
+class Command(BaseCommand):
+    help = ("Serve the OCR/NER models to the web workers over a Unix socket "
+            "(point them at it with OCR_INFERENCE_SOCKET).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--socket', default=settings.OCR_INFERENCE_SOCKET,
+                            help="Socket path (default: OCR_INFERENCE_SOCKET)")
+        parser.add_argument('--max-inflight', type=int, default=settings.OCR_INFERENCE_MAX_INFLIGHT,
+                            help="Requests run at once")
+        parser.add_argument('--max-queued', type=int, default=settings.OCR_INFERENCE_MAX_QUEUED,
+                            help="Requests that may wait for a slot; more are answered busy")
+        parser.add_argument('--queue-wait', type=float, default=settings.OCR_INFERENCE_QUEUE_WAIT,
+                            help="Seconds a request waits for a slot before it is answered busy")
+
+    def handle(self, *args, **options):
+        path = options['socket']
+        if not path:
+            raise CommandError("No socket path; pass --socket or set OCR_INFERENCE_SOCKET")
+
+        # Warm before listening, so the first web request doesn't pay for the load
+        status = registry.warm_up()
+        self.stdout.write(json.dumps(status, indent=2))
+        if not registry.is_ready():
+            raise CommandError("One or more models failed to warm up")
+
+        server = InferenceServer(path, options['max_inflight'], options['max_queued'], options['queue_wait'])
+
+        def shutdown(signum, frame):
+            # serve_forever() must be stopped from another thread
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        self.stdout.write(self.style.SUCCESS(f"Serving inference on {path} (max {options['max_inflight']} in flight, "
+                                             f"{options['max_queued']} queued)"))
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+        self.stdout.write(f"Stopped after {server.served} request(s), {server.rejected} rejected as busy")
@@ -0,0 +1,86 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_main(worker_id, stop_event, poll_interval):
+    # Children must not reuse the parent's DB connection
+    connections.close_all()
+    # The parent stops them through stop_event; don't inherit its signal handlers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    from ocr_app.jobs import worker_loop
+    from ocr_app.utils import warm_up_models
+
+    warm_up_models()
+    worker_loop(worker_id, stop_event, poll_interval)
+
+
+class Command(BaseCommand):
+    help = "Run a pool of local OCR worker processes that drain the OCRJob queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                            help="Number of worker processes (each loads its own models)")
+        parser.add_argument('--poll-interval', type=float, default=0.5,
+                            help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--stale-check', type=float, default=30.0,
+                            help="Seconds between checks for jobs orphaned by a crashed worker")
+
+    def handle(self, *args, **options):
+        from ocr_app.jobs import requeue_stale_jobs
+
+        stop_event = multiprocessing.Event()
+        host = socket.gethostname()
+        workers = {}
+
+        def spawn(slot):
+            worker_id = f"{host}:{os.getpid()}:{slot}"
+            process = multiprocessing.Process(
+                target=_worker_main, args=(worker_id, stop_event, options['poll_interval']),
+                name=f"ocr-worker-{slot}", daemon=True,
+            )
+            process.start()
+            workers[slot] = process
+
+        stopping = []
+
+        def shutdown(signum, frame):
+            # Only flag it here: setting stop_event from a signal handler deadlocks when the
+            # main thread is inside stop_event.wait() (the handler needs the lock wait() holds)
+            stopping.append(signum)
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        connections.close_all()
+        for slot in range(options['processes']):
+            spawn(slot)
+        self.stdout.write(f"Started {options['processes']} OCR worker(s)")
+
+        last_stale_check = 0.0
+        while not stopping:
+            if time.monotonic() - last_stale_check >= options['stale_check']:
+                requeued, failed = requeue_stale_jobs()
+                if requeued or failed:
+                    logger.warning("Requeued %d stale job(s), failed %d", requeued, failed)
+                last_stale_check = time.monotonic()
+            for slot, process in list(workers.items()):
+                if not process.is_alive() and not stopping:
+                    logger.warning("OCR worker %s exited with %s, restarting", slot, process.exitcode)
+                    spawn(slot)
+            time.sleep(1.0)
+
+        stop_event.set()
+        for process in workers.values():
+            process.join(timeout=30)
+        self.stdout.write("OCR workers stopped")
@@ -0,0 +1,23 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ocr_app.utils import registry
+
+
+class Command(BaseCommand):
+    help = "Load the OCR/NER models and run a dummy inference (downloads weights on first run)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help=f"Models to warm (default: all of {registry.names()})")
+
+    def handle(self, *args, **options):
+        names = options['models'] or None
+        unknown = set(names or []) - set(registry.names())
+        if unknown:
+            raise CommandError(f"Unknown model(s): {', '.join(sorted(unknown))}")
+
+        status = registry.warm_up(names)
+        self.stdout.write(json.dumps(status, indent=2))
+        if not registry.is_ready(names):
+            raise CommandError("One or more models failed to warm up")
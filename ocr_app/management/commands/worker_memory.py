@@ -0,0 +1,50 @@
+import os
+
+import psutil
+from django.core.management.base import BaseCommand, CommandError
+
+MB = 1024 * 1024
+
+
+class Command(BaseCommand):
+    help = ("Per-process memory of a running gunicorn server (master and workers): RSS, PSS and USS, "
+            "to size MODEL_MEMORY_MB / WORKER_MEMORY_MB in gunicorn.conf.py.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pid', type=int, help="Master pid (default: read from --pidfile)")
+        parser.add_argument('--pidfile', default=os.environ.get('GUNICORN_PIDFILE', '/tmp/iceexpo-gunicorn.pid'))
+
+    def handle(self, *args, **options):
+        pid = options['pid']
+        if pid is None:
+            try:
+                with open(options['pidfile']) as fh:
+                    pid = int(fh.read().strip())
+            except (OSError, ValueError):
+                raise CommandError(f"No gunicorn pid in {options['pidfile']}; pass --pid")
+        try:
+            master = psutil.Process(pid)
+            processes = [('master', master)] + [('worker', child) for child in master.children()]
+        except psutil.NoSuchProcess:
+            raise CommandError(f"No process {pid}")
+
+        self.stdout.write(f"{'role':<8}{'pid':>8}{'rss MB':>10}{'pss MB':>10}{'uss MB':>10}{'shared MB':>11}")
+        rows = []
+        for role, process in processes:
+            try:
+                info = process.memory_full_info()
+            except psutil.AccessDenied:
+                raise CommandError(f"Not allowed to read the memory of pid {process.pid}; run as its user")
+            rows.append((role, info))
+            self.stdout.write(f"{role:<8}{process.pid:>8}{info.rss / MB:>10.1f}{info.pss / MB:>10.1f}"
+                              f"{info.uss / MB:>10.1f}{info.shared / MB:>11.1f}")
+
+        workers = [info for role, info in rows if role == 'worker']
+        total_pss = sum(info.pss for _, info in rows)
+        if workers:
+            self.stdout.write(
+                f"{len(workers)} worker(s): mean USS {sum(i.uss for i in workers) / len(workers) / MB:.1f} MB "
+                f"(WORKER_MEMORY_MB), mean RSS {sum(i.rss for i in workers) / len(workers) / MB:.1f} MB")
+        self.stdout.write(self.style.SUCCESS(
+            f"Master RSS {rows[0][1].rss / MB:.1f} MB (~MODEL_MEMORY_MB); whole server (sum of PSS) "
+            f"{total_pss / MB:.1f} MB"))
@@ -0,0 +1,105 @@
+"""
+In-process stage timers and histograms, rendered in the Prometheus text
+format by ``views.metrics``. Timings made while a request is being served are
+also collected for its ``Server-Timing`` header (see ``middleware``).
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import ContextDecorator
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Stage timings of the request being served, as [(stage, seconds)], or None
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds, one series per label value."""
+
+    def __init__(self, name, help_text, label, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self._series = {}  # label value -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(value)
+            if series is None:
+                series = self._series[value] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += seconds
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {value: list(counts) for value, counts in sorted(self._series.items())}
+        for value, counts in series.items():
+            label = f'{self.label}="{value}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            cumulative += counts[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label}}} {counts[-1]:.6f}')
+            lines.append(f'{self.name}_count{{{label}}} {cumulative}')
+        return lines
+
+
+stage_seconds = Histogram('iceexpo_stage_seconds', "Time spent in each card pipeline stage.", 'stage')
+request_seconds = Histogram('iceexpo_request_seconds', "Time to serve each view.", 'view')
+
+
+def observe(stage, seconds):
+    """Record one stage duration (histogram and current request's Server-Timing)."""
+    stage_seconds.observe(stage, seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+class timer(ContextDecorator):
+    """
+    Time a block (``with timer('ocr') as t:``; ``t.seconds`` afterwards) or
+    every call of a function (``@timer('extract_name')``).
+    """
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.seconds = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self._start
+        observe(self.stage, self.seconds)
+        return False
+
+    def _recreate_cm(self):
+        # A fresh instance per decorated call, so recursive and concurrent calls keep their own start
+        return type(self)(self.stage)
+
+
+def start_request():
+    """Begin collecting stage timings for the current request; returns the reset token."""
+    return _request_timings.set([])
+
+
+def finish_request(token):
+    """Stop collecting and return the ``[(stage, seconds)]`` recorded since ``start_request``."""
+    timings = _request_timings.get() or []
+    _request_timings.reset(token)
+    return timings
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(stage_seconds.render() + request_seconds.render()) + "\n"
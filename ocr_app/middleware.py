@@ -0,0 +1,57 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from . import metrics
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a ``Server-Timing`` header listing the pipeline stages timed while
+    serving the request (repeated stages are summed) plus the total, and
+    records the view's latency for the metrics endpoint. Works in both the
+    WSGI and the ASGI handler, so async views stay async.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            total = time.perf_counter() - start
+            timings = metrics.finish_request(token)
+        return self._add_header(request, response, timings, total)
+
+    async def __acall__(self, request):
+        token = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            total = time.perf_counter() - start
+            timings = metrics.finish_request(token)
+        return self._add_header(request, response, timings, total)
+
+    def _add_header(self, request, response, timings, total):
+        match = getattr(request, 'resolver_match', None)
+        metrics.request_seconds.observe(match.view_name if match else 'unresolved', total)
+
+        stages = {}
+        for stage, seconds in timings:
+            stages[stage] = stages.get(stage, 0.0) + seconds
+        entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in stages.items()]
+        entries.append(f"total;dur={total * 1000:.1f}")
+        response['Server-Timing'] = ", ".join(entries)
+        return response
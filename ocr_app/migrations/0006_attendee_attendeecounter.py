@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-17 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ocr_app', '0005_ocrjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Attendee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uid', models.CharField(max_length=16, unique=True)),
+                ('name', models.CharField(blank=True, max_length=200)),
+                ('email', models.CharField(blank=True, db_index=True, max_length=254)),
+                ('phone', models.CharField(blank=True, db_index=True, max_length=32)),
+                ('company', models.CharField(blank=True, max_length=200)),
+                ('designation', models.CharField(blank=True, max_length=200)),
+                ('category', models.CharField(blank=True, db_index=True, max_length=50)),
+                ('address', models.TextField(blank=True)),
+                ('qr_code', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AttendeeCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
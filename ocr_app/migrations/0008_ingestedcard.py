@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 13:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ocr_app', '0007_exportcursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestedCard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch', models.CharField(max_length=100)),
+                ('name', models.CharField(max_length=255)),
+                ('sha1', models.CharField(blank=True, max_length=40)),
+                ('status', models.CharField(choices=[('done', 'Done'), ('review', 'Needs review'), ('failed', 'Failed')], max_length=10)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('attendee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='ocr_app.attendee')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('batch', 'name'), name='ingestedcard_batch_name_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.7 on 2026-10-17 13:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from ocr_app.normalize import name_tokens, normalize_email, normalize_phone
+
+
+def backfill(apps, schema_editor):
+    Attendee = apps.get_model('ocr_app', 'Attendee')
+    AttendeeToken = apps.get_model('ocr_app', 'AttendeeToken')
+    batch = []
+    for attendee in Attendee.objects.only('id', 'name', 'company', 'phone', 'email').iterator(chunk_size=2000):
+        attendee.phone_e164 = normalize_phone(attendee.phone)
+        attendee.email_norm = normalize_email(attendee.email)
+        batch.append(attendee)
+        if len(batch) >= 2000:
+            _write(Attendee, AttendeeToken, batch)
+            batch = []
+    _write(Attendee, AttendeeToken, batch)
+
+
+def _write(Attendee, AttendeeToken, batch):
+    Attendee.objects.bulk_update(batch, ['phone_e164', 'email_norm'])
+    AttendeeToken.objects.bulk_create([
+        AttendeeToken(attendee_id=attendee.pk, token=token[:64])
+        for attendee in batch
+        for token in name_tokens(attendee.name, attendee.company)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ocr_app', '0008_ingestedcard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendee',
+            name='email_norm',
+            field=models.CharField(blank=True, db_index=True, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='attendee',
+            name='phone_e164',
+            field=models.CharField(blank=True, db_index=True, max_length=20),
+        ),
+        migrations.CreateModel(
+            name='AttendeeToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(db_index=True, max_length=64)),
+                ('attendee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='ocr_app.attendee')),
+            ],
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations
+
+# Columns of the attendee table mirrored into the FTS5 index
+FTS_COLUMNS = 'uid, name, company, phone, phone_e164, email'
+
+CREATE = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS ocr_app_attendee_fts USING fts5("
+    f"{FTS_COLUMNS}, content='ocr_app_attendee', content_rowid='id', tokenize='trigram')",
+    # Keep the index in sync with every insert, update and delete (bulk_create included)
+    f"CREATE TRIGGER IF NOT EXISTS ocr_app_attendee_fts_ai AFTER INSERT ON ocr_app_attendee BEGIN "
+    f"INSERT INTO ocr_app_attendee_fts(rowid, {FTS_COLUMNS}) "
+    f"VALUES (new.id, new.uid, new.name, new.company, new.phone, new.phone_e164, new.email); END",
+    f"CREATE TRIGGER IF NOT EXISTS ocr_app_attendee_fts_ad AFTER DELETE ON ocr_app_attendee BEGIN "
+    f"INSERT INTO ocr_app_attendee_fts(ocr_app_attendee_fts, rowid, {FTS_COLUMNS}) "
+    f"VALUES ('delete', old.id, old.uid, old.name, old.company, old.phone, old.phone_e164, old.email); END",
+    f"CREATE TRIGGER IF NOT EXISTS ocr_app_attendee_fts_au AFTER UPDATE ON ocr_app_attendee BEGIN "
+    f"INSERT INTO ocr_app_attendee_fts(ocr_app_attendee_fts, rowid, {FTS_COLUMNS}) "
+    f"VALUES ('delete', old.id, old.uid, old.name, old.company, old.phone, old.phone_e164, old.email); "
+    f"INSERT INTO ocr_app_attendee_fts(rowid, {FTS_COLUMNS}) "
+    f"VALUES (new.id, new.uid, new.name, new.company, new.phone, new.phone_e164, new.email); END",
+    "INSERT INTO ocr_app_attendee_fts(ocr_app_attendee_fts) VALUES ('rebuild')",
+]
+
+DROP = [
+    "DROP TRIGGER IF EXISTS ocr_app_attendee_fts_ai",
+    "DROP TRIGGER IF EXISTS ocr_app_attendee_fts_ad",
+    "DROP TRIGGER IF EXISTS ocr_app_attendee_fts_au",
+    "DROP TABLE IF EXISTS ocr_app_attendee_fts",
+]
+
+
+def _run(statements):
+    def apply(apps, schema_editor):
+        # FTS5 is SQLite only; other backends fall back to LIKE search (ocr_app.search)
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ocr_app', '0009_attendee_dedupe'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE), _run(DROP)),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 13:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ocr_app', '0010_attendee_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckIn',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gate', models.CharField(blank=True, max_length=50)),
+                ('scan_id', models.CharField(blank=True, max_length=64, null=True, unique=True)),
+                ('repeat', models.BooleanField(default=False)),
+                ('checked_in_at', models.DateTimeField(db_index=True)),
+                ('attendee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkins', to='ocr_app.attendee')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('repeat', False)), fields=('attendee',), name='checkin_first_entry_uniq')],
+            },
+        ),
+    ]
@@ -1,5 +1,11 @@
+import uuid
+
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
+from django.db.models import F
+
+from .normalize import name_tokens, normalize_email, normalize_phone
+
 
 class BusinessCardManager(BaseUserManager):
     def create_user(self, email=None, phone=None, password=None, **extra_fields):
@@ -51,3 +57,187 @@ class BusinessCard(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.name or f"Card {self.id}"
+
+
+class OCRJob(models.Model):
+    """A card image waiting for (or done with) OCR in the background worker pool."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    priority = models.SmallIntegerField(default=0)  # higher runs first
+    image = models.BinaryField(blank=True)  # cleared once the job finishes
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=64, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    # Stage timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    ocr_done_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-priority', 'created_at'], name='ocrjob_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"OCR job {self.id} ({self.status})"
+
+
+class Attendee(models.Model):
+    """A registered visitor. Replaces the rows of media/business_cards.xlsx."""
+    uid = models.CharField(max_length=16, unique=True)
+    name = models.CharField(max_length=200, blank=True)
+    email = models.CharField(max_length=254, blank=True, db_index=True)
+    phone = models.CharField(max_length=32, blank=True, db_index=True)
+    company = models.CharField(max_length=200, blank=True)
+    designation = models.CharField(max_length=200, blank=True)
+    category = models.CharField(max_length=50, blank=True, db_index=True)
+    address = models.TextField(blank=True)
+    qr_code = models.CharField(max_length=100, blank=True)  # QR endpoint URL (path under MEDIA_ROOT for old rows)
+
+    # Normalised copies for duplicate detection (see ocr_app.dedupe)
+    phone_e164 = models.CharField(max_length=20, blank=True, db_index=True)
+    email_norm = models.CharField(max_length=254, blank=True, db_index=True)
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.uid} {self.name}".strip()
+
+    def normalize(self):
+        """Fill the normalised phone/email; bulk_create callers must call this themselves."""
+        self.phone_e164 = normalize_phone(self.phone)
+        self.email_norm = normalize_email(self.email)
+
+    def save(self, *args, **kwargs):
+        self.normalize()
+        super().save(*args, **kwargs)
+        AttendeeToken.index([self])
+
+
+class AttendeeToken(models.Model):
+    """
+    Blocking index for fuzzy duplicate search: one row per name/company
+    token of an attendee, so candidates are found with an indexed lookup
+    instead of comparing against every attendee.
+    """
+    attendee = models.ForeignKey(Attendee, on_delete=models.CASCADE, related_name='tokens')
+    token = models.CharField(max_length=64, db_index=True)
+
+    @classmethod
+    def index(cls, attendees):
+        """(Re)build the tokens of saved ``attendees``."""
+        cls.objects.filter(attendee__in=[a.pk for a in attendees]).delete()
+        cls.objects.bulk_create([
+            cls(attendee_id=attendee.pk, token=token[:64])
+            for attendee in attendees
+            for token in name_tokens(attendee.name, attendee.company)
+        ])
+
+    def __str__(self):
+        return f"{self.token} -> {self.attendee_id}"
+
+
+class AttendeeCounter(models.Model):
+    """
+    Single-row running total of attendees, so pages can show the count
+    without a COUNT(*) over the whole table.
+    """
+    total = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def increment(cls, by=1):
+        """Call inside the transaction that created the attendee(s)."""
+        if not cls.objects.filter(pk=1).update(total=F('total') + by):
+            # First use: seed from the table, which already holds the new rows
+            cls.objects.get_or_create(pk=1, defaults={'total': Attendee.objects.count()})
+
+    @classmethod
+    def current(cls):
+        total = cls.objects.filter(pk=1).values_list('total', flat=True).first()
+        if total is None:
+            total = cls.recalculate()
+        return total
+
+    @classmethod
+    def recalculate(cls):
+        total = Attendee.objects.count()
+        cls.objects.update_or_create(pk=1, defaults={'total': total})
+        return total
+
+
+class ExportCursor(models.Model):
+    """Last attendee id handed out by a named incremental export."""
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
+
+
+class IngestedCard(models.Model):
+    """
+    One image of a bulk ingestion batch (``manage.py process_cards``). Rows
+    are the checkpoint: a resumed run skips every image already recorded.
+    """
+    DONE = 'done'
+    REVIEW = 'review'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (DONE, 'Done'),
+        (REVIEW, 'Needs review'),
+        (FAILED, 'Failed'),
+    ]
+
+    batch = models.CharField(max_length=100)
+    name = models.CharField(max_length=255)  # path inside the directory or zip
+    sha1 = models.CharField(max_length=40, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    attendee = models.ForeignKey(Attendee, blank=True, null=True, on_delete=models.SET_NULL)
+    data = models.JSONField(blank=True, default=dict)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['batch', 'name'], name='ingestedcard_batch_name_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.batch}/{self.name} ({self.status})"
+
+
+class CheckIn(models.Model):
+    """
+    One accepted gate scan. The first entry of an attendee has
+    ``repeat=False`` (at most one such row, enforced by the database); later
+    scans are recorded with ``repeat=True`` so double entry shows up.
+    """
+    attendee = models.ForeignKey(Attendee, on_delete=models.CASCADE, related_name='checkins')
+    gate = models.CharField(max_length=50, blank=True)
+    scan_id = models.CharField(max_length=64, unique=True, blank=True, null=True)  # scanner's idempotency key
+    repeat = models.BooleanField(default=False)
+    checked_in_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['attendee'], condition=models.Q(repeat=False),
+                                    name='checkin_first_entry_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.attendee_id} @ {self.gate or '-'} {self.checked_in_at:%H:%M:%S}"
@@ -0,0 +1,77 @@
+"""
+Selectable NER backends. Every loader returns a callable with the interface
+of the transformers token-classification pipeline,
+``backend(text_or_texts, aggregation_strategy="simple", batch_size=...)``
+returning ``entity_group``/``word``/``start``/``end``/``score`` dicts, so the
+extractors and the micro-batcher work the same whichever one is configured.
+"""
+import os
+
+DEFAULT_MODEL = "Davlan/xlm-roberta-large-ner-hrl"
+# Distilled multilingual model trained on the same HRL data and label set
+SMALL_MODEL = "Davlan/distilbert-base-multilingual-cased-ner-hrl"
+
+
+def load_hf(model_name=None, **options):
+    """The plain fp32 transformers pipeline (the original setup)."""
+    from transformers import pipeline
+    return pipeline("ner", model=model_name or DEFAULT_MODEL, aggregation_strategy="simple")
+
+
+def load_hf_int8(model_name=None, **options):
+    """Same model with its Linear layers dynamically quantized to int8 (CPU only)."""
+    import torch
+    from transformers import AutoModelForTokenClassification, AutoTokenizer, pipeline
+
+    model_name = model_name or DEFAULT_MODEL
+    model = AutoModelForTokenClassification.from_pretrained(model_name)
+    model = torch.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("ner", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name),
+                    aggregation_strategy="simple")
+
+
+def load_onnx(model_name=None, onnx_dir=None, **options):
+    """
+    ONNX Runtime export of the model (needs ``optimum[onnxruntime]``). The
+    export is written to a subdirectory of ``onnx_dir`` named after the
+    model on first load and reused afterwards, so changing the model
+    re-exports instead of serving the old one.
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForTokenClassification
+    except ImportError as exc:
+        raise RuntimeError("The 'onnx' NER backend needs optimum[onnxruntime] installed") from exc
+    from transformers import AutoTokenizer, pipeline
+
+    model_name = model_name or DEFAULT_MODEL
+    export_dir = onnx_dir and os.path.join(onnx_dir, model_name.replace('/', '--'))
+    if export_dir and os.path.exists(os.path.join(export_dir, 'model.onnx')):
+        model = ORTModelForTokenClassification.from_pretrained(export_dir)
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        model = ORTModelForTokenClassification.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        if export_dir:
+            model.save_pretrained(export_dir)
+            tokenizer.save_pretrained(export_dir)
+    return pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
+
+
+def load_small(model_name=None, **options):
+    """A smaller multilingual model through the plain pipeline."""
+    return load_hf(model_name or SMALL_MODEL)
+
+
+BACKENDS = {
+    'hf': load_hf,
+    'hf-int8': load_hf_int8,
+    'onnx': load_onnx,
+    'small': load_small,
+}
+
+
+def load_backend(name, model_name=None, **options):
+    """Load NER backend ``name`` (see ``BACKENDS``); ``model_name`` overrides its default model."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown NER backend: {name} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name](model_name or None, **options)
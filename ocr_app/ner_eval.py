@@ -0,0 +1,155 @@
+"""
+Latency/accuracy comparison of the NER backends in ``ner.py``.
+
+Used by ``manage.py compare_ner``. Each backend is loaded in its own forked
+process so its memory footprint is measured in isolation.
+"""
+import json
+import multiprocessing
+import queue
+import random
+import re
+import time
+
+import psutil
+
+from . import benchmarks, ner
+from .latency import summarize
+from .utils import NER_GROUPS
+
+GROUPS = ('PER', 'ORG', 'LOC')
+
+
+def load_labelled(path):
+    """
+    Cards from a JSON-lines file, one ``{"text": ..., "entities": {"PER":
+    [...], "ORG": [...], "LOC": [...]}}`` object per line.
+    """
+    cards = []
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            if line.strip():
+                card = json.loads(line)
+                cards.append({'text': card['text'], 'entities': card.get('entities', {})})
+    return cards
+
+
+def synthetic_labelled(size, seed=1234):
+    """Labelled cards from the benchmark generator: name as PER, company as ORG, city as LOC."""
+    rng = random.Random(seed)
+    cards = []
+    for i in range(size):
+        lines = benchmarks.card_lines(rng, benchmarks.LANGUAGES[i % len(benchmarks.LANGUAGES)])
+        cards.append({
+            'text': "\n".join(lines),
+            'entities': {'PER': [lines[0]], 'ORG': [lines[2]], 'LOC': [lines[7].split()[0]]},
+        })
+    return cards
+
+
+def _normalize(word):
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', ' ', word)).strip().lower()
+
+
+def _entity_set(entities):
+    return {(group, _normalize(word)) for group, words in entities.items() for word in words if _normalize(word)}
+
+
+def predicted_entities(raw_entities):
+    """Group raw pipeline output into ``{'PER': [...], 'ORG': [...], 'LOC': [...]}``."""
+    grouped = {group: [] for group in GROUPS}
+    for ent in raw_entities:
+        group = NER_GROUPS.get(ent.get('entity_group', '').upper())
+        if group in grouped:
+            grouped[group].append(ent['word'])
+    return grouped
+
+
+def score(cards, predictions):
+    """Precision/recall/F1 per entity group and micro-averaged, matching normalised entity strings."""
+    counts = {group: {'tp': 0, 'fp': 0, 'fn': 0} for group in GROUPS}
+    for card, predicted in zip(cards, predictions):
+        gold = _entity_set(card['entities'])
+        found = _entity_set(predicted)
+        for group in GROUPS:
+            gold_group = {item for item in gold if item[0] == group}
+            found_group = {item for item in found if item[0] == group}
+            counts[group]['tp'] += len(gold_group & found_group)
+            counts[group]['fp'] += len(found_group - gold_group)
+            counts[group]['fn'] += len(gold_group - found_group)
+
+    def prf(tp, fp, fn):
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        return {'precision': round(precision, 4), 'recall': round(recall, 4), 'f1': round(f1, 4)}
+
+    result = {group: prf(**counts[group]) for group in GROUPS}
+    result['micro'] = prf(*(sum(c[key] for c in counts.values()) for key in ('tp', 'fp', 'fn')))
+    return result
+
+
+def evaluate_backend(name, cards, model_name=None, onnx_dir=None, repeat=1):
+    """Load one backend and run every card through it; returns latency, memory and F1."""
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    load_start = time.perf_counter()
+    backend = ner.load_backend(name, model_name, onnx_dir=onnx_dir)
+    backend("Rahul Sharma, Acme Pvt Ltd, Pune")
+    load_seconds = time.perf_counter() - load_start
+    rss_loaded = process.memory_info().rss
+
+    samples = []
+    predictions = []
+    for card in cards:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            raw = backend(card['text'])
+            samples.append(time.perf_counter() - start)
+        predictions.append(predicted_entities(raw))
+
+    return {
+        'backend': name,
+        'model': model_name or '',
+        'load_seconds': round(load_seconds, 3),
+        'model_rss_mb': round((rss_loaded - rss_before) / (1024 * 1024), 1),
+        'rss_mb': round(process.memory_info().rss / (1024 * 1024), 1),
+        'latency': summarize(samples),
+        'scores': score(cards, predictions),
+    }
+
+
+def _evaluate_child(results, *args):
+    try:
+        results.put(evaluate_backend(*args))
+    except Exception as exc:
+        results.put({'backend': args[0], 'error': f"{type(exc).__name__}: {exc}"})
+
+
+def _child_result(results, child, name, poll_interval=1.0):
+    """The child's result; an error entry if it dies without one (e.g. killed for memory)."""
+    while True:
+        try:
+            return results.get(timeout=poll_interval)
+        except queue.Empty:
+            if child.is_alive():
+                continue
+        # It may have exited right after putting the result
+        try:
+            return results.get(timeout=poll_interval)
+        except queue.Empty:
+            return {'backend': name, 'error': f"Evaluation process exited with code {child.exitcode}"}
+
+
+def compare_backends(names, cards, model_name=None, onnx_dir=None, repeat=1):
+    """Evaluate each backend in a fresh child process, one after another."""
+    ctx = multiprocessing.get_context('fork')
+    results = []
+    for name in names:
+        child_results = ctx.Queue()
+        child = ctx.Process(target=_evaluate_child,
+                            args=(child_results, name, cards, model_name, onnx_dir, repeat))
+        child.start()
+        results.append(_child_result(child_results, child, name))
+        child.join()
+    return results
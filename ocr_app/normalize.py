@@ -0,0 +1,38 @@
+import re
+
+import phonenumbers
+
+# Tokens that say nothing about who a person or company is
+STOP_TOKENS = {
+    'pvt', 'private', 'ltd', 'limited', 'llp', 'inc', 'co', 'corp', 'company', 'the', 'and', 'of',
+    'mr', 'mrs', 'ms', 'dr', 'shri', 'smt',
+}
+_TOKEN_SPLIT_RE = re.compile(r"[\s.,;:/\\\-&()'\"|_+]+")
+
+
+def normalize_phone(raw, region="IN"):
+    """E.164 form of a phone number (the check ``extract_phones`` applies), or '' if it isn't valid."""
+    cleaned = re.sub(r'[^\d\+]', '', raw or '')
+    if not cleaned:
+        return ''
+    try:
+        match = phonenumbers.parse(cleaned, region)
+    except phonenumbers.NumberParseException:
+        return ''
+    if not phonenumbers.is_valid_number(match):
+        return ''
+    return phonenumbers.format_number(match, phonenumbers.PhoneNumberFormat.E164)
+
+
+def normalize_email(raw):
+    return (raw or '').strip().lower()
+
+
+def name_tokens(*values):
+    """Lower-cased blocking tokens of names/company names, without stop words and single letters."""
+    tokens = set()
+    for value in values:
+        for token in _TOKEN_SPLIT_RE.split((value or '').lower()):
+            if len(token) >= 2 and token not in STOP_TOKENS:
+                tokens.add(token)
+    return tokens
@@ -0,0 +1,111 @@
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import qrcode
+import qrcode.image.svg
+from django.conf import settings
+
+from .metrics import timer
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+# Background pre-rendering so the first badge print doesn't pay for encoding
+_renderer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='qr-renderer')
+
+
+def qr_payload(attendee):
+    """Text encoded in an attendee's QR code (same layout the PNGs were written with)."""
+    return (
+        f" {attendee.uid}\n"
+        f"{attendee.name}\n {attendee.email}\n {attendee.phone}\n"
+        f" {attendee.designation}\n {attendee.category}\n"
+        f" {attendee.company}\n {attendee.address}"
+    )
+
+
+def qr_etag(payload, fmt):
+    return hashlib.sha1(f"{fmt}:{payload}".encode()).hexdigest()[:20]
+
+
+def render(payload, fmt):
+    """Encode ``payload`` as a PNG or a compact single-path SVG."""
+    buffer = io.BytesIO()
+    with timer('qr'):
+        if fmt == 'svg':
+            qrcode.make(payload, image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+        else:
+            qrcode.make(payload).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class QRCache:
+    """In-memory LRU of rendered QR images keyed by format and payload ETag."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (fmt, etag) -> bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, payload, fmt):
+        """Returns ``(image_bytes, etag)``, rendering on a miss."""
+        key = (fmt, qr_etag(payload, fmt))
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return image, key[1]
+            self.misses += 1
+
+        image = render(payload, fmt)
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = image
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return image, key[1]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_qr_cache = None
+
+
+def get_qr_cache():
+    global _qr_cache
+    if _qr_cache is None:
+        _qr_cache = QRCache(settings.OCR_QR_CACHE_SIZE)
+    return _qr_cache
+
+
+def _prerender(payload):
+    try:
+        for fmt in FORMATS:
+            get_qr_cache().get(payload, fmt)
+    except Exception:
+        logger.exception("Could not pre-render QR code")
+
+
+def prerender_async(attendee):
+    """Warm the QR cache for a new attendee off the request path when OCR_QR_PRERENDER is on."""
+    if settings.OCR_QR_PRERENDER:
+        _renderer.submit(_prerender, qr_payload(attendee))
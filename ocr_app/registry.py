@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Loads heavy models on first use instead of at import time.
+
+    Each model is registered with a loader and an optional warm-up callable
+    that runs a dummy inference. ``warm_up()`` is meant to be called once per
+    worker at start-up; ``status()`` feeds the readiness endpoint.
+    """
+
+    UNLOADED = 'unloaded'
+    LOADING = 'loading'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader, warmup=None):
+        with self._lock:
+            self._entries[name] = {
+                'loader': loader,
+                'warmup': warmup,
+                'model': None,
+                'state': self.UNLOADED,
+                'load_seconds': None,
+                'warm_seconds': None,
+                'error': '',
+                'lock': threading.Lock(),
+            }
+
+    def names(self):
+        return list(self._entries)
+
+    def get(self, name):
+        entry = self._entries[name]
+        if entry['state'] == self.READY:
+            return entry['model']
+
+        with entry['lock']:
+            if entry['state'] != self.READY:
+                self._load(name, entry)
+        return entry['model']
+
+    def _load(self, name, entry):
+        entry['state'] = self.LOADING
+        start = time.perf_counter()
+        try:
+            entry['model'] = entry['loader']()
+        except Exception as exc:
+            entry['state'] = self.FAILED
+            entry['error'] = str(exc)
+            logger.exception("Failed to load model %s", name)
+            raise
+        entry['load_seconds'] = time.perf_counter() - start
+        entry['error'] = ''
+        entry['state'] = self.READY
+        logger.info("Loaded model %s in %.2fs", name, entry['load_seconds'])
+
+    def preload(self, names=None):
+        """
+        Load the models without running any inference, e.g. in a server's
+        master process before it forks workers (which then share the weights
+        copy-on-write and run ``warm_up()`` themselves).
+        """
+        for name in names or self.names():
+            try:
+                self.get(name)
+            except Exception:
+                logger.exception("Preload failed for model %s", name)
+        return self.status()
+
+    def warm_up(self, names=None):
+        """Load each model and run its dummy inference. Returns ``status()``."""
+        for name in names or self.names():
+            entry = self._entries[name]
+            try:
+                model = self.get(name)
+                if entry['warmup'] and entry['warm_seconds'] is None:
+                    start = time.perf_counter()
+                    entry['warmup'](model)
+                    entry['warm_seconds'] = time.perf_counter() - start
+            except Exception:
+                logger.exception("Warm-up failed for model %s", name)
+        return self.status()
+
+    def warm_up_in_background(self, names=None):
+        thread = threading.Thread(target=self.warm_up, args=(names,), name='model-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self, names=None):
+        """True once every model is loaded and has finished its warm-up."""
+        return all(self._is_warm(self._entries[name]) for name in names or self.names())
+
+    def _is_warm(self, entry):
+        if entry['state'] != self.READY:
+            return False
+        return entry['warmup'] is None or entry['warm_seconds'] is not None
+
+    def status(self):
+        return {
+            name: {
+                'state': entry['state'],
+                'warm': self._is_warm(entry),
+                'load_seconds': entry['load_seconds'],
+                'warm_seconds': entry['warm_seconds'],
+                'error': entry['error'],
+            }
+            for name, entry in self._entries.items()
+        }
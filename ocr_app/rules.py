@@ -0,0 +1,147 @@
+import re
+from collections import deque
+from functools import lru_cache
+
+# Keyword rules: tag -> (keywords, whole-word only). Matching is on the
+# lower-cased line; whole-word rules follow the same boundary rule as \b.
+KEYWORD_RULES = {
+    'role': ([
+        'manager', 'developer', 'engineer', 'designer', 'business', 'leading', 'executive', 'head', 'director',
+        'ceo', 'cto', 'coo', 'founder', 'owner', 'partner', 'analyst', 'consultant', 'associate', 'supervisor',
+        'lead', 'administrator', 'chairman', 'officer', 'president', 'co-founder', 'marketing', 'hr',
+        'human resource', 'business development', 'operations', 'finance', 'account', 'trainer', 'architect',
+        'estate', 'व्यवस्थापक', 'संचालक', 'सहकारी', 'अध्यक्ष',
+    ], False),
+    'address': ([
+        'road', 'street', 'st.', 'opp', 'near', 'city', 'plot', 'shop', 'no.',
+        'floor', 'wing', 'india', 'pincode', 'sector', 'lane', 'bldg',
+        'nagar', 'block', 'avenue', 'distt', 'tehsil', 'estate',
+        'centre', 'centrum', 'office',
+        # Marathi address keywords
+        'रोड', 'रस्ता', 'शहर', 'मोहल्ला', 'वाटा', 'पत्ता', 'गल्ला', 'प्लॉट',
+        'बाजार', 'नंबर', 'माळ', 'फ्लॅट', 'मंजूर', 'वि.', 'जमीन', 'संख्या',
+        # Common address starters
+        'flat', 'colony', 'area', 'locality', 'station',
+    ], False),
+    # Lines that look like contact/role details rather than an address
+    'address_exclude': ([
+        'mobile', 'mob', 'tel', 'phone', 'website', 'www', 'email', 'e-mail', 'your', 'formerly', 'formeriy',
+        'as', 'manager', 'comfort', 'sales', 'subsidiary', 'executive', 'officer', 'secretary', 'com', 'of',
+    ], True),
+    'company': ([
+        'pvt', 'ltd', 'llp', 'inc', 'solutions', 'tech', 'corp', 'company', 'services', 'advertising',
+        'construction', 'limited', 'प्रा. लि.', 'सोल्यूशन्स',
+    ], True),
+    # Lines that can't be a person's name
+    'name_exclude': ([
+        'pvt', 'ltd', 'llp', 'india', 'executive', 'manager', 'sales', 'finance', 'email', 'website', 'www',
+        'plot', 'road', 'area', 'pin', 'maharashtra',
+    ], False),
+}
+
+# Regex rules: tag -> pattern searched in the stripped line
+JUNK_PATTERNS = [
+    r'^[\W_]+$',                # only punctuation or symbols
+    r'^[eE\s]+$',               # just "e" or "E" or spaces
+    r'^[wy]+$',                 # random isolated letters
+    r'^[\|\[\]\{\}\<\>]+$',     # only brackets
+    r'^[a-zA-Z]{1,2}$',         # short random English chars
+    r'^[\u0900-\u097F]{1,2}$',  # very short Marathi/Hindi fragments
+]
+REGEX_RULES = {
+    'junk': re.compile('|'.join(f'(?:{p})' for p in JUNK_PATTERNS)),
+    'latin': re.compile(r'[a-zA-Z]'),
+    'devanagari': re.compile(r'[\u0900-\u097F]'),
+    'digit': re.compile(r'\d'),
+    'phone': re.compile(r'\+?\d[\d\s\-\(\)]{6,}\d'),
+    'name_like': re.compile(r'^[A-Za-z\s]{3,}$'),
+    'name_part': re.compile(r'^[A-Za-z]{2,}$'),
+}
+ZIP_RE = re.compile(r'\b\d{3}[\s\-]?\d{3}\b')
+
+
+def _is_word(ch):
+    # Same definition of a word character as re's \w for str patterns
+    return ch.isalnum() or ch == '_'
+
+
+def _bounded(text, start, end):
+    before = _is_word(text[start - 1]) if start > 0 else False
+    after = _is_word(text[end]) if end < len(text) else False
+    return before != _is_word(text[start]) and _is_word(text[end - 1]) != after
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over all keyword rules, so a line is scanned once
+    however many keywords there are.
+    """
+
+    def __init__(self, rules):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for tag, (keywords, whole_word) in rules.items():
+            for keyword in keywords:
+                self._add(keyword.lower(), tag, whole_word)
+        self._build()
+
+    def _add(self, keyword, tag, whole_word):
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((tag, len(keyword), whole_word))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, text):
+        """Set of tags whose keywords occur in ``text`` (already lower-cased)."""
+        tags = set()
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for tag, length, whole_word in out[node]:
+                if tag in tags:
+                    continue
+                if whole_word and not _bounded(text, i - length + 1, i + 1):
+                    continue
+                tags.add(tag)
+        return tags
+
+
+AUTOMATON = KeywordAutomaton(KEYWORD_RULES)
+
+
+@lru_cache(maxsize=4096)
+def tag_line(line):
+    """
+    Every rule tag matching one (already stripped) line. Cached, so the
+    extractors that look at the same card lines share one scan per line.
+    """
+    tags = AUTOMATON.scan(line.lower())
+    for tag, pattern in REGEX_RULES.items():
+        if pattern.search(line):
+            tags.add(tag)
+    if ZIP_RE.search(line.replace('-', ' ')):
+        tags.add('zip')
+    return frozenset(tags)
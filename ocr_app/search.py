@@ -0,0 +1,95 @@
+"""
+Attendee search for the help desk.
+
+On SQLite the lookup goes through the ``ocr_app_attendee_fts`` FTS5 trigram
+index (migration 0010, kept in sync by triggers): every word of the query is
+looked up as a substring first; if nothing matches, the words' trigrams are
+OR-ed together and ranked with bm25, so a typo only costs the trigrams it
+touches.
+Trigrams are taken over code points, which works the same for Devanagari.
+Other databases, and queries too short for trigrams, use LIKE.
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Attendee
+
+FTS_TABLE = 'ocr_app_attendee_fts'
+RESULT_FIELDS = ('uid', 'name', 'company', 'designation', 'category', 'phone', 'email')
+
+
+def _normalize(query):
+    return unicodedata.normalize('NFC', query).strip().lower()
+
+
+def _trigrams(query):
+    grams = []
+    for word in query.split():
+        word = word.replace('"', '')
+        for i in range(len(word) - 2):
+            gram = word[i:i + 3]
+            if gram not in grams:
+                grams.append(gram)
+    return grams
+
+
+def _fts_query(match, query, limit, offset):
+    digits = re.sub(r'\D', '', query)
+    # Whole-query substring hits first, then by how many trigrams matched
+    sql = (
+        f"SELECT a.id FROM {FTS_TABLE} f JOIN ocr_app_attendee a ON a.id = f.rowid "
+        f"WHERE {FTS_TABLE} MATCH %s "
+        f"ORDER BY (instr(lower(a.uid || ' ' || a.name || ' ' || a.company || ' ' || a.email), %s) > 0 "
+        f"OR (%s != '' AND instr(a.phone_e164, %s) > 0)) DESC, bm25({FTS_TABLE}) "
+        f"LIMIT %s OFFSET %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, query, digits, digits, limit, offset])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fts_ids(query, limit, offset):
+    grams = _trigrams(query)
+    if not grams:
+        return None
+    # Every word as a substring first: selective, so cheap even for common trigrams
+    words = [word.replace('"', '') for word in query.split()]
+    if all(len(word) >= 3 for word in words):
+        match = ' AND '.join(f'"{word}"' for word in words)
+        ids = _fts_query(match, query, limit, offset)
+        # An empty later page is past the end of the substring hits, unless there are
+        # none at all and the earlier pages came from the trigram fallback below
+        if ids or (offset and _fts_query(match, query, 1, 0)):
+            return ids
+    # Nothing contains the query as typed: rank by shared trigrams to absorb typos
+    return _fts_query(' OR '.join(f'"{gram}"' for gram in grams), query, limit, offset)
+
+
+def _like_queryset(query):
+    condition = Q()
+    for word in query.split():
+        condition &= (Q(uid__istartswith=word) | Q(name__icontains=word) | Q(company__icontains=word)
+                      | Q(email__icontains=word) | Q(phone__contains=word))
+    return Attendee.objects.filter(condition).order_by('-created_at')
+
+
+def search_attendees(query, page=1, page_size=20):
+    """
+    One page of attendees matching ``query`` across UID, name, company, phone
+    and email. Returns ``(attendees, has_next)``.
+    """
+    query = _normalize(query)
+    if not query:
+        return [], False
+    offset = (max(page, 1) - 1) * page_size
+
+    ids = _fts_ids(query, page_size + 1, offset) if connection.vendor == 'sqlite' else None
+    if ids is None:
+        rows = list(_like_queryset(query).only(*RESULT_FIELDS)[offset:offset + page_size + 1])
+    else:
+        by_id = Attendee.objects.only(*RESULT_FIELDS).in_bulk(ids)
+        rows = [by_id[pk] for pk in ids if pk in by_id]
+    return rows[:page_size], len(rows) > page_size
@@ -0,0 +1,397 @@
+"""
+Inference sidecar: one process (``manage.py run_inference_server``) owns the
+OCR and NER models and serves them over a Unix domain socket, so web workers
+(and their number) no longer carry model memory. Web processes use it when
+OCR_INFERENCE_SOCKET is set; otherwise ``utils`` runs the models in-process.
+
+Framing: every message is a 6-byte header ``!BBI`` (protocol version, op or
+status, payload length) followed by the payload.
+
+  OCR request   ``!HHB`` height, width, channels + the uint8 pixels
+  OCR response  ``!I`` lines, then int32 boxes (lines x 4), float32 scores,
+                uint32 UTF-8 text lengths and the concatenated texts
+  NER request   UTF-8 text
+  NER response  ``!I`` entities, then per entity ``!BfIIH`` group length,
+                score, start, end (NO_OFFSET if unknown), word length,
+                followed by the group and word in UTF-8
+  STATUS        empty request; JSON ``{'ready', 'models'}`` response
+
+Status ERROR carries the error message, BUSY means the server is at
+``max_inflight`` with ``max_queued`` requests already waiting (or a slot
+didn't free up within ``queue_wait``) and the caller should back off.
+"""
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VERSION = 1
+HEADER = struct.Struct('!BBI')
+IMAGE_HEADER = struct.Struct('!HHB')
+COUNT = struct.Struct('!I')
+ENTITY = struct.Struct('!BfIIH')
+NO_OFFSET = 0xFFFFFFFF
+MAX_PAYLOAD = 64 * 1024 * 1024
+
+# Ops (requests) and statuses (responses) share the second header byte
+OP_STATUS, OP_OCR, OP_NER = 0, 1, 2
+OK, ERROR, BUSY = 0, 1, 2
+
+
+class InferenceError(Exception):
+    pass
+
+
+class InferenceBusy(InferenceError):
+    """The server (or this process's connection pool) is saturated; retry later."""
+
+
+class InferenceUnavailable(InferenceError):
+    """The inference server can't be reached or stopped answering."""
+
+
+def retry_transient(func, *args, retry_for=60.0, max_delay=5.0):
+    """
+    ``func(*args)``, retried with exponential backoff while the inference
+    server is busy or unreachable, for up to ``retry_for`` seconds. For
+    batch callers that would rather wait than fail a card.
+    """
+    deadline = time.monotonic() + retry_for
+    delay = 0.25
+    while True:
+        try:
+            return func(*args)
+        except (InferenceBusy, InferenceUnavailable):
+            if time.monotonic() + delay > deadline:
+                raise
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+
+# Framing
+# -------
+
+def _recv_exactly(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            raise ConnectionError("Connection closed mid-message")
+        received += count
+    return buffer
+
+
+def send_message(sock, code, payload=b''):
+    header = HEADER.pack(VERSION, code, len(payload))
+    if len(payload) < 65536:
+        sock.sendall(header + payload)  # one write for small messages
+    else:
+        sock.sendall(header)
+        sock.sendall(payload)
+
+
+def recv_message(sock):
+    """``(code, payload)`` of the next message, or None if the peer closed the connection cleanly."""
+    first = sock.recv(HEADER.size)
+    if not first:
+        return None
+    header = first if len(first) == HEADER.size else first + _recv_exactly(sock, HEADER.size - len(first))
+    version, code, length = HEADER.unpack(header)
+    if version != VERSION:
+        raise ConnectionError(f"Unsupported protocol version {version}")
+    if length > MAX_PAYLOAD:
+        raise ConnectionError(f"Message of {length} bytes exceeds the limit")
+    return code, _recv_exactly(sock, length) if length else b''
+
+
+# Payload codecs
+# --------------
+
+def encode_image(image):
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    channels = 1 if image.ndim == 2 else image.shape[2]
+    return IMAGE_HEADER.pack(image.shape[0], image.shape[1], channels) + image.tobytes()
+
+
+def decode_image(payload):
+    height, width, channels = IMAGE_HEADER.unpack_from(payload)
+    pixels = np.frombuffer(payload, np.uint8, offset=IMAGE_HEADER.size)
+    return pixels.reshape((height, width) if channels == 1 else (height, width, channels))
+
+
+def encode_pages(pages):
+    """The fields ``CardLayout.from_pages`` reads, from every page, as one page."""
+    texts, scores, boxes = [], [], []
+    for page in pages:
+        page_texts = list(page.get('rec_texts', []))
+        page_scores = list(page.get('rec_scores', []))
+        page_boxes = page.get('rec_boxes', [])
+        page_polys = page.get('rec_polys', [])
+        for i, text in enumerate(page_texts):
+            texts.append(text.encode('utf-8'))
+            scores.append(float(page_scores[i]) if i < len(page_scores) else 0.0)
+            if i < len(page_boxes):
+                boxes.append(np.asarray(page_boxes[i], dtype=np.int32)[:4])
+            elif i < len(page_polys):
+                poly = np.asarray(page_polys[i], dtype=np.float32)
+                boxes.append(np.concatenate([poly.min(axis=0), poly.max(axis=0)]).astype(np.int32))
+            else:
+                boxes.append(np.zeros(4, np.int32))
+    count = len(texts)
+    return b''.join([
+        COUNT.pack(count),
+        np.asarray(boxes, dtype='>i4').reshape(count, 4).tobytes(),
+        np.asarray(scores, dtype='>f4').tobytes(),
+        np.asarray([len(text) for text in texts], dtype='>u4').tobytes(),
+        *texts,
+    ])
+
+
+def decode_pages(payload):
+    (count,) = COUNT.unpack_from(payload)
+    offset = COUNT.size
+    boxes = np.frombuffer(payload, '>i4', count * 4, offset).reshape(count, 4).astype(np.int32)
+    offset += count * 16
+    scores = np.frombuffer(payload, '>f4', count, offset).astype(np.float32)
+    offset += count * 4
+    lengths = np.frombuffer(payload, '>u4', count, offset)
+    offset += count * 4
+    texts = []
+    for length in lengths.tolist():
+        texts.append(bytes(payload[offset:offset + length]).decode('utf-8'))
+        offset += length
+    return [{'rec_texts': texts, 'rec_scores': scores.tolist(), 'rec_boxes': boxes}]
+
+
+def encode_entities(entities):
+    parts = [COUNT.pack(len(entities))]
+    for entity in entities:
+        group = str(entity.get('entity_group', '')).encode('utf-8')[:255]
+        word = str(entity.get('word', '')).encode('utf-8')[:65535]
+        start, end = entity.get('start'), entity.get('end')
+        parts.append(ENTITY.pack(len(group), float(entity.get('score', 0.0)),
+                                 NO_OFFSET if start is None else start, NO_OFFSET if end is None else end,
+                                 len(word)))
+        parts += [group, word]
+    return b''.join(parts)
+
+
+def decode_entities(payload):
+    (count,) = COUNT.unpack_from(payload)
+    offset = COUNT.size
+    entities = []
+    for _ in range(count):
+        group_length, score, start, end, word_length = ENTITY.unpack_from(payload, offset)
+        offset += ENTITY.size
+        group = bytes(payload[offset:offset + group_length]).decode('utf-8', 'ignore')
+        offset += group_length
+        word = bytes(payload[offset:offset + word_length]).decode('utf-8', 'ignore')  # may be cut mid-character
+        offset += word_length
+        entities.append({
+            'entity_group': group,
+            'score': score,
+            'word': word,
+            'start': None if start == NO_OFFSET else start,
+            'end': None if end == NO_OFFSET else end,
+        })
+    return entities
+
+
+# Server
+# ------
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                message = recv_message(self.request)
+            except (ConnectionError, OSError, struct.error) as exc:
+                logger.warning("Dropping inference connection: %s", exc)
+                return
+            if message is None:
+                return
+            code, payload = message
+            try:
+                status, response = server.dispatch(code, payload)
+            except Exception as exc:
+                logger.exception("Inference request failed")
+                status, response = ERROR, f"{type(exc).__name__}: {exc}".encode('utf-8')
+            try:
+                send_message(self.request, status, response)
+            except OSError:
+                return
+
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves the local models (``utils.local_ocr``/``local_ner``, so the
+    micro-batchers still group concurrent requests) with one thread per
+    client connection. At most ``max_inflight`` requests run at once and up
+    to ``max_queued`` more wait ``queue_wait`` seconds for a slot; the rest
+    are answered BUSY straight away instead of queueing unboundedly.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, max_inflight=8, max_queued=16, queue_wait=10.0):
+        if os.path.exists(path):
+            os.unlink(path)  # left behind by a previous run
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o660)
+        self.max_inflight = max_inflight
+        self.max_queued = max_queued
+        self.queue_wait = queue_wait
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self.served = 0
+        self.rejected = 0
+
+    def dispatch(self, code, payload):
+        from . import utils
+
+        if code == OP_STATUS:
+            status = {'ready': utils.registry.is_ready(), 'models': utils.registry.status()}
+            return OK, json.dumps(status).encode('utf-8')
+        if code not in (OP_OCR, OP_NER):
+            return ERROR, f"Unknown op {code}".encode('utf-8')
+
+        if not self._acquire_slot():
+            self.rejected += 1
+            return BUSY, b''
+        try:
+            if code == OP_OCR:
+                response = encode_pages(utils.local_ocr(decode_image(payload)))
+            else:
+                response = encode_entities(utils.local_ner(bytes(payload).decode('utf-8')))
+        finally:
+            self._slots.release()
+        self.served += 1
+        return OK, response
+
+    def _acquire_slot(self):
+        if self._slots.acquire(blocking=False):
+            return True
+        with self._lock:
+            if self._waiting >= self.max_queued:
+                return False
+            self._waiting += 1
+        try:
+            return self._slots.acquire(timeout=self.queue_wait)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+# Client
+# ------
+
+class InferenceClient:
+    """
+    Client of ``InferenceServer`` for one web process. Keeps up to
+    ``pool_size`` persistent connections; a request waits at most ``wait``
+    seconds for a free connection (then ``InferenceBusy``) and ``timeout``
+    seconds for the answer (then ``InferenceUnavailable``).
+    """
+
+    def __init__(self, path, pool_size=4, timeout=30.0, wait=5.0):
+        self.path = path
+        self.timeout = timeout
+        self.wait = wait
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self.requests = 0
+        self.busy = 0
+        self.errors = 0
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _exchange(self, sock, op, payload):
+        """One request/response on ``sock``; closes it if anything goes wrong."""
+        try:
+            send_message(sock, op, payload)
+            message = recv_message(sock)
+            if message is None:
+                raise ConnectionError("Inference server closed the connection")
+        except BaseException:
+            sock.close()
+            raise
+        return message
+
+    def _call(self, op, payload):
+        if not self._slots.acquire(timeout=self.wait):
+            self.busy += 1
+            raise InferenceBusy("All inference connections are in use")
+        try:
+            try:
+                sock = self._idle.get_nowait()
+            except queue.Empty:
+                sock = None
+            if sock is not None:
+                try:
+                    message = self._exchange(sock, op, payload)
+                except TimeoutError as exc:
+                    self.errors += 1
+                    raise InferenceUnavailable(f"Inference server at {self.path}: {exc}") from exc
+                except (OSError, ConnectionError, struct.error):
+                    # Pooled connection gone stale (e.g. the server restarted); requests
+                    # are idempotent, so try once more on a fresh one
+                    sock = None
+            if sock is None:
+                try:
+                    sock = self._connect()
+                    message = self._exchange(sock, op, payload)
+                except (OSError, ConnectionError, struct.error) as exc:
+                    self.errors += 1
+                    raise InferenceUnavailable(f"Inference server at {self.path}: {exc}") from exc
+            self._idle.put(sock)
+        finally:
+            self._slots.release()
+
+        self.requests += 1
+        status, response = message
+        if status == BUSY:
+            self.busy += 1
+            raise InferenceBusy("Inference server is at capacity")
+        if status != OK:
+            raise InferenceError(bytes(response).decode('utf-8', 'replace'))
+        return response
+
+    def ocr(self, image):
+        return decode_pages(self._call(OP_OCR, encode_image(image)))
+
+    def ner(self, text):
+        return decode_entities(self._call(OP_NER, text.encode('utf-8')))
+
+    def status(self):
+        return json.loads(bytes(self._call(OP_STATUS, b'')).decode('utf-8'))
+
+    def stats(self):
+        return {'socket': self.path, 'requests': self.requests, 'busy': self.busy, 'errors': self.errors}
@@ -1,3 +1,176 @@
-from django.test import TestCase
+import re
+import socket
+from collections import Counter
+from datetime import date
 
-# Create your tests here.
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from . import exports, search, sidecar
+from .benchmarks import LANGUAGES, build_corpus
+from .models import Attendee
+from .rules import JUNK_PATTERNS, KEYWORD_RULES, tag_line
+from .utils import strip_text
+
+
+class BuildCorpusTests(SimpleTestCase):
+    def test_small_corpus_covers_every_level_evenly(self):
+        corpus, _ = build_corpus(27)
+        self.assertEqual([s['language'] for s in corpus[:3]], list(LANGUAGES))
+        for key in ('language', 'noise', 'rotation', 'width'):
+            self.assertEqual(set(Counter(s[key] for s in corpus).values()), {9}, key)
+
+    def test_full_cycle_covers_every_combination(self):
+        corpus, _ = build_corpus(81)
+        combos = {(s['language'], s['noise'], s['rotation'], s['width']) for s in corpus}
+        self.assertEqual(len(combos), 81)
+
+    def test_same_seed_same_corpus(self):
+        first, _ = build_corpus(4, seed=7)
+        second, _ = build_corpus(4, seed=7)
+        self.assertEqual([s['text'] for s in first], [s['text'] for s in second])
+
+
+class SearchPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        attendees = [Attendee(uid=f"T{i:04d}", name="Ramesh Kumar N", company="Acme") for i in range(45)]
+        for attendee in attendees:
+            attendee.normalize()
+        Attendee.objects.bulk_create(attendees)
+
+    def test_trigram_fallback_pages_through_all_hits(self):
+        pages = [search.search_attendees("rmesh kumr", page=page) for page in (1, 2, 3)]
+        self.assertEqual([len(rows) for rows, _ in pages], [20, 20, 5])
+        self.assertEqual([has_next for _, has_next in pages], [True, True, False])
+        uids = {a.uid for rows, _ in pages for a in rows}
+        self.assertEqual(len(uids), 45)
+
+    def test_substring_hits_stop_at_the_end(self):
+        rows, has_next = search.search_attendees("ramesh", page=3)
+        self.assertEqual((len(rows), has_next), (5, False))
+        self.assertEqual(search.search_attendees("ramesh", page=4), ([], False))
+
+
+class CursorNameTests(SimpleTestCase):
+    def test_unfiltered_keeps_plain_name(self):
+        self.assertEqual(exports.cursor_name('default'), 'default')
+
+    def test_each_filter_set_gets_its_own_cursor(self):
+        names = {
+            exports.cursor_name('default'),
+            exports.cursor_name('default', category='A'),
+            exports.cursor_name('default', category='B'),
+            exports.cursor_name('default', category='A', date_from=date(2026, 1, 1)),
+            exports.cursor_name('default', date_to=date(2026, 1, 1)),
+            exports.cursor_name('other', category='A'),
+        }
+        self.assertEqual(len(names), 6)
+        self.assertEqual(exports.cursor_name('default', category='A'), exports.cursor_name('default', 'A'))
+
+
+class StripTextTests(SimpleTestCase):
+    def entity(self, text, word):
+        start = text.index(word)
+        return {'word': word, 'start': start, 'end': start + len(word)}
+
+    def test_offsets_follow_the_replacement(self):
+        text = "Mr | Ramesh | Acme Pvt Ltd"
+        entities = [self.entity(text, "Ramesh"), self.entity(text, "Acme")]
+        new_text, remapped = strip_text(text, " | ", " ", entities)
+        self.assertEqual(new_text, "Mr Ramesh Acme Pvt Ltd")
+        self.assertEqual([new_text[e['start']:e['end']] for e in remapped], ["Ramesh", "Acme"])
+
+    def test_entities_over_a_replaced_occurrence_are_dropped(self):
+        text = "Ramesh|Kumar Acme"
+        entities = [{'word': "Ramesh|Kumar", 'start': 0, 'end': 12}, self.entity(text, "Acme")]
+        new_text, remapped = strip_text(text, "|", "", entities)
+        self.assertEqual([new_text[e['start']:e['end']] for e in remapped], ["Acme"])
+
+    def test_no_occurrence_is_a_no_op(self):
+        entities = [{'word': "Acme", 'start': 0, 'end': 4}]
+        self.assertEqual(strip_text("Acme", "|", "", entities), ("Acme", entities))
+
+
+class RuleEngineTests(SimpleTestCase):
+    """tag_line must agree with the per-keyword regexes it replaced."""
+
+    LINES = [
+        "Sales Manager", "Ramesh Kumar", "Acme Solutions Pvt. Ltd.", "Plot No. 12, MIDC Road",
+        "Mobile: +91 98220 12345", "www.acme.co.in", "Co-Founder & CEO", "as of today", "Companyx",
+        "Flat 4, Shivaji Nagar, Pune 411 005", "|||", "e E", "wy", "ab", "रा", "संचालक", "प्रा. लि. कंपनी",
+        "Head - Human Resource", "Estate Office", "st. mary's lane", "Pincode-411026", "",
+    ]
+
+    def expected(self, line):
+        lower = line.lower()
+        tags = set()
+        for tag, (keywords, whole_word) in KEYWORD_RULES.items():
+            if whole_word:
+                pattern = r'\b(' + '|'.join(re.escape(k) for k in keywords) + r')\b'
+                if re.search(pattern, line, re.I):
+                    tags.add(tag)
+            elif any(k.lower() in lower for k in keywords):
+                tags.add(tag)
+        if any(re.match(p, line) for p in JUNK_PATTERNS):
+            tags.add('junk')
+        return tags
+
+    def test_keyword_and_junk_tags_match_the_old_regexes(self):
+        checked = set(KEYWORD_RULES) | {'junk'}
+        for line in self.LINES:
+            with self.subTest(line=line):
+                self.assertEqual(tag_line(line) & checked, self.expected(line))
+
+    def test_zip_tag(self):
+        self.assertIn('zip', tag_line("Pune 411-026"))
+        self.assertNotIn('zip', tag_line("Pune 4110260"))
+
+
+class SidecarCodecTests(SimpleTestCase):
+    def test_image_round_trip(self):
+        for shape in ((3, 5), (4, 6, 3)):
+            image = np.arange(np.prod(shape), dtype=np.uint8).reshape(shape)
+            np.testing.assert_array_equal(sidecar.decode_image(sidecar.encode_image(image)), image)
+
+    def test_pages_are_flattened_into_one(self):
+        pages = [
+            {'rec_texts': ["Ramesh", "Acme"], 'rec_scores': [0.5, 0.25], 'rec_boxes': [[1, 2, 3, 4], [5, 6, 7, 8]]},
+            {'rec_texts': ["पुणे"], 'rec_scores': [1.0], 'rec_polys': [[[10, 20], [30, 20], [30, 40], [10, 40]]]},
+        ]
+        (page,) = sidecar.decode_pages(sidecar.encode_pages(pages))
+        self.assertEqual(page['rec_texts'], ["Ramesh", "Acme", "पुणे"])
+        self.assertEqual(page['rec_scores'], [0.5, 0.25, 1.0])
+        self.assertEqual(page['rec_boxes'].tolist(), [[1, 2, 3, 4], [5, 6, 7, 8], [10, 20, 30, 40]])
+
+    def test_empty_pages(self):
+        (page,) = sidecar.decode_pages(sidecar.encode_pages([]))
+        self.assertEqual((page['rec_texts'], len(page['rec_boxes'])), ([], 0))
+
+    def test_entities_round_trip(self):
+        entities = [
+            {'entity_group': 'PER', 'score': 0.5, 'word': "रमेश", 'start': 0, 'end': 4},
+            {'entity_group': 'ORG', 'score': 0.25, 'word': "Acme", 'start': None, 'end': None},
+        ]
+        self.assertEqual(sidecar.decode_entities(sidecar.encode_entities(entities)), entities)
+
+    def test_framing_over_a_socket(self):
+        left, right = socket.socketpair()
+        with left, right:
+            large = bytes(range(256)) * 300  # above the single-write threshold
+            sidecar.send_message(left, 3, b'hello')
+            sidecar.send_message(left, 4)
+            sidecar.send_message(left, 5, large)
+            self.assertEqual(sidecar.recv_message(right), (3, b'hello'))
+            self.assertEqual(sidecar.recv_message(right), (4, b''))
+            code, payload = sidecar.recv_message(right)
+            self.assertEqual((code, bytes(payload)), (5, large))
+            left.close()
+            self.assertIsNone(sidecar.recv_message(right))
+
+    def test_unknown_version_is_rejected(self):
+        left, right = socket.socketpair()
+        with left, right:
+            left.sendall(sidecar.HEADER.pack(sidecar.VERSION + 1, 1, 0))
+            with self.assertRaises(ConnectionError):
+                sidecar.recv_message(right)
@@ -5,5 +5,16 @@ urlpatterns = [
     path('new-registration/', views.upload_card, name='new_registration'), 
     path('save/', views.register_card, name='save_card'),
     path('', views.main_page, name='icexpo_home'),
+    path('health/ready/', views.readiness, name='readiness'),
+    path('health/stats/', views.inference_stats, name='inference_stats'),
+    path('metrics/', views.prometheus_metrics, name='metrics'),
+    path('jobs/', views.submit_card_job, name='submit_card_job'),
+    path('jobs/<uuid:job_id>/', views.card_job_status, name='card_job_status'),
+    path('qr/<str:uid>.<str:fmt>', views.attendee_qr, name='attendee_qr'),
+    path('checkin/', views.check_in, name='check_in'),
+    path('desk/', views.desk, name='desk'),
+    path('desk/search/', views.attendee_search, name='attendee_search'),
+    path('attendees/<str:uid>/pass/', views.attendee_pass, name='attendee_pass'),
+    path('export/attendees.<str:fmt>', views.export_attendees, name='export_attendees'),
 
 ]
@@ -1,70 +1,340 @@
 import re
-import phonenumbers
-from paddleocr import PaddleOCR
-from transformers import pipeline
-# Load NER model
-ner_model = pipeline( "ner", 
-                           model="Davlan/xlm-roberta-large-ner-hrl",
-                            aggregation_strategy="simple" )
-
-#OCR model
-ocr = PaddleOCR(use_angle_cls=False, lang='hi')  # Marathi OCR
-
-def extract_text(image_path):
-    result = ocr.ocr(image_path)
-    text_lines = []
-    confidence_scores = []
-    structured_result = []
-
-    # PaddleOCR result format (from your logs)
-    for page in result:  # result is a list with one dict per page/image
-        rec_texts = page.get('rec_texts', [])
-        # print("Recognized Texts:", rec_texts)
-        # rec_scores = page.get('rec_scores', [])
-        # rec_boxes = page.get('rec_boxes', [])
-
-        page_structured = []
-        for i, text in enumerate(rec_texts):
-            # score = rec_scores[i] if i < len(rec_scores) else 0.0
-            # bbox = rec_boxes[i] if i < len(rec_boxes) else None
-            # page_structured.append([bbox, (text, score)])
-            text_lines.append(text)
-            # confidence_scores.append(score)
-
-        # structured_result.append(page_structured)
-
-    # Join all text lines
-    text = "\n".join(text_lines)
-    return text
+import threading
+import time
+import cv2
+import numpy as np
+from django.conf import settings
+from . import ner, sidecar
+from .batching import MicroBatcher
+from .cache import ResultCache
+from .layout import CardLayout
+from .locator import crop_card
+from .metrics import timer
+from .normalize import normalize_phone
+from .preprocess import preprocess
+from .registry import ModelRegistry
+from .rules import ZIP_RE, tag_line
 
-def clean_ocr_text(text):
-    junk_patterns = [
-        r'^[\W_]+$',                # only punctuation or symbols
-        r'^[eE\s]+$',               # just "e" or "E" or spaces
-        r'^[wy]+$',                 # random isolated letters
-        r'^[\|\[\]\{\}\<\>]+$',     # only brackets
-        r'^[a-zA-Z]{1,2}$',         # short random English chars
-        r'^[\u0900-\u097F]{1,2}$',  # very short Marathi/Hindi fragments
-    ]
+# Bump whenever OCR settings or parsing rules change, so cached results of
+# the old pipeline stop matching.
+PIPELINE_VERSION = '1'
+
+
+def _load_ner_model():
+    return ner.load_backend(settings.OCR_NER_BACKEND, settings.OCR_NER_MODEL, onnx_dir=settings.OCR_NER_ONNX_DIR)
+
+
+def ocr_options():
+    """PaddleOCR constructor arguments from the OCR_* settings."""
+    options = {
+        'use_angle_cls': False,
+        'lang': 'hi',  # Marathi OCR
+        'text_det_limit_side_len': settings.OCR_DET_LIMIT_SIDE,
+        'text_det_limit_type': 'max',
+        'enable_mkldnn': settings.OCR_ENABLE_MKLDNN,
+        # Cards are cropped and deskewed by the locator instead
+        'use_doc_orientation_classify': False,
+        'use_doc_unwarping': False,
+    }
+    if settings.OCR_MODEL_SIZE:
+        options['text_detection_model_name'] = f"PP-OCRv5_{settings.OCR_MODEL_SIZE}_det"
+    if settings.OCR_CPU_THREADS:
+        options['cpu_threads'] = settings.OCR_CPU_THREADS
+    return options
+
+
+def _load_ocr_model():
+    from paddleocr import PaddleOCR
+    return PaddleOCR(**ocr_options())
+
+
+# Models load on first use (or via registry.warm_up() at worker start)
+registry = ModelRegistry()
+registry.register('ner', _load_ner_model,
+                  warmup=lambda model: model("Rahul Sharma, Acme Pvt Ltd, Pune"))
+registry.register('ocr', _load_ocr_model,
+                  warmup=lambda model: model.ocr(np.full((64, 256, 3), 255, dtype=np.uint8)))
+
+
+def get_ner_model():
+    return registry.get('ner')
+
+
+def get_ocr_model():
+    return registry.get('ocr')
+
+
+# Cross-request micro-batching (OCR_BATCH_WINDOW_MS > 0 turns it on)
+def _ocr_batch(images):
+    # One result page per input image
+    return [[page] for page in get_ocr_model().ocr(images)]
+
+
+def _ner_batch(texts):
+    return get_ner_model()(texts, aggregation_strategy="simple", batch_size=len(texts))
+
+
+batchers = {}
+
+
+def get_batcher(name):
+    if settings.OCR_BATCH_WINDOW_MS <= 0:
+        return None
+    if name not in batchers:
+        batch_fn = {'ocr': _ocr_batch, 'ner': _ner_batch}[name]
+        batchers[name] = MicroBatcher(name, batch_fn, settings.OCR_BATCH_WINDOW_MS, settings.OCR_BATCH_MAX_SIZE)
+    return batchers[name]
+
+
+def local_ocr(image):
+    """PaddleOCR result pages for one image from this process's model, batched with concurrent callers when enabled."""
+    batcher = get_batcher('ocr')
+    if batcher is None:
+        return get_ocr_model().ocr(image)
+    return batcher.submit(image)
+
+
+def local_ner(text):
+    """Raw NER entities for one text from this process's model, batched with concurrent callers when enabled."""
+    batcher = get_batcher('ner')
+    if batcher is None:
+        return get_ner_model()(text, aggregation_strategy="simple")
+    return batcher.submit(text)
+
+
+# Inference sidecar (OCR_INFERENCE_SOCKET set): the models live in
+# ``manage.py run_inference_server`` and this process only holds a client
+_inference_client = None
+_inference_client_lock = threading.Lock()
+
+
+def get_inference_client():
+    """The sidecar client, or None when the models run in-process."""
+    global _inference_client
+    if not settings.OCR_INFERENCE_SOCKET:
+        return None
+    with _inference_client_lock:
+        if _inference_client is None:
+            _inference_client = sidecar.InferenceClient(
+                settings.OCR_INFERENCE_SOCKET, settings.OCR_INFERENCE_POOL_SIZE,
+                settings.OCR_INFERENCE_TIMEOUT, settings.OCR_INFERENCE_WAIT)
+    return _inference_client
+
+
+def run_ocr(image):
+    """PaddleOCR result pages for one image, from the sidecar if configured."""
+    client = get_inference_client()
+    if client is None:
+        return local_ocr(image)
+    return client.ocr(cv2.imread(image) if isinstance(image, str) else image)
+
+
+def run_ner(text):
+    """Raw NER entities for one text, from the sidecar if configured."""
+    client = get_inference_client()
+    if client is None:
+        return local_ner(text)
+    return client.ner(text)
+
+
+def models_status():
+    """``(ready, per-model status)`` of the models this process uses, wherever they run."""
+    client = get_inference_client()
+    if client is None:
+        return registry.is_ready(), registry.status()
+    try:
+        status = client.status()
+    except sidecar.InferenceError as exc:
+        return False, {'sidecar': {'state': 'unavailable', 'error': str(exc)}}
+    return status['ready'], status['models']
+
+
+def warm_up_models():
+    """Load and warm this process's models; a no-op when they live in the sidecar."""
+    if get_inference_client() is None:
+        registry.warm_up()
+
+# Map the model's entity groups onto the spans the extractors care about
+NER_GROUPS = {
+    'PER': 'PER', 'PERSON': 'PER',
+    'ORG': 'ORG', 'ORGANIZATION': 'ORG',
+    'LOC': 'LOC', 'GPE': 'LOC',
+    'TITLE': 'ROLE', 'ROLE': 'ROLE', 'DESIGNATION': 'ROLE',
+}
+
+def extract_text(image_path, with_layout=False):
+    """
+    OCR one image. Returns the recognised lines joined by newlines, or
+    ``(text, layout)`` with ``with_layout=True`` where ``layout`` is a
+    ``CardLayout`` holding the boxes, scores and font sizes of those lines.
+    """
+    layout = CardLayout.from_pages(run_ocr(image_path))
+    text = "\n".join(layout.texts)
+    return (text, layout) if with_layout else text
+
+class CascadeStats:
+    """
+    NER calls made/avoided by the cascade parser and an estimate of the time
+    saved, based on the measured NER cost per character of input.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cards = 0
+        self.ner_calls = 0
+        self.ner_calls_avoided = 0
+        self.ner_seconds = 0.0
+        self.ner_chars = 0
+        self.saved_seconds = 0.0
+        self.rule_resolved = {}
+
+    def record_ner(self, chars, seconds):
+        with self._lock:
+            self.ner_calls += 1
+            self.ner_seconds += seconds
+            self.ner_chars += chars
+
+    def seconds_per_char(self):
+        return self.ner_seconds / self.ner_chars if self.ner_chars else 0.0
+
+    def record_card(self, skipped_chars, ner_called, resolved_fields):
+        saved = skipped_chars * self.seconds_per_char()
+        with self._lock:
+            self.cards += 1
+            if not ner_called:
+                self.ner_calls_avoided += 1
+            self.saved_seconds += saved
+            for field in resolved_fields:
+                self.rule_resolved[field] = self.rule_resolved.get(field, 0) + 1
+        return saved
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'cards': self.cards,
+                'ner_calls': self.ner_calls,
+                'ner_calls_avoided': self.ner_calls_avoided,
+                'ner_ms_per_1k_chars': self.seconds_per_char() * 1e6,
+                'estimated_saved_seconds': round(self.saved_seconds, 3),
+                'resolved_by_rules': dict(self.rule_resolved),
+            }
+
+
+cascade_stats = CascadeStats()
+
+
+def analyze_entities(text):
+    """
+    Run the NER model once over ``text`` and return PER/ORG/LOC/ROLE spans.
+    Each span keeps its character offsets so callers can strip text and
+    remap the spans (see ``strip_text``) instead of running the model again.
+    """
+    if not text.strip():
+        return []
+
+    with timer('ner') as ner_timer:
+        raw_entities = run_ner(text)
+    cascade_stats.record_ner(len(text), ner_timer.seconds)
+
+    spans = []
+    for ent in raw_entities:
+        group = NER_GROUPS.get(ent['entity_group'])
+        if group is None:
+            continue
+        word = ent['word'].strip()
+        start, end = ent.get('start'), ent.get('end')
+        if start is None or end is None:
+            # Slow tokenizers don't report offsets; fall back to a lookup
+            start = text.find(word)
+            if start < 0:
+                continue
+            end = start + len(word)
+        spans.append({
+            'group': group,
+            'entity_group': ent['entity_group'],
+            'word': word,
+            'start': start,
+            'end': end,
+            'score': float(ent.get('score', 0.0)),
+        })
+    return spans
+
+
+def strip_text(text, old, new, entities):
+    """
+    ``text.replace(old, new)`` that also shifts entity offsets to match the
+    new text. Entities overlapping a replaced occurrence are dropped.
+    """
+    if not old or old not in text:
+        return text, entities
+
+    cuts = []
+    pos = 0
+    while True:
+        i = text.find(old, pos)
+        if i < 0:
+            break
+        cuts.append((i, i + len(old)))
+        pos = i + len(old)
+
+    delta = len(new) - len(old)
+    remapped = []
+    for ent in entities:
+        shift = 0
+        overlaps = False
+        for a, b in cuts:
+            if b <= ent['start']:
+                shift += delta
+            elif a >= ent['end']:
+                break
+            else:
+                overlaps = True
+                break
+        if not overlaps:
+            remapped.append({**ent, 'start': ent['start'] + shift, 'end': ent['end'] + shift})
+
+    return text.replace(old, new), remapped
 
+
+def _entity_words(entities, group):
+    return [ent['word'] for ent in entities if ent['group'] == group]
+
+
+def _first_lines_end(text, count):
+    """Offset just past the ``count``-th non-empty line of ``text``."""
+    seen = 0
+    pos = 0
+    for line in text.split("\n"):
+        end = pos + len(line)
+        if line.strip():
+            seen += 1
+            if seen == count:
+                return end
+        pos = end + 1
+    return len(text)
+
+
+@timer('clean_ocr_text')
+def clean_ocr_text(text):
     cleaned_lines = []
     for line in text.split("\n"):
         l = line.strip().replace('\xa0', '').replace('\u200b', '')
         if not l:
             continue
+        tags = tag_line(l)
 
         # Skip obvious junk patterns
-        if any(re.match(p, l) for p in junk_patterns):
+        if 'junk' in tags:
             continue
 
         # Skip lines that mix Devanagari and English randomly (likely noise)
-        if re.search(r'[a-zA-Z]', l) and re.search(r'[\u0900-\u097F]', l):
+        if 'latin' in tags and 'devanagari' in tags:
             # But allow if it contains digits (addresses often do)
-            if not re.search(r'\d', l):
+            if 'digit' not in tags:
                 continue
 
         # Skip lines that are too short (less than 2 chars) and don't contain digits
-        if len(l) < 2 and not re.search(r'\d', l):
+        if len(l) < 2 and 'digit' not in tags:
             continue
 
         cleaned_lines.append(l)
@@ -72,32 +342,40 @@ def clean_ocr_text(text):
     return "\n".join(cleaned_lines)
 
 
-def extract_name(text):
-    import re
-
+@timer('extract_name')
+def extract_name(text, entities=None, preferred_lines=None):
+    """``preferred_lines`` (e.g. the largest-font lines) are tried first."""
     # Clean and split lines
     lines = [l.strip() for l in text.split("\n") if l.strip()]
     first_lines = lines[:10]
+    preferred_lines = preferred_lines or []
 
-    text_for_ner = "\n".join(first_lines)
+    def preferred(line):
+        return any(line in p or p in line for p in preferred_lines)
 
-    # --- Step 1: Run NER if available ---
-    names = []
-    if ner_model:
-        entities = ner_model(text_for_ner, aggregation_strategy="simple")
-        names = [ent["word"].strip() for ent in entities if ent["entity_group"] in ["PER", "PERSON"]]
+    # --- Step 1: NER person spans within the first lines ---
+    if entities is None:
+        entities = analyze_entities("\n".join(first_lines))
+    else:
+        limit = _first_lines_end(text, 10)
+        entities = [ent for ent in entities if ent['start'] < limit]
+    names = _entity_words(entities, 'PER')
+    names.sort(key=lambda n: not preferred(n))
 
     # --- Step 2: Fallback heuristic if empty ---
     if not names:
-        for i, line in enumerate(first_lines):
-            if re.search(r"(Pvt|Ltd|LLP|India|Executive|Manager|Sales|Finance|Email|Website|www|Plot|Road|Area|Pin|Maharashtra)", line, re.I):
+        candidates = sorted(range(len(first_lines)), key=lambda i: not preferred(first_lines[i]))
+        for i in candidates:
+            line = first_lines[i]
+            tags = tag_line(line)
+            if 'name_exclude' in tags:
                 continue
             # Looks like a person name (alphabetic, 1-3 words)
-            if re.match(r"^[A-Za-z\s]{3,}$", line) and 1 <= len(line.split()) <= 3:
+            if 'name_like' in tags and 1 <= len(line.split()) <= 3:
                 # Check next line — maybe continuation like "Bhai", "Kumar"
                 if i + 1 < len(first_lines):
                     next_line = first_lines[i + 1]
-                    if re.match(r"^[A-Za-z]{2,}$", next_line) and len(next_line.split()) <= 2:
+                    if 'name_part' in tag_line(next_line) and len(next_line.split()) <= 2:
                         line = f"{line} {next_line}"  # merge
                 names.append(line.strip())
                 break
@@ -111,7 +389,7 @@ def extract_name(text):
                 idx = i
                 break
         for j in range(idx + 1, min(idx + 3, len(first_lines))):
-            if re.match(r"^[A-Za-z]{2,}$", first_lines[j]) and len(first_lines[j].split()) <= 2:
+            if 'name_part' in tag_line(first_lines[j]) and len(first_lines[j].split()) <= 2:
                 names[0] += " " + first_lines[j]
                 break
 
@@ -123,17 +401,19 @@ def extract_name(text):
 
 
 
-def extract_company(text):
-    entities = ner_model(text)
-    orgs = [ent['word'] for ent in entities if ent['entity_group'] in ['ORG', 'ORGANIZATION']]
+@timer('extract_company')
+def extract_company(text, entities=None):
+    if entities is None:
+        entities = analyze_entities(text)
+    orgs = _entity_words(entities, 'ORG')
     if orgs:
         return list(dict.fromkeys(orgs))
     # Fallback: keyword-based
-    fallback_keywords = r'\b(Pvt|Ltd|LLP|Inc|Solutions|Tech|Corp|Company|Services|Advertising|Construction|Limited|प्रा\. लि\.|सोल्यूशन्स)\b'
     lines = [l.strip() for l in text.split("\n") if l.strip()]
-    fallback_orgs = [l for l in lines if re.search(fallback_keywords, l, re.I)]
+    fallback_orgs = [l for l in lines if 'company' in tag_line(l)]
     return list(dict.fromkeys(fallback_orgs))
 
+@timer('extract_phones')
 def extract_phones(text):
     phones = []
     text_cleaned = re.sub(r'[^\x20-\x7E]', ' ', text)
@@ -152,90 +432,80 @@ def extract_phones(text):
         text_cleaned
     )
     for num in raw_numbers:
-        cleaned = re.sub(r'[^\d\+]', '', num)
-        try:
-            match = phonenumbers.parse(cleaned, "IN")
-            if phonenumbers.is_valid_number(match):
-                e164 = phonenumbers.format_number(match, phonenumbers.PhoneNumberFormat.E164)
-                phones.append(e164)
-        except:
-            continue
+        e164 = normalize_phone(num)
+        if e164:
+            phones.append(e164)
     return list(set(phones)), raw_numbers
 
+EMAIL_RE = re.compile(r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.(?:com|co\.in|in|org|net|biz|info|edu|io|gov)\b', re.I)
+URL_RE = re.compile(r'\b(?:https?:\/\/|www\.)[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}(?:\/[^\s]*)?|\b[a-zA-Z0-9.-]+\.(?:com|in|co\.in|org|net|biz|info|io|me|ai)\b', re.I)
+
+
+@timer('extract_emails')
 def extract_emails(text):
-    email_pattern = re.compile(r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.(?:com|co\.in|in|org|net|biz|info|edu|io|gov)\b', re.I)
-    emails = list(dict.fromkeys([e.strip().lower() for e in re.findall(email_pattern, text)]))
+    emails = list(dict.fromkeys([e.strip().lower() for e in EMAIL_RE.findall(text)]))
     return emails
 
+@timer('extract_websites')
 def extract_websites(text):
-    url_pattern = re.compile(r'\b(?:https?:\/\/|www\.)[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}(?:\/[^\s]*)?|\b[a-zA-Z0-9.-]+\.(?:com|in|co\.in|org|net|biz|info|io|me|ai)\b', re.I)
     websites = []
-    for w in re.findall(url_pattern, text):
+    for w in URL_RE.findall(text):
         w = w.strip().lower().rstrip('.,;:')
         if not w.startswith("http") and not w.startswith("www."):
             w = "www." + w
         websites.append(w)
     return list(dict.fromkeys(websites))
 
-def extract_designation(text):
-    entities = ner_model(text)
-    roles_ner = [ent['word'] for ent in entities if ent['entity_group'] in ['TITLE','ROLE','DESIGNATION']]
-    role_keywords = [ 'manager', 'developer', 'engineer', 'designer', 'business','leading','executive', 'head', 'director', 'ceo', 'cto', 'coo', 'founder', 'owner', 'partner', 'analyst', 'consultant', 'associate', 'supervisor', 'lead', 'administrator', 'chairman', 'officer', 'president', 'co-founder', 'marketing', 'hr', 'human resource', 'business development', 'operations', 'finance', 'account', 'trainer', 'architect','leading','estate', 'व्यवस्थापक','संचालक','सहकारी','अध्यक्ष' ]
+@timer('extract_designation')
+def extract_designation(text, entities=None):
+    if entities is None:
+        entities = analyze_entities(text)
+    roles_ner = _entity_words(entities, 'ROLE')
     lines = [l.strip() for l in text.split("\n") if l.strip()]
-    roles_kw = [l for l in lines if any(kw in l.lower() for kw in role_keywords) and '@' not in l and 'www' not in l]
+    roles_kw = [l for l in lines if 'role' in tag_line(l) and '@' not in l and 'www' not in l]
     return list(dict.fromkeys(roles_ner + roles_kw))
 
 
 
-def extract_address(text):
-    import re
+@timer('extract_address')
+def extract_address(text, entities=None, region_lines=None):
+    """``region_lines`` (e.g. the card's bottom block) limits the search when it finds an address."""
+    if region_lines:
+        lines = [l.strip() for l in text.split("\n") if l.strip()]
+        region = [l for l in lines if any(l in r or r in l for r in region_lines)]
+        address = extract_address("\n".join(region), entities)
+        if address:
+            return address
 
     # Remove websites
     text = re.sub(r'http\S+|www\.\S+', '', text)
 
     lines = [l.strip().rstrip(',') for l in text.split("\n") if l.strip()]
-    entities = ner_model(text)
-    locs = [ent['word'] for ent in entities if ent['entity_group'] in ['LOC', 'GPE']]
-
-    address_keywords = [
-        'road','street','st.','opp','near','city','plot','shop','no.',
-        'floor','wing','india','pincode','sector','lane','bldg',
-        'nagar','block','avenue','distt','tehsil','estate',
-        'centre', 'centrum', 'office',
-        # Marathi address keywords
-        'रोड', 'रस्ता', 'शहर', 'मोहल्ला', 'वाटा', 'पत्ता', 'गल्ला', 'प्लॉट',
-        'बाजार', 'नंबर', 'माळ', 'फ्लॅट', 'मंजूर', 'वि.', 'जमीन', 'संख्या',
-        # Common address starters
-        'flat', 'shop', 'plot', 'colony', 'area', 'locality', 'station'
-    ]
-
-    phone_pattern = re.compile(r'\+?\d[\d\s\-\(\)]{6,}\d')
-    zip_pattern = re.compile(r'\b\d{3}[\s\-]?\d{3}\b')
-    exclude_patterns = re.compile(r'\b(mobile|mob|tel|phone|website|www|email|e-mail|your|formerly|formeriy|as|manager|comfort|sales|subsidiary|executive|officer|secretary|com|of)\b', re.I)
+    if entities is None:
+        entities = analyze_entities(text)
+    locs = _entity_words(entities, 'LOC')
 
     block = []
     collecting = False
 
+    locs = [loc.lower() for loc in locs]
     for l in lines:
-        lower = l.lower()
+        tags = tag_line(l)
 
         # Skip phone numbers and irrelevant lines
-        if phone_pattern.search(l) or exclude_patterns.search(lower):
+        if 'phone' in tags or 'address_exclude' in tags:
             continue
 
-        # Normalize line for ZIP detection
-        line_norm = l.replace('-', ' ').strip()
-
         # Start collecting if line has ZIP OR looks like address (keyword, number, NER location)
         if not collecting:
-            if zip_pattern.search(line_norm) or any(kw in lower for kw in address_keywords) or any(loc.lower() in lower for loc in locs) or re.search(r'\d+', l):
+            if tags & {'zip', 'address', 'digit'} or any(loc in l.lower() for loc in locs):
                 collecting = True
 
         if collecting:
             block.append(l)
 
             # Stop immediately after ZIP line
-            if zip_pattern.search(line_norm):
+            if 'zip' in tags:
                 break
 
     # Join lines into one address string
@@ -248,8 +518,25 @@ def extract_address(text):
 
 
 
-def parse_extracted_data(text):
-    
+def parse_extracted_data(text, layout=None, mode=None):
+    """
+    Structured fields from OCR text. With the ``CardLayout`` from
+    ``extract_text(..., with_layout=True)``, low-confidence lines are dropped
+    before parsing, names are looked for in the largest-font lines first and
+    the address in the bottom block first.
+
+    ``mode`` (default ``OCR_PARSE_MODE``) is 'strict', which always runs NER
+    over the card, or 'cascade', which runs it only for fields the rules
+    could not resolve (see ``_cascade_fields``).
+    """
+    mode = mode or settings.OCR_PARSE_MODE
+    name_lines = address_lines = None
+    if layout is not None and len(layout):
+        min_score = settings.OCR_LAYOUT_MIN_SCORE
+        text = "\n".join(layout.confident(min_score))
+        name_lines = layout.largest_font(3, min_score)
+        address_lines = layout.bottom_block(min_score=min_score)
+
     text = clean_ocr_text(text)
     phones, raw_phone_strings = extract_phones(text)
     text_no_phones = text
@@ -263,25 +550,15 @@ def parse_extracted_data(text):
     text_no_websites = text_no_phones_emails
     for site in websites:
         text_no_websites = text_no_websites.replace(site, ' ')
-    designation = extract_designation(text_no_websites)
-    text_no_designations = text_no_websites
-    for des in designation:
-        text_no_designations = text_no_designations.replace(des, ' ')
-        
-    name = extract_name(text_no_websites)
-    company = extract_company(text_no_websites)
-    if isinstance(name, str):
-        name_list = [name]
-    elif isinstance(name, list):
-        name_list = name
+
+    if mode == 'cascade':
+        designation, name, company, address, cascade = _cascade_fields(text_no_websites, name_lines, address_lines)
     else:
-        name_list = []
+        designation, name, company, address = _strict_fields(text_no_websites, name_lines, address_lines)
+        cascade = {'mode': 'strict', 'ner_called': True}
 
+    name_list = name if isinstance(name, list) else [name] if name else []
     primary_name = name_list[0] if name_list else ''
-    text_no_name = text_no_designations
-    for n in name_list:
-        text_no_name = text_no_name.replace(n, '')
-    address = extract_address(text_no_name)
     return {
         "name": name,
         "primary_name": primary_name,
@@ -294,5 +571,188 @@ def parse_extracted_data(text):
         "primary_designation": designation[0] if designation else '',
         "primary_phone": phones[0] if phones else '',
         "address": address,
-        "raw_text": text
-    }
\ No newline at end of file
+        "raw_text": text,
+        "cascade": cascade,
+    }
+
+
+def _strict_fields(text, name_lines, address_lines):
+    """Designation, name, company and address with one NER pass over the whole card."""
+    # One NER pass per card; later stripping steps remap these spans
+    entities = analyze_entities(text)
+
+    designation = extract_designation(text, entities)
+    text_no_designations = text
+    address_entities = entities
+    for des in designation:
+        text_no_designations, address_entities = strip_text(text_no_designations, des, ' ', address_entities)
+
+    name = extract_name(text, entities, name_lines)
+    company = extract_company(text, entities)
+
+    text_no_name = text_no_designations
+    for n in name:
+        text_no_name, address_entities = strip_text(text_no_name, n, '', address_entities)
+    address = extract_address(text_no_name, address_entities, address_lines)
+    return designation, name, company, address
+
+
+# Confidence given to fields the rules resolve on their own
+RULE_CONFIDENCE = {'designation': 0.8, 'company': 0.7, 'name': 0.7, 'address': 0.8}
+
+
+def _cascade_fields(text, name_lines, address_lines):
+    """
+    Rule-first variant of ``_strict_fields``: keyword rules resolve
+    designation and company, a name-shaped largest-font line resolves the
+    name and an address block ending in a PIN code resolves the address.
+    NER then runs only over the lines not claimed by a resolved field, and
+    only if some field is still missing.
+    """
+    lines = [l.strip() for l in text.split("\n") if l.strip()]
+    resolved = {}
+
+    designation = extract_designation(text, entities=[])
+    if designation:
+        resolved['designation'] = RULE_CONFIDENCE['designation']
+
+    company = extract_company(text, entities=[])
+    if company:
+        resolved['company'] = RULE_CONFIDENCE['company']
+
+    def without(source, parts):
+        for part in parts:
+            source, _ = strip_text(source, part, ' ', [])
+        return source
+
+    # Without designations, so a one-word title isn't merged into the name
+    text_no_designations = without(text, designation)
+    name = []
+    if name_lines:
+        candidate = extract_name(text_no_designations, entities=[], preferred_lines=name_lines)
+        if candidate and any(candidate[0] in l or l in candidate[0] for l in name_lines):
+            name = candidate
+            resolved['name'] = RULE_CONFIDENCE['name']
+
+    text_no_name = without(text_no_designations, name)
+    address = extract_address(text_no_name, entities=[], region_lines=address_lines)
+    if address and ZIP_RE.search(address.replace('-', ' ')):
+        resolved['address'] = RULE_CONFIDENCE['address']
+
+    missing = [field for field in ('designation', 'name', 'company', 'address') if field not in resolved]
+    ner_text = ''
+    if missing:
+        # Only the lines no resolved field has claimed go to the model
+        claimed = set(designation) | set(company) | set(name)
+        if 'address' in resolved:
+            claimed |= {part.strip() for part in address.split(',')}
+        ner_text = "\n".join(l for l in lines if l not in claimed)
+        entities = analyze_entities(ner_text)
+
+        if 'designation' in missing:
+            designation = extract_designation(ner_text, entities) or designation
+        if 'company' in missing:
+            company = extract_company(ner_text, entities)
+        if 'name' in missing:
+            name = extract_name(ner_text, entities, name_lines)
+        if 'address' in missing:
+            address_text, address_entities = ner_text, entities
+            for part in [*designation, *name]:
+                address_text, address_entities = strip_text(address_text, part, ' ', address_entities)
+            address = extract_address(address_text, address_entities, address_lines)
+
+    ner_called = bool(missing and ner_text.strip())
+    saved = cascade_stats.record_card(len(text) - len(ner_text), ner_called, resolved)
+    cascade = {
+        'mode': 'cascade',
+        'ner_called': ner_called,
+        'ner_chars': len(ner_text),
+        'card_chars': len(text),
+        'ner_saved_ms': round(saved * 1000, 1),
+        'fields': {
+            field: {'source': 'rules', 'confidence': resolved[field]} if field in resolved
+            else {'source': 'ner' if ner_called else 'none'}
+            for field in ('designation', 'name', 'company', 'address')
+        },
+    }
+    return designation, name, company, address, cascade
+
+
+_result_cache = None
+
+
+def get_result_cache():
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache(
+            f"{PIPELINE_VERSION}:{settings.OCR_PREPROCESS_TIER}:{settings.OCR_MAX_SIDE}:{settings.OCR_PARSE_MODE}:"
+            f"{settings.OCR_NER_BACKEND}:{settings.OCR_NER_MODEL}:{settings.OCR_CROP_CARD}:"
+            f"{settings.OCR_DET_LIMIT_SIDE}:{settings.OCR_MODEL_SIZE}",
+            max_entries=settings.OCR_CACHE_MAX_ENTRIES,
+            ttl=settings.OCR_CACHE_TTL,
+            max_distance=settings.OCR_CACHE_PHASH_DISTANCE,
+            max_thumbnail_distance=settings.OCR_CACHE_THUMBNAIL_DISTANCE,
+        )
+    return _result_cache
+
+
+def process_card(image, on_stage=None):
+    """
+    Preprocess, OCR and parse one card image (file path or BGR array),
+    served from the result cache when the same card was scanned recently.
+    ``on_stage`` is called with the name of each finished stage.
+
+    Returns ``{'text', 'data', 'layout', 'timings', 'cache', 'preprocess_tier',
+    'cropped'}``; ``cropped`` says whether the card locator found and
+    deskewed the card (OCR_CROP_CARD).
+    """
+    if isinstance(image, str):
+        image = cv2.imread(image)
+        if image is None:
+            raise ValueError("Could not read image")
+
+    start = time.perf_counter()
+    cache = get_result_cache()
+    with timer('cache_lookup'):
+        key, fingerprint, cached, kind = cache.get(image)
+    if cached is not None:
+        cached['cache'] = kind
+        cached['timings'] = {'locate': 0.0, 'preprocess': 0.0, 'ocr': 0.0, 'parse': 0.0,
+                             'total': round(time.perf_counter() - start, 3)}
+        return cached
+
+    cropped = False
+    with timer('locate') as locate:
+        if settings.OCR_CROP_CARD:
+            image, cropped = crop_card(image)
+
+    with timer('preprocess') as preprocessing:
+        image, tier = preprocess(image, settings.OCR_PREPROCESS_TIER, settings.OCR_MAX_SIDE)
+
+    with timer('ocr') as ocr:
+        text, layout = extract_text(image, with_layout=True)
+    if on_stage:
+        on_stage('ocr')
+
+    with timer('parse') as parse:
+        data = parse_extracted_data(text, layout)
+    if on_stage:
+        on_stage('parse')
+
+    result = {
+        'text': text,
+        'data': data,
+        'layout': layout.to_dict(),
+        'preprocess_tier': tier,
+        'cropped': cropped,
+        'timings': {
+            'locate': round(locate.seconds, 3),
+            'preprocess': round(preprocessing.seconds, 3),
+            'ocr': round(ocr.seconds, 3),
+            'parse': round(parse.seconds, 3),
+            'total': round(time.perf_counter() - start, 3),
+        },
+    }
+    cache.put(key, fingerprint, result)
+    result['cache'] = kind
+    return result
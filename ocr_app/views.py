@@ -1,177 +1,264 @@
 from django.shortcuts import render, redirect
-from django.core.files.storage import FileSystemStorage
-from django.core.files.base import ContentFile
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import login, authenticate , logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from .models import BusinessCard
-from .utils import extract_text, parse_extracted_data
+from django.views.decorators.http import require_GET, require_POST
+from django.db import IntegrityError, transaction
+from .models import Attendee, AttendeeCounter, BusinessCard, OCRJob
+from .utils import batchers, cascade_stats, get_inference_client, get_result_cache, models_status, process_card
+from . import jobs
+import asyncio
 import base64
-import cv2
-import numpy as np
-import os
+import contextvars
+import functools
+import hmac
+import json
+import logging
+import math
 import uuid
 import time
-import qrcode
-import pandas as pd
 from django.conf import settings
 
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from datetime import date
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from . import exports
+from .images import IMAGE_CONTENT_TYPES, UploadTooLarge, decode_image, read_image_body, save_upload_async
+from .metrics import timer
+from .preprocess import tier_stats
+from . import metrics
+from . import checkin, dedupe, qr, search, sidecar
+import requests
+
+logger = logging.getLogger(__name__)
+
 # Upload and OCR Extract
 # -----------------------
 
-def preprocess_image(image_path):
-    """
-    Enhanced preprocessing for OCR — works better on light-print or faint text.
-    """
-    # Read image
-    img = cv2.imread(image_path)
-    if img is None:
-        return None
-
-    # Resize to consistent scale (improves OCR)
-    h, w = img.shape[:2]
-    if max(h, w) < 1000:
-        scale = 1000 / max(h, w)
-        img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
-
-    # Convert to grayscale
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-    # --- Step 1: Enhance contrast using CLAHE ---
-    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-    enhanced = clahe.apply(gray)
-
-    # --- Step 2: Remove noise (light smooth) ---
-    denoised = cv2.fastNlMeansDenoising(enhanced, None, 15, 7, 21)
-
-    # --- Step 3: Adaptive Threshold with Otsu + Inversion ---
-    # (Helps faint dark text on light backgrounds)
-    thresh = cv2.adaptiveThreshold(
-        denoised, 255,
-        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-        cv2.THRESH_BINARY_INV,  # invert for light text
-        31, 15
-    )
-
-    # --- Step 4: Morphological cleanup (open small noise) ---
-    kernel = np.ones((2, 2), np.uint8)
-    morph = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel, iterations=1)
-
-    # --- Step 5: Combine with original for fine details ---
-    processed = cv2.bitwise_or(morph, 255 - denoised)
-
-    # --- Step 6: Optional sharpening ---
-    sharpen_kernel = np.array([[0, -1, 0],
-                               [-1, 5, -1],
-                               [0, -1, 0]])
-    sharp = cv2.filter2D(processed, -1, sharpen_kernel)
-
-    # --- Step 7: Save processed image ---
-    fs = FileSystemStorage()
-    base_name = os.path.basename(image_path)
-    filename = f"preprocessed_{base_name}"
-
-    success, encoded_img = cv2.imencode('.jpg', sharp)
-    if not success:
-        return None
-
-    saved_path = fs.save(filename, ContentFile(encoded_img.tobytes()))
-    return fs.path(saved_path)
-import requests
+def readiness(request):
+    """Per-model load state (of the inference sidecar, if used) for load balancers and kiosk health checks."""
+    ready, models = models_status()
+    return JsonResponse({'ready': ready, 'models': models}, status=200 if ready else 503)
 
 
-@csrf_exempt
-def upload_card(request):
-    total_users = 0
-    if request.method == 'POST':
-        fs = FileSystemStorage()
-        if request.POST.get('webcam_image'):
-            _, imgstr = request.POST['webcam_image'].split(';base64,')
-            image_bytes = base64.b64decode(imgstr)
-            unique_filename = f"webcam_{uuid.uuid4().hex}.jpg"
-            image_path = fs.save(unique_filename, ContentFile(image_bytes))
-            image_path = fs.path(image_path)
-        else:
-            messages.error(request, "No image provided")
-            return redirect('new_registration')
+def inference_stats(request):
+    """Batch fill and added queue wait for each inference micro-batcher."""
+    client = get_inference_client()
+    return JsonResponse({
+        'sidecar': client.stats() if client else None,
+        'batching': {name: batcher.stats() for name, batcher in batchers.items()},
+        'cache': get_result_cache().stats(),
+        'preprocess': tier_stats.snapshot(),
+        'cascade': cascade_stats.snapshot(),
+        'qr': qr.get_qr_cache().stats(),
+        'checkin': checkin.get_gatekeeper().stats(),
+    })
+
+
+def prometheus_metrics(request):
+    """Stage and view latency histograms in the Prometheus text format (local clients only)."""
+    if request.META.get('REMOTE_ADDR') not in settings.OCR_METRICS_ALLOWED_IPS:
+        return HttpResponse(status=403)
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# Decode + OCR + parsing run here, so the event loop serving the async views
+# (ASGI) never blocks on inference
+_inference_pool = ThreadPoolExecutor(max_workers=settings.OCR_INFERENCE_THREADS, thread_name_prefix='inference')
+
+
+async def _run_inference(func, *args):
+    """Run ``func`` on the inference pool in the request's context (keeps its Server-Timing stages)."""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        _inference_pool, functools.partial(context.run, func, *args))
 
-        start_time = time.time()
 
-        # (Optional preprocessing)
-        # preprocessed_path = preprocess_image(image_path)
+def _process_upload(image_bytes):
+    # Decode once in memory; the original is saved in the background (if enabled)
+    image = decode_image(image_bytes)
+    save_upload_async(image_bytes)
+    return process_card(image)
 
-        # Extract text via OCR
-        text = extract_text(image_path)
-        ocr_time = time.time()
-        print(f"OCR Extraction Time: {ocr_time - start_time:.2f} seconds")
-       
 
-        # Parse structured data (phones, emails, etc.)
-        data = parse_extracted_data(text)
-        parse_time = time.time()
-        print(f"Data Parsing Time: {parse_time - ocr_time:.2f} seconds")
+def _upload_error(request, message):
+    messages.error(request, message)
+    return redirect('new_registration')
 
-        total_time = parse_time - start_time
-        print(f"Total Processing Time: {total_time:.2f} seconds")
 
-        text_lines = [line.strip() for line in text.split('\n') if line.strip()]
+def _retry_page(request, message, retry_after=10):
+    messages.error(request, message)
+    response = render(request, 'ocr/register_card.html', {'total': 0}, status=503)
+    response['Retry-After'] = str(retry_after)
+    return response
 
 
-        excel_file = os.path.join(settings.MEDIA_ROOT, 'business_cards.xlsx')
-        if os.path.exists(excel_file):
-            df_existing = pd.read_excel(excel_file)
-            total_users = len(df_existing)
+def _card_page(request, result):
+    return render(request, 'ocr/register_card.html', card_context(
+        result['text'], result['data'], result['timings']['total'], AttendeeCounter.current()))
+
+
+def _upload_page(request):
+    total_users = AttendeeCounter.current()
+
+    # Results of a background OCR job (see submit_card_job)
+    job_id = request.GET.get('job')
+    if job_id:
+        job = OCRJob.objects.defer('image').filter(pk=job_id, status=OCRJob.DONE).first() if _is_uuid(job_id) else None
+        if job is None:
+            messages.error(request, "Scan result not found, please capture the card again")
         else:
-            total_users = 0
-        print(f"Total users before registration: {total_users}")
-
-        return render(request, 'ocr/register_card.html', {
-            'name': data.get('name', ''),
-            'primary_name': data.get('primary_name', ''),
-            'text_lines': text_lines,
-            'emails': data.get('emails', []),
-            'primary_email': data.get('primary_email', ''),
-            'phones': data.get('phones', []),
-            'primary_phone': data.get('primary_phone', ''),
-            'designation': data.get('designation', ''),
-            'primary_designation': data.get('primary_designation', ''),
-            'company': data.get('company', ''),
-            'primary_company': data.get('primary_company', ''),
-            'address': data.get('address', ''),
-            'processing_time': f"{total_time:.2f} seconds",
-            'total': total_users 
-        })
-    excel_file = os.path.join(settings.MEDIA_ROOT, 'business_cards.xlsx')
-    if os.path.exists(excel_file):
-        total_users = len(pd.read_excel(excel_file))
+            return render(request, 'ocr/register_card.html', card_context(
+                job.result['text'], job.result['data'], job.result['timings']['total'], total_users))
+
     return render(request, 'ocr/register_card.html', {'total': total_users})
 
 
+@csrf_exempt
+async def upload_card(request):
+    """
+    Capture page (GET) and synchronous card upload (POST). Async so that,
+    under ASGI, a worker keeps serving other requests while a card is in
+    OCR; the database/template parts run through ``sync_to_async``.
+    """
+    if request.method != 'POST':
+        return await sync_to_async(_upload_page)(request)
+
+    if settings.OCR_REQUIRE_WARM and not (await _run_inference(models_status))[0]:
+        return await sync_to_async(_retry_page)(request, "OCR is still starting up, please try again in a moment")
+
+    try:
+        image_bytes = await sync_to_async(_card_image_bytes)(request)
+    except UploadTooLarge:
+        return await sync_to_async(_upload_error)(request, "The captured image is too large, please retake it")
+    if not image_bytes:
+        return await sync_to_async(_upload_error)(request, "No image provided")
+
+    # Preprocess + OCR + parse (phones, emails, etc.), or the cached result of a re-scan
+    try:
+        result = await _run_inference(_process_upload, image_bytes)
+    except ValueError:
+        return await sync_to_async(_upload_error)(request, "Could not read the captured image, please retake it")
+    except sidecar.InferenceBusy:
+        return await sync_to_async(_retry_page)(request, "Scanner is busy, please try again in a few seconds", 5)
+    except sidecar.InferenceError:
+        logger.exception("Inference server request failed")
+        return await sync_to_async(_retry_page)(request, "OCR is unavailable right now, please try again shortly")
+
+    timings = result['timings']
+    logger.info("Card processed in %.3fs (locate %.3fs, preprocess %.3fs/%s, ocr %.3fs, parse %.3fs, "
+                "cropped %s, cache %s)", timings['total'], timings['locate'], timings['preprocess'],
+                result['preprocess_tier'], timings['ocr'], timings['parse'], result['cropped'], result['cache'])
+    return await sync_to_async(_card_page)(request, result)
+
+
+def card_context(text, data, total_time, total_users):
+    text_lines = [line.strip() for line in text.split('\n') if line.strip()]
+    return {
+        'name': data.get('name', ''),
+        'primary_name': data.get('primary_name', ''),
+        'text_lines': text_lines,
+        'emails': data.get('emails', []),
+        'primary_email': data.get('primary_email', ''),
+        'phones': data.get('phones', []),
+        'primary_phone': data.get('primary_phone', ''),
+        'designation': data.get('designation', ''),
+        'primary_designation': data.get('primary_designation', ''),
+        'company': data.get('company', ''),
+        'primary_company': data.get('primary_company', ''),
+        'address': data.get('address', ''),
+        'processing_time': f"{total_time:.2f} seconds",
+        'total': total_users
+    }
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(str(value))
+    except ValueError:
+        return False
+    return True
+
+
+def _card_image_bytes(request):
+    """
+    Raw image bytes from an ``image/*`` request body, an ``image`` file
+    upload or (older clients) a base64 ``webcam_image`` data-URL field.
+    Raises ``UploadTooLarge`` for bodies over OCR_UPLOAD_MAX_BYTES.
+    """
+    if request.content_type in IMAGE_CONTENT_TYPES:
+        return read_image_body(request, settings.OCR_UPLOAD_MAX_BYTES) or None
+    if request.FILES.get('image'):
+        return request.FILES['image'].read()
+    if request.POST.get('webcam_image'):
+        _, imgstr = request.POST['webcam_image'].split(';base64,')
+        return base64.b64decode(imgstr)
+    return None
+
+
+# Background OCR jobs
+# -------------------
 
 @csrf_exempt
-def register_card(request):
-    # 📁 Paths
-    excel_file = os.path.join(settings.MEDIA_ROOT, 'business_cards.xlsx')
-    qr_folder = os.path.join(settings.MEDIA_ROOT, 'qr_codes')
-    os.makedirs(qr_folder, exist_ok=True)
-
-    # 🧾 Load existing Excel or create new
-    if os.path.exists(excel_file):
-        df_existing = pd.read_excel(excel_file)
-        df_existing.columns = df_existing.columns.str.strip()
-        df_existing.rename(columns={'QR Code': 'QR_Code'}, inplace=True)
-    else:
-        df_existing = pd.DataFrame(columns=[
-            'UID', 'Name', 'Email', 'Phone', 'Company', 
-            'Designation', 'Category', 'Address', 'QR_Code'
-        ])
-        df_existing.to_excel(excel_file, index=False)
+@require_POST
+def submit_card_job(request):
+    """Queue a card for the OCR worker pool and return its job id right away."""
+    try:
+        image_bytes = _card_image_bytes(request)
+    except UploadTooLarge as exc:
+        return JsonResponse({'error': str(exc)}, status=413)
+    if not image_bytes:
+        return JsonResponse({'error': "No image provided"}, status=400)
+
+    try:
+        # Raw image bodies carry the priority in the query string
+        priority = max(-10, min(10, int(request.POST.get('priority', request.GET.get('priority', 0)))))
+    except ValueError:
+        priority = 0
+
+    try:
+        job = jobs.submit_job(image_bytes, priority=priority)
+    except jobs.QueueFull as exc:
+        response = JsonResponse({'error': str(exc)}, status=429)
+        response['Retry-After'] = '5'
+        return response
+    save_upload_async(image_bytes)
+
+    payload = jobs.job_payload(job)
+    payload['status_url'] = reverse('card_job_status', args=[job.pk])
+    payload['result_url'] = f"{reverse('new_registration')}?job={job.pk}"
+    return JsonResponse(payload, status=202)
+
+
+@require_GET
+async def card_job_status(request, job_id):
+    """
+    Job status; ``?wait=N`` long-polls up to N seconds for the result. Async
+    so that, under ASGI, waiting pollers don't block the worker's sync views.
+    """
+    try:
+        wait = float(request.GET.get('wait', 0))
+    except ValueError:
+        wait = 0
+    if not math.isfinite(wait):
+        wait = 0  # nan would never reach the deadline
+    wait = min(max(wait, 0), settings.OCR_JOB_LONG_POLL_MAX)
 
-    # 🔢 Get total user count
-    total_users = len(df_existing)
+    try:
+        job = await jobs.await_job(job_id, timeout=wait)
+    except OCRJob.DoesNotExist:
+        raise Http404("No such OCR job")
+    return JsonResponse(await sync_to_async(jobs.job_payload)(job))
 
+
+
+@csrf_exempt
+def register_card(request):
     if request.method == 'POST':
 
         name = request.POST.get('name', '').strip()
@@ -182,55 +269,237 @@ def register_card(request):
         company = request.POST.get('company', '').strip()
         address = request.POST.get('address', '').strip()
 
-        uid = str(uuid.uuid4().hex[:6]).upper()
-
-        # 🧾 Create QR content
-        qr_data = (
-            f" {uid}\n"
-            f"{name}\n {email}\n {phone}\n"
-            f" {designation}\n {category}\n"
-            f" {company}\n {address}"
-        )
-        qr_filename = f"{uid}_QR.png"
-        qr_path = os.path.join(qr_folder, qr_filename)
-        qrcode.make(qr_data).save(qr_path)
+        # Repeat visitors (same phone or email) aren't registered twice. Only staff get
+        # the existing pass: anyone can type in someone else's phone number or email.
+        with timer('dedupe'):
+            duplicates = dedupe.find_duplicates(name, email, phone, company)
+        if duplicates['exact'] and not request.POST.get('register_anyway'):
+            existing = duplicates['exact'][0]
+            if request.user.is_staff:
+                return redirect(f"{reverse('attendee_pass', args=[existing.uid])}?existing=1")
+            messages.info(request, "You are already registered. Please visit the help desk to reprint your pass.")
+            return redirect('new_registration')
+        for similar, score in duplicates['similar']:
+            logger.info("Possible duplicate of %s (%.2f) registered as new: %s / %s",
+                        similar.uid, score, name, company)
 
         # 🆕 Add new entry
-        new_row = pd.DataFrame([{
-            'UID': uid,
-            'Name': name,
-            'Email': email,
-            'Phone': phone,
-            'Designation': designation,
-            'Category': category,
-            'Company': company,
-            'Address': address,
-            'QR_Code': f"qr_codes/{qr_filename}"
-        }])
-
-        df_existing = pd.concat([df_existing, new_row], ignore_index=True)
-        df_existing.to_excel(excel_file, index=False)
-
-        total_users = len(df_existing)
+        for attempt in range(3):
+            uid = dedupe.new_uid()
+            try:
+                with timer('db_write'), transaction.atomic():
+                    attendee = Attendee.objects.create(
+                        uid=uid,
+                        name=name,
+                        email=email,
+                        phone=phone,
+                        designation=designation,
+                        category=category,
+                        company=company,
+                        address=address,
+                        # The QR image is rendered on demand from the record (see attendee_qr)
+                        qr_code=reverse('attendee_qr', args=[uid, 'png']),
+                    )
+                    AttendeeCounter.increment()
+                break
+            except IntegrityError:
+                # Another registration took the same UID between the check and the insert
+                if attempt == 2:
+                    raise
+        qr.prerender_async(attendee)
+
+        total_users = AttendeeCounter.current()
 
         # 📤 Pass data to template
-        user = {
-            'UID': uid,
-            'Name': name,
-            'Email': email,
-            'Phone': phone,
-            'Designation': designation,
-            'Category': category,
-            'Company': company,
-            'Address': address,
-            'QR_URL': f"{settings.MEDIA_URL}qr_codes/{qr_filename}",
-        }
-
-        return render(request, 'ocr/pass.html', {'user': user, 'total': total_users})
+        return render(request, 'ocr/pass.html', {'user': _pass_context(attendee), 'total': total_users})
+
+    return render(request, 'ocr/register_card.html', {'total': AttendeeCounter.current()})
+
+
+def _pass_context(attendee):
+    return {
+        'UID': attendee.uid,
+        'Name': attendee.name,
+        'Email': attendee.email,
+        'Phone': attendee.phone,
+        'Designation': attendee.designation,
+        'Category': attendee.category,
+        'Company': attendee.company,
+        'Address': attendee.address,
+        'QR_URL': reverse('attendee_qr', args=[attendee.uid, 'png']),
+    }
+
+
+@require_GET
+def attendee_qr(request, uid, fmt):
+    """
+    An attendee's QR code as PNG or SVG, rendered from the record through an
+    in-memory LRU. The ETag is derived from the encoded payload, so
+    revalidation is answered with 304 without rendering anything.
+    """
+    if fmt not in qr.FORMATS:
+        raise Http404("Unknown QR format")
+    attendee = Attendee.objects.filter(uid=uid).only(
+        'uid', 'name', 'email', 'phone', 'designation', 'category', 'company', 'address').first()
+    if attendee is None:
+        raise Http404("No such attendee")
+
+    payload = qr.qr_payload(attendee)
+    etag = f'"{qr.qr_etag(payload, fmt)}"'
+    if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+        response = HttpResponse(status=304)
+    else:
+        image, _ = qr.get_qr_cache().get(payload, fmt)
+        response = HttpResponse(image, content_type=qr.FORMATS[fmt])
+    response['ETag'] = etag
+    response['Cache-Control'] = f"private, max-age={settings.OCR_QR_MAX_AGE}"
+    return response
+
+
+# Entry gates
+# -----------
+
+CHECKIN_STATUS_CODES = {checkin.OK: 200, checkin.REPEAT: 409, checkin.UNKNOWN: 404}
+
+
+@csrf_exempt
+@require_POST
+def check_in(request):
+    """
+    Check an attendee in at a gate. Takes the scanned QR text as ``payload``
+    (or a bare ``uid``), plus ``gate`` and an optional ``scan_id`` that makes
+    retries idempotent, as form fields or a JSON object. Answers 200 for a
+    first entry, 409 for a repeat entry and 404 for an unknown badge.
+    """
+    token = settings.OCR_CHECKIN_TOKEN
+    if token and not hmac.compare_digest(request.headers.get('X-Checkin-Token', ''), token):
+        return JsonResponse({'error': "Invalid check-in token"}, status=403)
+
+    if request.content_type == 'application/json':
+        try:
+            fields = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': "Invalid JSON"}, status=400)
+        if not isinstance(fields, dict):
+            return JsonResponse({'error': "Expected a JSON object"}, status=400)
+    else:
+        fields = request.POST
+
+    uid = checkin.parse_scan(str(fields.get('payload') or fields.get('uid') or ''))
+    if uid is None:
+        return JsonResponse({'error': "No attendee UID in the scan"}, status=400)
+    gate = str(fields.get('gate') or '')[:50]
+    scan_id = str(fields.get('scan_id') or '')[:64] or None
+
+    with timer('checkin'):
+        try:
+            result = checkin.get_gatekeeper().check_in(uid, gate, scan_id)
+        except ValueError as exc:
+            return JsonResponse({'error': str(exc)}, status=409)
+    return JsonResponse(result, status=CHECKIN_STATUS_CODES[result['status']])
+
+
+# Help desk
+# ---------
+
+@staff_member_required
+def desk(request):
+    """Attendee search page for the help desk."""
+    return render(request, 'ocr/desk.html')
+
+
+@staff_member_required
+@require_GET
+def attendee_search(request):
+    """``?q=`` search over UID, name, company, phone and email; ``page`` is 1-based."""
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    start = time.perf_counter()
+    with timer('search'):
+        rows, has_next = search.search_attendees(request.GET.get('q', ''), page, settings.DESK_PAGE_SIZE)
+    return JsonResponse({
+        'page': page,
+        'has_next': has_next,
+        'took_ms': round((time.perf_counter() - start) * 1000, 1),
+        'results': [{
+            'uid': a.uid,
+            'name': a.name,
+            'company': a.company,
+            'designation': a.designation,
+            'category': a.category,
+            'phone': a.phone,
+            'email': a.email,
+            'pass_url': reverse('attendee_pass', args=[a.uid]),
+        } for a in rows],
+    })
+
+
+@staff_member_required
+@require_GET
+def attendee_pass(request, uid):
+    """Reprint the pass of an existing attendee (``?existing=1``: after a repeat registration)."""
+    attendee = Attendee.objects.filter(uid=uid).first()
+    if attendee is None:
+        raise Http404("No such attendee")
+    return render(request, 'ocr/pass.html', {
+        'user': _pass_context(attendee), 'total': AttendeeCounter.current(), 'back_url': reverse('desk'),
+        'existing': request.GET.get('existing') == '1'})
+
 
-    return render(request, 'ocr/register_card.html', {'total': total_users})
 def main_page(request):
     return render(request, 'ocr/main_page.html')
 
 
 
+
+
+# Attendee export
+# ---------------
+
+@staff_member_required
+@require_GET
+def export_attendees(request, fmt):
+    """
+    Stream attendees as CSV or XLSX. Filters: ``category``, ``from``/``to``
+    (YYYY-MM-DD) and ``since=last`` (with optional ``cursor`` name) for an
+    incremental export that advances once the download completes; every
+    combination of filters keeps its own cursor.
+    """
+    if fmt not in ('csv', 'xlsx'):
+        raise Http404("Unknown export format")
+
+    try:
+        date_from = date.fromisoformat(request.GET['from']) if request.GET.get('from') else None
+        date_to = date.fromisoformat(request.GET['to']) if request.GET.get('to') else None
+    except ValueError:
+        return HttpResponseBadRequest("Dates must be YYYY-MM-DD")
+
+    category = request.GET.get('category')
+    cursor = exports.cursor_name(request.GET.get('cursor', 'default'), category, date_from, date_to)
+    incremental = request.GET.get('since') == 'last'
+    after_id = exports.cursor_position(cursor) if incremental else None
+    queryset = exports.filter_attendees(category, date_from, date_to, after_id)
+    run = exports.ExportRun(queryset)
+    filename = f"attendees_{time.strftime('%Y%m%d_%H%M%S')}.{fmt}"
+
+    if fmt == 'csv':
+        def rows():
+            yield from exports.stream_csv(run)
+            if incremental:
+                exports.advance_cursor(cursor, run.last_id)
+
+        response = StreamingHttpResponse(rows(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    # XLSX is a zip, so it can't be streamed while it is written; the
+    # write-only workbook still keeps memory flat while building the file.
+    tmp = tempfile.TemporaryFile()
+    exports.write_xlsx(run, tmp)
+    tmp.seek(0)
+    if incremental:
+        exports.advance_cursor(cursor, run.last_id)
+    return FileResponse(tmp, as_attachment=True, filename=filename,
+                        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')